@@ -0,0 +1,97 @@
+"""
+Compare dedup lookups with and without the bloom filter tier.
+
+Runs against the Redis configured in `.env`, on a separate database so the live
+dedup index is never touched:
+
+    python -m benchmarks.dedup_benchmark --urls 50000 --lookups 5000 --hit-ratio 0.1
+"""
+from argparse import ArgumentParser
+from json import dumps
+from random import random
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from dotenv import load_dotenv
+
+from src.db.redis import RedisDB
+from src.constants.redis_key import PRODUCT_DEDUP_BLOOM_KEY, PRODUCT_DEDUP_BLOOM_META_KEY, PRODUCT_DEDUP_INDEX_KEY
+
+load_dotenv()
+
+
+def product_url(index: int) -> str:
+    return f"https://www.flipkart.com/bench-product/p/itm{index:012d}"
+
+
+def measure(name: str, redis: RedisDB, lookups: List[str], run: Callable[[List[str]], int]) -> Dict:
+    round_trips_before = redis.round_trips
+    start = perf_counter()
+    hits = run(lookups)
+    elapsed = perf_counter() - start
+
+    result = {
+        "path": name,
+        "lookups": len(lookups),
+        "hits": hits,
+        "seconds": round(elapsed, 4),
+        "us_per_lookup": round(elapsed / len(lookups) * 1_000_000, 2),
+        "round_trips": redis.round_trips - round_trips_before,
+    }
+    print(dumps(result))
+
+    return result
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=50_000,
+                        help="Number of cached urls to seed")
+    parser.add_argument("--lookups", type=int, default=5_000,
+                        help="Number of urls to look up")
+    parser.add_argument("--hit-ratio", type=float, default=0.1,
+                        help="Share of looked up urls that are cached")
+    parser.add_argument("--page-size", type=int, default=40,
+                        help="Urls per batched lookup, like one listing page")
+    parser.add_argument("--db", type=int, default=15,
+                        help="Redis database used for the benchmark")
+    args = parser.parse_args()
+
+    redis = RedisDB()
+    redis.db = args.db
+    redis.url_snapshot_max_size = 0
+    redis.bloom_backend = "redis"
+
+    with redis as client:
+        if not client:
+            print("❌ Could not connect to Redis.")
+            exit(1)
+
+        try:
+            seeded = [product_url(i) for i in range(args.urls)]
+            for start in range(0, len(seeded), 10_000):
+                redis.add_to_dedup_index(seeded[start:start + 10_000])
+
+            lookups = [product_url(i if random() < args.hit_ratio else args.urls + i)
+                       for i in range(args.lookups)]
+
+            def per_url(urls: List[str]) -> int:
+                return sum(1 for url in urls if redis.is_url_cached(url))
+
+            def per_page(urls: List[str]) -> int:
+                return sum(len(redis.get_cached_urls(urls[start:start + args.page_size]) or ())
+                           for start in range(0, len(urls), args.page_size))
+
+            measure("is_url_cached", redis, lookups, per_url)
+            measure("get_cached_urls", redis, lookups, per_page)
+
+            redis.load_bloom_filter()
+            measure("bloom + is_url_cached", redis, lookups, per_url)
+            measure("bloom + get_cached_urls", redis, lookups, per_page)
+        finally:
+            redis.client.delete(PRODUCT_DEDUP_INDEX_KEY,
+                                PRODUCT_DEDUP_BLOOM_KEY, PRODUCT_DEDUP_BLOOM_META_KEY)
+
+
+if __name__ == "__main__":
+    main()
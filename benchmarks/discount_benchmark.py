@@ -0,0 +1,99 @@
+"""
+Compare the scalar and the batch discount scoring paths, and check they agree.
+
+Products are generated, no browser or database is needed:
+
+    python -m benchmarks.discount_benchmark --products 100000 --page-size 40
+"""
+from argparse import ArgumentParser
+from json import dumps
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from src.lib.types import Product
+from src.utils.best_discount_analyzer import BestDiscountAnalyzer
+
+
+def generate_products(count: int, seed: int) -> List[Product]:
+    rng = Random(seed)
+    products: List[Product] = []
+
+    for _ in range(count):
+        price = rng.randint(100, 100_000)
+        products.append({
+            "price": price,
+            "discount_price": int(price * rng.uniform(0.2, 1.0)),
+            "rating": round(rng.uniform(1.0, 5.0), 1),
+            "rating_count": rng.choice([0, 3, rng.randint(5, 200_000)]),
+        })
+
+    return products
+
+
+def measure(name: str, products: List[Product], run: Callable[[List[Product]], List[bool]]) -> Dict:
+    start = perf_counter()
+    decisions = run(products)
+    elapsed = perf_counter() - start
+
+    result = {
+        "path": name,
+        "products": len(products),
+        "deals": sum(decisions),
+        "seconds": round(elapsed, 4),
+        "us_per_product": round(elapsed / len(products) * 1_000_000, 3),
+    }
+    print(dumps(result))
+
+    return {**result, "decisions": decisions}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000,
+                        help="Number of products to score")
+    parser.add_argument("--page-size", type=int, default=40,
+                        help="Products per batch, like one listing page")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Seed of the generated products")
+    args = parser.parse_args()
+
+    products = generate_products(args.products, args.seed)
+
+    def scalar(products: List[Product]) -> List[bool]:
+        analyzer = BestDiscountAnalyzer()
+        return [bool(analyzer.is_best_discount(product)) for product in products]
+
+    def per_page(products: List[Product]) -> List[bool]:
+        analyzer = BestDiscountAnalyzer()
+        decisions: List[bool] = []
+        for start in range(0, len(products), args.page_size):
+            decisions.extend(analyzer.score_products(
+                products[start:start + args.page_size])[0].tolist())
+        return decisions
+
+    def find_deals_per_page(products: List[Product]) -> List[bool]:
+        analyzer = BestDiscountAnalyzer()
+        decisions: List[bool] = []
+        for start in range(0, len(products), args.page_size):
+            decisions.extend(analyzer.find_deals(
+                products[start:start + args.page_size]))
+        return decisions
+
+    def whole_batch(products: List[Product]) -> List[bool]:
+        return BestDiscountAnalyzer().score_products(products)[0].tolist()
+
+    baseline = measure("is_best_discount", products, scalar)
+    for result in (measure("score_batch per page", products, per_page),
+                   measure("find_deals per page", products, find_deals_per_page),
+                   measure("score_batch", products, whole_batch)):
+        mismatches = sum(1 for expected, actual in zip(
+            baseline["decisions"], result["decisions"]) if expected != actual)
+
+        if mismatches:
+            print(f"❌ {result['path']} disagrees with is_best_discount on {mismatches} products")
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Measure listing page extraction end to end on synthetic fixture pages.
+
+The pages in `benchmarks/fixtures/<website>/` are served from a local HTTP server to a
+lean (headless) driver and every page goes through `WebsiteScraper.extract_products`.
+Dedup lookups run against the Redis configured in `.env`, on a separate database, and
+politeness is disabled since only the local server is hit:
+
+    python -m benchmarks.extraction_benchmark --rounds 3 --output extraction.json
+    python -m benchmarks.extraction_benchmark --baseline extraction.json --max-regression 0.1
+"""
+from argparse import ArgumentParser
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from json import dump, dumps, load
+from pathlib import Path
+from threading import Thread
+from time import perf_counter
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from src.db.redis import RedisDB
+from src.utils.best_discount_analyzer import BestDiscountAnalyzer
+from src.constants.url import PLATFORM_IDS
+from src.crawler.utils.crawler_utils import WebsiteScraper
+from src.crawler.utils.politeness import Politeness
+from src.crawler.utils.web_driver_utility import WebDriverUtility
+from src.crawler.utils.website_crawler_factory import WebsiteScraperFactory
+from src.constants.const import ASSOCIATED_APP, EXTRACTION_BACKEND, METRICS_ENABLED, READINESS_MODE, USER_ID
+from src.lib.metrics import (CARD_EXTRACTION_SECONDS, METRICS, NAVIGATE_SECONDS, PAGE_LOAD_WAIT_SECONDS,
+                             REDIS_DEDUP_SECONDS, SCORING_SECONDS, Histogram, metric_labels)
+from src.lib.types import ProductCategories, Websites
+
+load_dotenv()
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+STAGES: Dict[str, Histogram] = {
+    "navigate": NAVIGATE_SECONDS,
+    "page_load_wait": PAGE_LOAD_WAIT_SECONDS,
+    "card_extraction": CARD_EXTRACTION_SECONDS,
+    "redis_dedup": REDIS_DEDUP_SECONDS,
+    "scoring": SCORING_SECONDS,
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        return
+
+
+class RoundTripCounter:
+    """
+    Counts the WebDriver commands sent by a driver, element commands included.
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.count += 1
+            return execute(driver_command, params)
+
+        driver.execute = counting_execute
+
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(QuietHandler, directory=str(FIXTURES_DIR)))
+    Thread(target=server.serve_forever,
+           name="fixture-server", daemon=True).start()
+
+    return server
+
+
+def fixture_pages(website: Websites) -> List[str]:
+    return sorted(path.name for path in (FIXTURES_DIR / website.value).glob("*.html"))
+
+
+def measure(website: Websites, category: ProductCategories, base_url: str, driver_utility: WebDriverUtility,
+            counter: RoundTripCounter, redis: RedisDB, rounds: int) -> Dict:
+    pages = fixture_pages(website)
+    labels = (website.value, category.value)
+    cards = products = failed_pages = 0
+    round_trips = extraction_round_trips = 0
+
+    start = perf_counter()
+    with metric_labels(*labels):
+        for _ in range(rounds):
+            # A fresh scraper per round, so products seen in a previous round are not skipped
+            scraper = WebsiteScraperFactory.get_scraper(
+                website, category, driver_utility, redis, BestDiscountAnalyzer())
+
+            for page in pages:
+                round_trips_before = counter.count
+                container = scraper.get_product_container(
+                    f"{base_url}/{website.value}/{page}")
+
+                if container is None:
+                    failed_pages += 1
+                    continue
+
+                # The shared implementation, Flipkart's rating enrichment would leave the local server
+                extraction_before = counter.count
+                page_products = WebsiteScraper.extract_products(
+                    scraper, container) or []
+
+                cards += scraper.last_page_card_count
+                products += len(page_products)
+                extraction_round_trips += counter.count - extraction_before
+                round_trips += counter.count - round_trips_before
+    elapsed = perf_counter() - start
+
+    stages = {}
+    for name, histogram in STAGES.items():
+        seconds, calls = histogram.total(labels)
+        stages[name] = {
+            "calls": calls,
+            "avg_ms": round(seconds / calls * 1000, 3) if calls else 0.0,
+        }
+
+    result = {
+        "website": website.value,
+        "pages": len(pages) * rounds - failed_pages,
+        "failed_pages": failed_pages,
+        "cards": cards,
+        "products": products,
+        "seconds": round(elapsed, 4),
+        "cards_per_second": round(cards / elapsed, 2) if elapsed > 0 else 0.0,
+        "round_trips": round_trips,
+        "round_trips_per_card": round(round_trips / cards, 3) if cards else 0.0,
+        "extraction_round_trips_per_card": round(extraction_round_trips / cards, 3) if cards else 0.0,
+        "stages": stages,
+    }
+    print(dumps(result))
+
+    return result
+
+
+def compare(results: List[Dict], baseline: Dict, max_regression: float | None) -> bool:
+    """
+    Print the change of every website against the baseline run.
+
+    Returns:
+        bool: False if a website regressed by more than `max_regression`.
+    """
+    baseline_results = {result["website"]: result
+                        for result in baseline.get("results", [])}
+    passed = True
+
+    for result in results:
+        previous = baseline_results.get(result["website"])
+
+        if previous is None:
+            continue
+
+        # Higher is better for throughput, lower is better for round trips
+        for metric, higher_is_better in (("cards_per_second", True), ("round_trips_per_card", False)):
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            regression = -change if higher_is_better else change
+
+            print(dumps({"website": result["website"], "metric": metric, "baseline": before,
+                         "current": after, "change": round(change, 4)}))
+
+            if max_regression is not None and regression > max_regression:
+                print(
+                    f"❌ {result['website']} {metric} regressed by {regression:.1%} against the baseline")
+                passed = False
+
+    return passed
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--websites", nargs="+", choices=[website.value for website in Websites],
+                        default=[website.value for website in Websites if website.value in PLATFORM_IDS],
+                        help="Websites to benchmark, those without a platform id are disabled in the crawler")
+    parser.add_argument("--category", choices=[category.value for category in ProductCategories],
+                        default=ProductCategories.JEANS.value,
+                        help="Category of the fixture pages")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Times every fixture page is extracted")
+    parser.add_argument("--db", type=int, default=15,
+                        help="Redis database used for the dedup lookups")
+    parser.add_argument("--output",
+                        help="Write the results to this JSON file")
+    parser.add_argument("--baseline",
+                        help="Compare the results against a previous JSON file")
+    parser.add_argument("--max-regression", type=float,
+                        help="Fail when a metric is worse than the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    if not METRICS_ENABLED:
+        print("❌ METRICS_ENABLED must be on, the stage latencies come from the metrics.")
+        exit(1)
+
+    if USER_ID is None or ASSOCIATED_APP is None:
+        print("❌ USER_ID and ASSOCIATED_APP must be set, products without them are dropped.")
+        exit(1)
+
+    websites = [Websites(website) for website in args.websites]
+    category = ProductCategories(args.category)
+
+    redis = RedisDB()
+    redis.db = args.db
+    redis.url_snapshot_max_size = 0
+
+    with redis as client:
+        if not client:
+            print("❌ Could not connect to Redis.")
+            exit(1)
+
+        server = serve_fixtures()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        driver_utility = WebDriverUtility(
+            lean=True, politeness=Politeness(enabled=False))
+
+        results: List[Dict] = []
+        try:
+            counter = RoundTripCounter(driver_utility.driver)
+            METRICS.reset()
+
+            for website in websites:
+                if not fixture_pages(website):
+                    print(f"⚠️ No fixture pages for {website.value}, skipping")
+                    continue
+
+                results.append(measure(website, category, base_url,
+                                       driver_utility, counter, redis, args.rounds))
+        finally:
+            driver_utility.close_driver()
+            server.shutdown()
+
+    report = {
+        "backend": EXTRACTION_BACKEND,
+        "readiness_mode": READINESS_MODE,
+        "category": category.value,
+        "rounds": args.rounds,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = load(file)
+
+        if not compare(results, baseline, args.max_regression):
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
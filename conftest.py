@@ -0,0 +1 @@
+# Keeps the repository root on sys.path, so tests import the `src` package
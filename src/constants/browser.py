@@ -0,0 +1,112 @@
+# LEAN BROWSER MODE
+# URL patterns blocked through CDP (Network.setBlockedURLs) when the lean mode is on.
+# We only read text and src/href attributes, so images, fonts and media never need to be downloaded.
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.jpg*",
+    "*.jpeg*",
+    "*.png*",
+    "*.gif*",
+    "*.webp*",
+    "*.avif*",
+    "*.svg*",
+    "*.ico*",
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*",
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+]
+
+# Known ad and analytics hosts that never carry product data.
+BLOCKED_HOST_PATTERNS = [
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*scorecardresearch.com*",
+    "*criteo.com*",
+    "*criteo.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+]
+
+# Sum of bytes transferred for the current document and every resource it loaded.
+# Resource timings are cleared afterwards so pages loaded in place (clicks, infinite scroll) are counted on their own.
+PAGE_STATS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+
+let bytes = 0;
+for (const resource of resources) {
+    bytes += resource.transferSize || 0;
+}
+
+let loadTime = null;
+if (navigation && !window.__aladdinNavigationCounted) {
+    bytes += navigation.transferSize || 0;
+    loadTime = (navigation.domContentLoadedEventEnd || navigation.responseEnd) - navigation.startTime;
+    window.__aladdinNavigationCounted = true;
+}
+
+performance.clearResourceTimings();
+
+return {bytes: bytes, resources: resources.length, loadTime: loadTime};
+"""
+
+# PAGE READINESS
+# Resolves (execute_async_script) with [element, elapsedMs] as soon as `selector` matches and, when given,
+# contains a `childSelector` match. A MutationObserver re-checks on every DOM change instead of polling.
+# A container that stays without children for `settleMs` after the document loaded (an empty page) is
+# returned as is, and [null, elapsedMs] is returned once `timeoutMs` runs out.
+WAIT_FOR_ELEMENT_SCRIPT = """
+const [selector, childSelector, timeoutMs, settleMs] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+
+let observer = null;
+let timeoutTimer = null;
+let settleTimer = null;
+let finished = false;
+
+const finish = (element) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    document.removeEventListener('readystatechange', check);
+    window.removeEventListener('load', check);
+    clearTimeout(timeoutTimer);
+    clearTimeout(settleTimer);
+    done([element, performance.now() - start]);
+};
+
+const check = () => {
+    const element = document.querySelector(selector);
+    if (!element) return;
+
+    if (!childSelector || element.querySelector(childSelector)) {
+        finish(element);
+        return;
+    }
+
+    if (document.readyState === 'complete') {
+        clearTimeout(settleTimer);
+        settleTimer = setTimeout(() => finish(element), settleMs);
+    }
+};
+
+// Settles right away on a complete page, otherwise once it completes even without a later mutation
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+    document.addEventListener('readystatechange', check);
+    window.addEventListener('load', check);
+    timeoutTimer = setTimeout(() => finish(null), timeoutMs);
+}
+"""
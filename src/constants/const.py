@@ -16,3 +16,102 @@ CATEGORY_ID = "&rh=n%3A{category_id}"
 FLIPKART_CATEGORY = "{category_name}/pr?sid={category_id}"
 FLIPKART_QUERY_WITH_CAT = "&q={query}"
 FLIPKART_QUERY_WITHOUT_CAT = "search?q={query}"
+
+# CRAWLER STUFF
+# Number of parallel WebDriver workers, 1 keeps the sequential crawl
+CRAWL_WORKERS = int(getenv("CRAWL_WORKERS", "1"))
+
+# Recycle a pooled WebDriver after this many pages or once its RSS passes this many MB (0 disables)
+DRIVER_MAX_PAGES = int(getenv("DRIVER_MAX_PAGES", "40"))
+DRIVER_MAX_RSS_MB = int(getenv("DRIVER_MAX_RSS_MB", "1500"))
+
+# Headless browser that blocks heavy resources and uses the `eager` page-load strategy
+LEAN_BROWSER = getenv("LEAN_BROWSER", "false").lower() == "true"
+
+# Card extraction backend: "script" reads a whole page in one execute_script call,
+# "source" parses the page source in-process and "element" queries every field
+EXTRACTION_BACKEND = getenv("EXTRACTION_BACKEND", "script").lower()
+
+# Load the dedup index into memory at run start when it holds at most this many urls (0 disables)
+URL_SNAPSHOT_MAX_SIZE = int(getenv("URL_SNAPSHOT_MAX_SIZE", "200000"))
+
+# Bloom filter tier in front of the dedup index: "redis" (bitmap), "file" or empty to disable
+BLOOM_FILTER = getenv("BLOOM_FILTER", "").lower()
+BLOOM_FILTER_CAPACITY = int(getenv("BLOOM_FILTER_CAPACITY", "500000"))
+BLOOM_FILTER_ERROR_RATE = float(getenv("BLOOM_FILTER_ERROR_RATE", "0.01"))
+BLOOM_FILTER_PATH = getenv("BLOOM_FILTER_PATH", "dedup_bloom.bin")
+
+# Maximum number of Flipkart product pages loaded in parallel tabs to read missing ratings
+RATING_ENRICHMENT_CONCURRENCY = int(getenv("RATING_ENRICHMENT_CONCURRENCY", "4"))
+
+# How long (seconds) a Flipkart rating read from a product page stays cached
+FLIPKART_RATING_CACHE_TTL = int(getenv("FLIPKART_RATING_CACHE_TTL", str(60 * 60 * 24 * 3)))
+
+# Read missing Flipkart ratings over plain HTTP, the browser is only used behind a bot wall
+FLIPKART_HTTP_RATINGS = getenv("FLIPKART_HTTP_RATINGS", "true").lower() == "true"
+
+# Pagination: "click" follows the next button, "url" builds page=N urls and prefetches PAGE_PREFETCH pages at once
+PAGINATION_MODE = getenv("PAGINATION_MODE", "click").lower()
+PAGE_PREFETCH = max(1, int(getenv("PAGE_PREFETCH", "3")))
+
+# Minimum seconds between two requests to the same domain, plus up to POLITENESS_JITTER random seconds.
+# POLITENESS_DOMAIN_INTERVALS overrides the interval per domain, e.g. "amazon.in=3,flipkart.com=2"
+POLITENESS_ENABLED = getenv("POLITENESS_ENABLED", "true").lower() == "true"
+POLITENESS_MIN_INTERVAL = float(getenv("POLITENESS_MIN_INTERVAL", "2.5"))
+POLITENESS_JITTER = float(getenv("POLITENESS_JITTER", "1.5"))
+POLITENESS_DOMAIN_INTERVALS = {
+    domain.strip().lower(): float(interval)
+    for domain, interval in (item.split("=", 1) for item in getenv("POLITENESS_DOMAIN_INTERVALS", "").split(",") if "=" in item)
+}
+
+# Page readiness: "observer" resolves through a MutationObserver as soon as the cards are in the page,
+# "poll" checks the page every 0.5s through WebDriverWait
+READINESS_MODE = getenv("READINESS_MODE", "observer").lower()
+
+# Streaming inserts: products are sent to Supabase per category or every SUPABASE_SINK_BATCH_SIZE products
+# (0 only flushes per category), crawling blocks once SUPABASE_SINK_MAX_PENDING batches wait to be inserted
+SUPABASE_SINK_BATCH_SIZE = int(getenv("SUPABASE_SINK_BATCH_SIZE", "50"))
+SUPABASE_SINK_MAX_PENDING = int(getenv("SUPABASE_SINK_MAX_PENDING", "4"))
+
+# Supabase inserts are split in chunks of SUPABASE_INSERT_CHUNK_SIZE products, sent SUPABASE_INSERT_CONCURRENCY at a time
+SUPABASE_INSERT_CHUNK_SIZE = int(getenv("SUPABASE_INSERT_CHUNK_SIZE", "100"))
+SUPABASE_INSERT_CONCURRENCY = int(getenv("SUPABASE_INSERT_CONCURRENCY", "4"))
+
+# Orchestration: "sync" crawls with blocking clients, "async" runs Redis and Supabase I/O on the event loop
+# and the browsers in a bounded executor
+PIPELINE_MODE = getenv("PIPELINE_MODE", "sync").lower()
+
+# Record/replay: "record" saves every listing and product page visited under SNAPSHOT_DIR, "replay" crawls
+# those snapshots instead of the live sites, without browsers, dedup writes or Supabase inserts
+CRAWL_MODE = getenv("CRAWL_MODE", "live").lower()
+SNAPSHOT_DIR = getenv("SNAPSHOT_DIR", "snapshots")
+
+# Crawl progress is checkpointed in Redis, a run restarted within CHECKPOINT_WINDOW_HOURS of an unfinished
+# run reuses its categories, skips what it finished and resumes the rest from their last page
+CHECKPOINT_ENABLED = getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+CHECKPOINT_WINDOW_HOURS = float(getenv("CHECKPOINT_WINDOW_HOURS", "3"))
+
+# Distributed crawl: "coordinator" queues the (category, website) jobs of the run in Redis and aggregates
+# their results, "worker" leases jobs and crawls them, empty crawls everything in this process.
+# A lease not renewed within CRAWL_QUEUE_VISIBILITY_TIMEOUT seconds goes back to the queue, a job is
+# given up after CRAWL_QUEUE_MAX_ATTEMPTS leases. Workers exit after CRAWL_QUEUE_IDLE_TIMEOUT seconds
+# without jobs (0 waits forever), the coordinator stops waiting after CRAWL_QUEUE_TIMEOUT seconds
+CRAWL_ROLE = getenv("CRAWL_ROLE", "").lower()
+CRAWL_QUEUE_NAME = getenv("CRAWL_QUEUE_NAME", "default")
+CRAWL_QUEUE_VISIBILITY_TIMEOUT = int(getenv("CRAWL_QUEUE_VISIBILITY_TIMEOUT", "300"))
+CRAWL_QUEUE_MAX_ATTEMPTS = int(getenv("CRAWL_QUEUE_MAX_ATTEMPTS", "3"))
+CRAWL_QUEUE_IDLE_TIMEOUT = int(getenv("CRAWL_QUEUE_IDLE_TIMEOUT", "0"))
+CRAWL_QUEUE_TIMEOUT = int(getenv("CRAWL_QUEUE_TIMEOUT", "10800"))
+
+# Daemon: stay resident with warm browsers, Redis and Supabase connections and crawl at every
+# DAEMON_SCHEDULE time, comma separated HH:MM in IST (the morning, evening and midnight windows by default)
+DAEMON_ENABLED = getenv("DAEMON_ENABLED", "false").lower() == "true"
+DAEMON_SCHEDULE = [item.strip() for item in getenv(
+    "DAEMON_SCHEDULE", "08:00,19:00,00:30").split(",") if item.strip()]
+
+# Per-stage metrics, exported in the Prometheus text format: "file" writes METRICS_PATH at the end of
+# the run, "http" serves them on 127.0.0.1:METRICS_PORT/metrics
+METRICS_ENABLED = getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_EXPORT = getenv("METRICS_EXPORT", "").lower()
+METRICS_PATH = getenv("METRICS_PATH", "metrics.prom")
+METRICS_PORT = int(getenv("METRICS_PORT", "9464"))
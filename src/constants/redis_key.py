@@ -1,3 +1,24 @@
 PRODUCT_CATEGORY_CACHE_KEY = "product_categories_history"
 PRODUCT_URL_CACHE_KEY = "url_cache_"
 PRODUCT_URL_EXPIRE_TIME = 60 * 60 * 24 * 40
+
+# Sorted set of canonical product ids, the score is the unix time the entry expires at
+PRODUCT_DEDUP_INDEX_KEY = "product_dedup_index"
+PRODUCT_DEDUP_EXPIRE_TIME = 60 * 60 * 24 * 4
+
+# Bloom filter over the dedup index, stored as a Redis bitmap with its parameters in a hash
+PRODUCT_DEDUP_BLOOM_KEY = "product_dedup_bloom"
+PRODUCT_DEDUP_BLOOM_META_KEY = "product_dedup_bloom_meta"
+
+# Flipkart rating and rating count per canonical product id
+PRODUCT_RATING_CACHE_KEY = "product_rating_"
+
+# Crawl run of the current window (id, start time and categories) and its per (category, website) checkpoints
+CRAWL_RUN_KEY = "crawl_run"
+CRAWL_CHECKPOINT_KEY = "crawl_checkpoint_"
+CRAWL_DONE_CATEGORIES_KEY = "crawl_done_categories_"
+
+# Distributed crawl queue, suffixed with the queue name: pending job ids (list), leases (sorted set scored
+# by the unix time they expire at), lease owners, jobs and results (hashes keyed by job id)
+CRAWL_QUEUE_KEY = "crawl_queue:"
+CRAWL_QUEUE_EXPIRE_TIME = 60 * 60 * 24
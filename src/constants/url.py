@@ -5,6 +5,10 @@ from ..lib.types import ProductCategories, ProductUrlDetailsValue, Websites
 
 
 MAX_PRODUCTS_PER_WEBSITE = 30
+MAX_PAGES_PER_WEBSITE = 20
+
+# Websites whose listing pages accept a `page=N` query parameter
+PAGE_PARAM_WEBSITES = [Websites.AMAZON, Websites.FLIPKART]
 
 # UTILS FUNCTIONS
 
@@ -1,5 +1,3 @@
-from random import uniform
-from time import sleep
 from typing import List
 
 from ...db.redis import RedisDB
@@ -77,8 +75,7 @@ class AmazonScraper(WebsiteScraper):
         if next_button_elements is None or len(next_button_elements) == 0:
             return False
 
+        self.driver_utility.throttle(current_url)
         next_button_elements[0].click()
         self.driver_utility._webdriver_wait(
             lambda d: d.current_url != current_url)
-
-        sleep(uniform(1, 3))
@@ -0,0 +1,98 @@
+from asyncio import AbstractEventLoop, run_coroutine_threadsafe
+from concurrent.futures import Future
+from typing import Dict, List, Set, Tuple
+
+from ..db.async_redis import AsyncRedisDB
+from ..lib.metrics import metric_labels
+from .utils.crawler_utils import WebsiteScraper
+from .flipkart.rating_fetcher import FlipkartRatingFetcher
+from ..lib.types import FilteredPage, Product, RatingDetails, Websites
+
+
+class AsyncPageFilter:
+    """
+    Runs the I/O bound part of a listing page (dedup lookups and rating enrichment)
+    on an event loop, so the browser thread can load the next page meanwhile.
+
+    Browser threads hand over the parsed cards with `submit` and collect the
+    result once the next page is loaded. Ratings behind a bot wall are left for
+    the browser thread, which is the only one allowed to drive its tabs.
+    """
+
+    def __init__(self, loop: AbstractEventLoop, redis: AsyncRedisDB, rating_fetcher: FlipkartRatingFetcher | None = None):
+        """
+        Args:
+            loop (AbstractEventLoop): The running loop of the pipeline.
+            redis (AsyncRedisDB): The async Redis client.
+            rating_fetcher (FlipkartRatingFetcher | None): HTTP fetcher of missing Flipkart ratings.
+        """
+        self.loop = loop
+        self.redis = redis
+        self.rating_fetcher = rating_fetcher
+
+    def submit(self, scraper: WebsiteScraper, cards_details: List[Product]) -> "Future[FilteredPage]":
+        """
+        Filter a page on the event loop, from a browser thread.
+
+        Args:
+            scraper (WebsiteScraper): The scraper of the page.
+            cards_details (List[Product]): The parsed product details of the page.
+
+        Returns:
+            Future[FilteredPage]: The deals of the page and the products still missing a rating.
+        """
+        return run_coroutine_threadsafe(self.filter_page(scraper, cards_details), self.loop)
+
+    async def filter_page(self, scraper: WebsiteScraper, cards_details: List[Product]) -> FilteredPage:
+        """
+        Validate the products of a page like `WebsiteScraper.filter_products`, with async lookups.
+        """
+        with metric_labels(scraper.website_name.value, scraper.category.value):
+            return await self._filter_page(scraper, cards_details)
+
+    async def _filter_page(self, scraper: WebsiteScraper, cards_details: List[Product]) -> FilteredPage:
+        candidates, candidate_urls = scraper.select_candidates(cards_details)
+        # A failed lookup counts as "not cached", like the synchronous path
+        cached_urls = (await self.redis.get_cached_urls(candidate_urls) if candidate_urls else None) or set()
+
+        products = scraper.keep_deals(candidates, cached_urls)
+
+        if scraper.website_name != Websites.FLIPKART:
+            return {"products": products, "blocked": []}
+
+        rated_products = [
+            product for product in products if product["rating"] is not None]
+        products_without_rating = [
+            product for product in products if product["rating"] is None]
+
+        if not products_without_rating:
+            return {"products": rated_products, "blocked": []}
+
+        ratings, blocked_urls = await self._fetch_ratings(
+            [product["product_url"] for product in products_without_rating])
+
+        blocked = [product for product in products_without_rating
+                   if product["product_url"] in blocked_urls]
+        fetched = [product for product in products_without_rating
+                   if product["product_url"] not in blocked_urls]
+
+        return {"products": rated_products + scraper.apply_ratings(fetched, ratings), "blocked": blocked}
+
+    async def _fetch_ratings(self, urls: List[str]) -> Tuple[Dict[str, RatingDetails], Set[str]]:
+        """
+        Serve ratings from the cache, then over HTTP, and return the urls behind a bot wall.
+        """
+        ratings: Dict[str, RatingDetails] = await self.redis.get_cached_ratings(urls) or {}
+        misses = [url for url in urls if url not in ratings]
+
+        if not misses:
+            return ratings, set()
+
+        if self.rating_fetcher is None:
+            return ratings, set(misses)
+
+        fetched, blocked = await self.rating_fetcher.fetch_ratings_threadsafe(misses)
+        await self.redis.cache_ratings(fetched)
+
+        ratings.update(fetched)
+        return ratings, set(blocked)
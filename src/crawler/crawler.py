@@ -1,15 +1,27 @@
 
-from time import sleep
-from typing import List
-from logging import error, warning
+from typing import List, Tuple
+from concurrent.futures import Future
+from logging import error, info, warning
 
 from ..db.redis import RedisDB
-from ..constants.url import MAX_PRODUCTS_PER_WEBSITE
+from ..db.crawl_checkpoint import CrawlCheckpoints
+from ..helpers.helper_functions import set_page_param
+from .utils.crawler_utils import WebsiteScraper
+from ..constants.const import CRAWL_MODE, PAGE_PREFETCH, PAGINATION_MODE
+from ..constants.url import MAX_PAGES_PER_WEBSITE, MAX_PRODUCTS_PER_WEBSITE, PAGE_PARAM_WEBSITES
+from .utils.snapshot_store import SnapshotStore
+from .utils.web_driver_pool import WebDriverPool
 from .utils.web_driver_utility import WebDriverUtility
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from ..lib.types import Product, ProductCategories, Websites
+from ..lib.metrics import metric_labels
+from ..lib.types import CrawlCheckpoint, FilteredPage, Product, ProductCategories, Websites
 from ..utils.best_discount_analyzer import BestDiscountAnalyzer
 from .utils.website_crawler_factory import WebsiteScraperFactory
+from .async_page_filter import AsyncPageFilter
+
+# Give up on a website after its browser crashed this many times
+MAX_DRIVER_CRASHES = 2
 
 
 class Crawler:
@@ -17,18 +29,33 @@ class Crawler:
     Main class to coordinate the scraping operations across different websites.
     """
 
-    def __init__(self, redis: RedisDB, discount_analyzer: BestDiscountAnalyzer):
+    def __init__(self, redis: RedisDB, discount_analyzer: BestDiscountAnalyzer, driver_pool: WebDriverPool | None = None,
+                 page_filter: AsyncPageFilter | None = None, crawl_mode: str = CRAWL_MODE, snapshots: SnapshotStore | None = None,
+                 checkpoints: CrawlCheckpoints | None = None):
         """
         Initialize the SeleniumHelper with necessary components.
 
         Args:
             redis (RedisDB): The Redis client instance.
+            driver_pool (WebDriverPool | None): Borrow drivers from this pool instead of owning one.
+            page_filter (AsyncPageFilter | None): Filter pages on an event loop while the next one loads.
+            crawl_mode (str): "live", "record" to save the visited pages or "replay" to crawl the saved pages.
+            snapshots (SnapshotStore | None): Where pages are recorded to and replayed from, the process-wide store if omitted.
+            checkpoints (CrawlCheckpoints | None): Save the progress of every website, and resume from it.
         """
         self.redis_client = redis
         self.discount_analyzer = discount_analyzer
-        self.driver_utility = WebDriverUtility()
+        self.driver_pool = driver_pool
+        self.page_filter = page_filter
+        self.crawl_mode = crawl_mode
+        self.snapshots = snapshots if snapshots is not None else SnapshotStore.shared()
+        self.checkpoints = checkpoints
+        # Replays never open a browser
+        self.driver_utility = WebDriverUtility(
+        ) if driver_pool is None and crawl_mode != "replay" else None
 
-    def get_product(self, website_name: Websites, category: ProductCategories, url: str) -> List[Product] | None:
+    def get_product(self, website_name: Websites, category: ProductCategories, url: str,
+                    keep_partial: bool = True) -> List[Product] | None:
         """
         Get products details from a given URL for a specific website and category.
 
@@ -36,75 +63,376 @@ class Crawler:
             website_name (Websites): The website to scrape from.
             category (ProductCategories): The product category.
             url (str): The URL to scrape products from.
+            keep_partial (bool): Return the products of the pages crawled before an error, False returns None instead.
 
         Returns:
             List[Product] | None: A list of Product objects or None if no products found.
         """
+        products, finished = self.crawl_website(website_name, category, url)
+
+        return products if finished or keep_partial else None
+
+    def crawl_website(self, website_name: Websites, category: ProductCategories, url: str) -> Tuple[List[Product] | None, bool]:
+        """
+        Crawl a website of a category, telling whether the crawl went through.
+
+        A crawl stopped by an error is not checkpointed as done, a resumed run continues
+        it from the last page it reached.
+
+        Args:
+            website_name (Websites): The website to scrape from.
+            category (ProductCategories): The product category.
+            url (str): The URL to scrape products from.
+
+        Returns:
+            Tuple[List[Product] | None, bool]: The products, None if none were found, and False if an error stopped the crawl.
+        """
+        with metric_labels(website_name.value, category.value):
+            if self.crawl_mode == "replay":
+                return self._replay(website_name, category), True
+
+            checkpoint = self.checkpoints.load(
+                category, website_name) if self.checkpoints is not None else None
+
+            if checkpoint is not None and checkpoint["done"]:
+                info(
+                    f"♻️ {website_name.value} ({category.value}) was already crawled in this run, reusing its {len(checkpoint['products'])} products")
+                return checkpoint["products"], True
+
+            if self.driver_pool is None:
+                products, finished = self._crawl(
+                    self.driver_utility, website_name, category, url, checkpoint)
+            else:
+                with self.driver_pool.lease() as driver_utility:
+                    products, finished = self._crawl(
+                        driver_utility, website_name, category, url, checkpoint)
+
+            if finished and self.checkpoints is not None:
+                self.checkpoints.complete(
+                    category, website_name, products or [])
+
+            return products, finished
+
+    def _crawl(self, driver_utility: WebDriverUtility, website_name: Websites, category: ProductCategories, url: str,
+               checkpoint: CrawlCheckpoint | None = None) -> Tuple[List[Product] | None, bool]:
+        """
+        Crawl the listing pages of a website with the given driver, from the checkpointed page if any.
+
+        Returns the products and whether the crawl finished, False when an error stopped it.
+        """
         scraper = WebsiteScraperFactory.get_scraper(
-            website_name, category, self.driver_utility, self.redis_client, self.discount_analyzer)
+            website_name, category, driver_utility, self.redis_client, self.discount_analyzer)
 
-        all_products = []
-        page_counter = 1
+        if self.crawl_mode == "record":
+            # A resumed crawl keeps the pages recorded before its checkpoint
+            scraper.record_to(self.snapshots, checkpoint["page"]
+                              if checkpoint is not None and not checkpoint["done"] else 1)
+
+        if PAGINATION_MODE == "url" and website_name in PAGE_PARAM_WEBSITES:
+            return self._crawl_by_page_url(driver_utility, scraper, website_name, url, checkpoint)
+
+        if self.page_filter is not None:
+            return self._crawl_pipelined(driver_utility, scraper, website_name, url, checkpoint)
+
+        page_counter, page_url, all_products = self._resume(
+            scraper, url, checkpoint)
         empty_page_count = 0
+        crash_count = 0
+
+        # The page to (re)load on the next iteration, None means stay on the current page
+        last_page_url = page_url
 
         try:
             while len(all_products) < MAX_PRODUCTS_PER_WEBSITE:
-                url: str | None = url if page_counter == 1 else None
-                container = scraper.get_product_container(url)
+                try:
+                    # A page loaded again after a crash is recorded under the same number
+                    scraper.page_number = page_counter
+                    container = scraper.get_product_container(page_url)
 
-                if container is None:
-                    return all_products if all_products else None
+                    if container is None:
+                        if not driver_utility.is_alive():
+                            raise WebDriverException(
+                                "Browser session is no longer reachable")
 
-                page_products = scraper.extract_products(container)
+                        return (all_products if all_products else None), True
 
-                #  Check if we have less than 15 products and page_counter is greater than 20
-                # This is to prevent scraping too many pages if not enough products are found
-                if len(all_products) < 15 and page_counter >= 20:
-                    warning(
-                        f"⚠️  Less than 15 products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
-                    break
+                    if driver_utility.driver is not None:
+                        last_page_url = driver_utility.driver.current_url
 
-                # Prevent infinite loop if no products are found
-                if page_products is None or len(page_products) == 0:
-                    empty_page_count += 1
+                    page_url = None
+                    self._save_progress(
+                        scraper, page_counter, last_page_url, all_products)
+                    page_products = scraper.extract_products(container)
 
-                    if empty_page_count >= 8:
+                    #  Check if we have less than 15 products and page_counter is greater than 20
+                    # This is to prevent scraping too many pages if not enough products are found
+                    if len(all_products) < 15 and page_counter >= MAX_PAGES_PER_WEBSITE:
                         warning(
-                            f"⚠️  No products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
+                            f"⚠️  Less than 15 products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
                         break
 
-                else:
-                    if empty_page_count > 0:
-                        empty_page_count = 0
+                    # Prevent infinite loop if no products are found
+                    if page_products is None or len(page_products) == 0:
+                        empty_page_count += 1
+
+                        if empty_page_count >= 8:
+                            warning(
+                                f"⚠️  No products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
+                            break
 
-                    # Add new product into the list
+                    else:
+                        if empty_page_count > 0:
+                            empty_page_count = 0
+
+                        # Add new product into the list
+                        all_products.extend(page_products)
+
+                    if len(all_products) > MAX_PRODUCTS_PER_WEBSITE:
+                        all_products = all_products[:MAX_PRODUCTS_PER_WEBSITE]
+                        break
+
+                    if not scraper.has_next_page():
+                        break
+
+                    go_next_page = scraper.go_to_next_page()
+
+                    if go_next_page == False:
+                        break
+                except WebDriverException:
+                    # Replace a crashed browser and resume from the last page we reached
+                    if driver_utility.is_alive() or crash_count >= MAX_DRIVER_CRASHES:
+                        raise
+
+                    crash_count += 1
+                    self._replace_crashed_driver(driver_utility)
+                    page_url = last_page_url
+                    continue
+
+                page_counter += 1
+
+            return all_products, True
+        except Exception as e:
+            error(f"Error scraping {website_name} products: {str(e)}")
+            return (all_products if all_products else None), False
+
+    def _crawl_by_page_url(self, driver_utility: WebDriverUtility, scraper: WebsiteScraper, website_name: Websites, url: str,
+                           checkpoint: CrawlCheckpoint | None = None) -> Tuple[List[Product] | None, bool]:
+        """
+        Crawl listing pages by building their `page=N` urls, prefetching several pages at once.
+
+        Stops at the first page that returns no cards.
+        """
+        page_counter, _, all_products = self._resume(scraper, url, checkpoint)
+        crash_count = 0
+
+        try:
+            while len(all_products) < MAX_PRODUCTS_PER_WEBSITE and page_counter <= MAX_PAGES_PER_WEBSITE:
+                last_page = min(page_counter + PAGE_PREFETCH,
+                                MAX_PAGES_PER_WEBSITE + 1)
+                page_urls = [set_page_param(url, page)
+                             for page in range(page_counter, last_page)]
+                self._save_progress(scraper, page_counter, None, all_products)
+
+                try:
+                    pages = scraper.extract_pages(page_urls, page_counter)
+                except WebDriverException:
+                    if driver_utility.is_alive() or crash_count >= MAX_DRIVER_CRASHES:
+                        raise
+
+                    crash_count += 1
+                    self._replace_crashed_driver(driver_utility)
+                    continue
+
+                for page_products in pages:
                     all_products.extend(page_products)
 
-                if len(all_products) > MAX_PRODUCTS_PER_WEBSITE:
-                    all_products = all_products[:MAX_PRODUCTS_PER_WEBSITE]
+                # A page without cards means we went past the last page
+                if len(pages) < len(page_urls):
                     break
 
-                if not scraper.has_next_page():
-                    break
+                page_counter = last_page
 
-                go_next_page = scraper.go_to_next_page()
+            return all_products[:MAX_PRODUCTS_PER_WEBSITE], True
+        except Exception as e:
+            error(f"Error scraping {website_name} products: {str(e)}")
+            return (all_products[:MAX_PRODUCTS_PER_WEBSITE] if all_products else None), False
 
-                if go_next_page == False:
-                    break
+    def _crawl_pipelined(self, driver_utility: WebDriverUtility, scraper: WebsiteScraper, website_name: Websites, url: str,
+                         checkpoint: CrawlCheckpoint | None = None) -> Tuple[List[Product] | None, bool]:
+        """
+        Crawl the listing pages of a website, filtering each page on the event loop while the next one loads.
+        """
+        page_filter = self.page_filter
+        page_counter, page_url, all_products = self._resume(
+            scraper, url, checkpoint)
+        empty_page_count = 0
+        crash_count = 0
+
+        last_page_url = page_url
+        pending: "Future[FilteredPage] | None" = None
+
+        def add_page(page_products: List[Product]) -> bool:
+            """Add the deals of a filtered page, returns False once the crawl should stop"""
+            nonlocal empty_page_count
+
+            # Prevent infinite loop if no products are found
+            if len(page_products) == 0:
+                empty_page_count += 1
+
+                if empty_page_count >= 8:
+                    warning(
+                        f"⚠️  No products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
+                    return False
+
+                return True
+
+            empty_page_count = 0
+            all_products.extend(page_products)
+
+            return len(all_products) < MAX_PRODUCTS_PER_WEBSITE
+
+        try:
+            while True:
+                try:
+                    # A page loaded again after a crash is recorded under the same number
+                    scraper.page_number = page_counter
+                    container = scraper.get_product_container(page_url)
+
+                    if container is None:
+                        if not driver_utility.is_alive():
+                            raise WebDriverException(
+                                "Browser session is no longer reachable")
+
+                        break
+
+                    if driver_utility.driver is not None:
+                        last_page_url = driver_utility.driver.current_url
+
+                    page_url = None
+                    cards_details = scraper.get_cards_details(container)
+
+                    # The previous page was filtered while this one loaded
+                    if pending is not None:
+                        keep_crawling = add_page(
+                            self._collect_page(scraper, pending))
+                        pending = None
+
+                        if not keep_crawling:
+                            break
+
+                    # Every page before this one is in all_products
+                    self._save_progress(
+                        scraper, page_counter, last_page_url, all_products)
+                    pending = page_filter.submit(scraper, cards_details)
+
+                    if len(all_products) < 15 and page_counter >= MAX_PAGES_PER_WEBSITE:
+                        warning(
+                            f"⚠️  Less than 15 products found on page {page_counter} for {website_name.value}. Stopping further scraping.")
+                        break
+
+                    if not scraper.has_next_page():
+                        break
+
+                    if scraper.go_to_next_page() == False:
+                        break
+                except WebDriverException:
+                    # Replace a crashed browser and resume from the last page we reached
+                    if driver_utility.is_alive() or crash_count >= MAX_DRIVER_CRASHES:
+                        raise
+
+                    crash_count += 1
+                    self._replace_crashed_driver(driver_utility)
+                    page_url = last_page_url
+                    continue
 
                 page_counter += 1
-                sleep(1)
 
-            return all_products
+            if pending is not None:
+                add_page(self._collect_page(scraper, pending))
+
+            return all_products[:MAX_PRODUCTS_PER_WEBSITE], True
         except Exception as e:
             error(f"Error scraping {website_name} products: {str(e)}")
-            return all_products if all_products else None
+            return (all_products[:MAX_PRODUCTS_PER_WEBSITE] if all_products else None), False
+
+    def _resume(self, scraper: WebsiteScraper, url: str, checkpoint: CrawlCheckpoint | None) -> Tuple[int, str, List[Product]]:
+        """
+        Get the page number, the page url and the products to start a crawl from.
+        """
+        if checkpoint is None or checkpoint["done"]:
+            return 1, url, []
+
+        products = list(checkpoint["products"])
+        # Products of the earlier pages are not kept twice
+        scraper.processed_product_urls.update(
+            product["product_url"] for product in products)
+
+        info(
+            f"♻️ Resuming {scraper.website_name.value} ({scraper.category.value}) from page {checkpoint['page']} with {len(products)} products")
+
+        return checkpoint["page"], checkpoint["page_url"] or url, products
+
+    def _save_progress(self, scraper: WebsiteScraper, page: int, page_url: str | None, products: List[Product]):
+        """
+        Checkpoint the page a crawl is on, along with the products of the pages before it.
+        """
+        if self.checkpoints is None:
+            return
+
+        self.checkpoints.save_progress(
+            scraper.category, scraper.website_name, page, page_url, products)
+
+    def _replay(self, website_name: Websites, category: ProductCategories) -> List[Product] | None:
+        """
+        Crawl the recorded listing pages of a website instead of the live site, without a browser or sleeps.
+        """
+        snapshots = self.snapshots.listing_pages(website_name, category)
+
+        if not snapshots:
+            warning(
+                f"⚠️  No recorded pages for {website_name.value} ({category.value}) in {self.snapshots.directory}")
+            return None
+
+        scraper = WebsiteScraperFactory.get_scraper(
+            website_name, category, None, self.redis_client, self.discount_analyzer)  # type: ignore
+        all_products: List[Product] = []
+
+        for snapshot in snapshots:
+            all_products.extend(scraper.extract_products_from_html(
+                snapshot["html"], snapshot["url"], self.snapshots))
+
+            if len(all_products) >= MAX_PRODUCTS_PER_WEBSITE:
+                break
+
+        return all_products[:MAX_PRODUCTS_PER_WEBSITE]
+
+    def _collect_page(self, scraper: WebsiteScraper, pending: "Future[FilteredPage]") -> List[Product]:
+        """
+        Wait for a page filtered on the event loop and rate its bot-walled products in the browser.
+        """
+        filtered_page = pending.result()
+
+        if not filtered_page["blocked"]:
+            return filtered_page["products"]
+
+        return filtered_page["products"] + scraper.rate_blocked_products(filtered_page["blocked"])
+
+    def _replace_crashed_driver(self, driver_utility: WebDriverUtility):
+        """
+        Launch a fresh browser in place of a crashed one.
+        """
+        if self.driver_pool is not None:
+            self.driver_pool.replace_crashed(driver_utility)
+        else:
+            warning("💥 WebDriver session crashed, launching a replacement")
+            driver_utility.restart_driver()
 
     def close(self):
         """
         Clean up resources.
         """
-        self.driver_utility.close_driver()
+        if self.driver_utility is not None:
+            self.driver_utility.close_driver()
 
 
 # For Testing Purpose
@@ -1,7 +1,5 @@
 
 from logging import info
-from time import sleep
-from random import uniform
 from typing import Dict, List
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
@@ -12,10 +10,13 @@ from ...db.redis import RedisDB
 from ...lib.types import ProductCategories
 from ...utils.best_discount_analyzer import BestDiscountAnalyzer
 
-from ...lib.types import Product, Websites
+from ...lib.types import Product, RatingDetails, Websites
 from ..utils.crawler_utils import WebsiteScraper
-from ..utils.data_processor import DataProcessingHelper
-from ..utils.css_selector.css_selector import NEXT_BUTTON, PRODUCT_CARDS, PRODUCT_DETAILS
+from .rating_fetcher import FlipkartRatingFetcher
+from ..utils.snapshot_store import SnapshotStore
+from ...constants.const import FLIPKART_HTTP_RATINGS
+from .rating_enricher import FlipkartRatingEnricher, read_product_rating
+from ..utils.css_selector.css_selector import NEXT_BUTTON
 
 
 class FlipkartScraper(WebsiteScraper):
@@ -27,6 +28,21 @@ class FlipkartScraper(WebsiteScraper):
         super().__init__(category, driver_utility,
                          redis_client, discount_analyzer, website_name)
 
+        self.rating_enricher = FlipkartRatingEnricher(
+            driver_utility, redis_client,
+            http_fetcher=FlipkartRatingFetcher.shared() if FLIPKART_HTTP_RATINGS else None)
+
+    def record_to(self, snapshots: SnapshotStore, from_page: int = 1):
+        """
+        Save every listing page and every product page read in the browser as a snapshot.
+
+        Args:
+            snapshots (SnapshotStore): The store to save the pages to.
+            from_page (int): The page the crawl starts from, the pages before it recorded earlier are kept.
+        """
+        super().record_to(snapshots, from_page)
+        self.rating_enricher.recorder = snapshots
+
     def get_product_container(self, url: str | None) -> WebElement | None:
         """
         Get the main container for Flipkart products.
@@ -49,35 +65,80 @@ class FlipkartScraper(WebsiteScraper):
         Returns:
             List[Product] | None: List of extracted products.
         """
-        driver_utility = self.driver_utility
+        # Extract all basic data from product card
+        products = self.filter_products(self.get_cards_details(container))
 
-        isProductHasRating = False
-        products: List[Product] = []
-        product_without_rating: List[Product] = []
+        rated_products = [
+            product for product in products if product["rating"] is not None]
+        product_without_rating = [
+            product for product in products if product["rating"] is None]
 
-        products_cards = driver_utility.find_elements_from_parent(
-            container, PRODUCT_CARDS[Websites.FLIPKART])
-        if products_cards is None or len(products_cards) == 0:
-            return []
+        if not product_without_rating:
+            return rated_products
 
-        # Extract all basic data from product card
-        for card in products_cards:
-            product_details = None
+        # Let's extract product rating and rating count, without leaving the listing page
+        ratings = self.rating_enricher.enrich(
+            [product["product_url"] for product in product_without_rating])
 
-            product_details = self.extract_product_details(card)
+        return rated_products + self.apply_ratings(product_without_rating, ratings)
 
-            # append if product details is not None
-            if product_details is not None:
-                products.append(product_details)
+    def extract_products_from_html(self, html: str, url: str, snapshots: SnapshotStore | None = None) -> List[Product]:
+        """
+        Extract Flipkart products from a recorded listing page, rating them from the recorded product pages.
 
-        # Let's extract product rating and rating count
-        for product in products:
-            if product["rating"] is not None:
-                isProductHasRating = True
-                break
+        Args:
+            html (str): The listing page source.
+            url (str): The url the page was recorded from.
+            snapshots (SnapshotStore | None): The recorded product pages.
+
+        Returns:
+            List[Product]: List of extracted products.
+        """
+        products = super().extract_products_from_html(html, url)
+
+        rated_products = [
+            product for product in products if product["rating"] is not None]
+        product_without_rating = [
+            product for product in products if product["rating"] is None]
 
-            product_rating_details = self.extract_product_rating(
-                product["product_url"], driver_utility)
+        if not product_without_rating or snapshots is None:
+            return rated_products
+
+        ratings = self.rating_enricher.enrich_from_snapshots(
+            [product["product_url"] for product in product_without_rating], snapshots)
+
+        return rated_products + self.apply_ratings(product_without_rating, ratings)
+
+    def rate_blocked_products(self, products: List[Product]) -> List[Product]:
+        """
+        Read the ratings of products behind a bot wall in background tabs.
+
+        Args:
+            products (List[Product]): Products without rating.
+
+        Returns:
+            List[Product]: The rated products that are deals.
+        """
+        ratings = self.rating_enricher.enrich_in_browser(
+            [product["product_url"] for product in products])
+
+        return self.apply_ratings(products, ratings)
+
+    def apply_ratings(self, products: List[Product], ratings: Dict[str, RatingDetails]) -> List[Product]:
+        """
+        Fill in the fetched ratings and keep the products that are still deals.
+
+        Args:
+            products (List[Product]): Products without rating.
+            ratings (Dict[str, RatingDetails]): Rating details per product url.
+
+        Returns:
+            List[Product]: The rated products that are deals.
+        """
+        rated_products: List[Product] = []
+
+        for product in products:
+            product_rating_details = ratings.get(product["product_url"])
 
             if product_rating_details is None:
                 continue
@@ -91,9 +152,9 @@ class FlipkartScraper(WebsiteScraper):
             info(
                 f"✅ Best Deal found! 🛍️  {product['name']} | 💰 Price: ₹{product['price']} | 💰 Discount Price: ₹{product['discount_price']} | ⭐ Rating: {product['rating']} | 📱 {self.website_name.value}")
 
-            product_without_rating.append(product)
+            rated_products.append(product)
 
-        return products if isProductHasRating else product_without_rating
+        return rated_products
 
     def has_next_page(self) -> bool:
         """
@@ -146,6 +207,7 @@ class FlipkartScraper(WebsiteScraper):
         if next_page_btn is None or len(next_page_btn) == 0:
             return False
 
+        self.driver_utility.throttle(current_url)
         if len(next_page_btn) == 1:
             next_page_btn[0].click()
         else:
@@ -154,9 +216,7 @@ class FlipkartScraper(WebsiteScraper):
         self.driver_utility._webdriver_wait(
             lambda d: d.current_url != current_url)
 
-        sleep(uniform(1, 3))
-
-    def extract_product_rating(self, url: str, driverUtility: WebDriverUtility) -> Dict | None:
+    def extract_product_rating(self, url: str, driverUtility: WebDriverUtility) -> RatingDetails | None:
         """
         Extract Flipkart products rating and rating count.
 
@@ -170,17 +230,4 @@ class FlipkartScraper(WebsiteScraper):
         if container is None:
             return None
 
-        product_rating = driverUtility.find_element_from_parent(
-            container, PRODUCT_DETAILS[self.website_name]["rating"])
-        product_rating_count = driverUtility.find_element_from_parent(
-            container, PRODUCT_DETAILS[self.website_name]["rating_count"])
-
-        rating = DataProcessingHelper.format_extracted_data(
-            "rating", product_rating, self.website_name)
-        rating_count = DataProcessingHelper.format_extracted_data(
-            "rating_count", product_rating_count, self.website_name)
-
-        if rating is None or rating_count is None:
-            return None
-
-        return {"rating": rating, "rating_count": rating_count}
+        return read_product_rating(driverUtility, container)
@@ -0,0 +1,221 @@
+from logging import warning
+from typing import Dict, List
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+from ...db.redis import RedisDB
+from ...lib.types import RatingDetails, Websites
+from ..utils.snapshot_store import SnapshotStore
+from .rating_fetcher import FlipkartRatingFetcher, parse_rating_html
+from ..utils.data_processor import DataProcessingHelper
+from ..utils.web_driver_utility import WebDriverUtility
+from ...constants.const import RATING_ENRICHMENT_CONCURRENCY
+from ..utils.css_selector.css_selector import PRODUCT_CONTAINER, PRODUCT_DETAILS
+
+
+def read_product_rating(driver_utility: WebDriverUtility, container: WebElement) -> RatingDetails | None:
+    """
+    Read the rating and rating count from a loaded Flipkart product page.
+
+    Args:
+        driver_utility (WebDriverUtility): The WebDriver utility instance.
+        container (WebElement): The product page container.
+
+    Returns:
+        RatingDetails | None: The rating details, None if either value is missing.
+    """
+    product_rating = driver_utility.find_element_from_parent(
+        container, PRODUCT_DETAILS[Websites.FLIPKART]["rating"])
+    product_rating_count = driver_utility.find_element_from_parent(
+        container, PRODUCT_DETAILS[Websites.FLIPKART]["rating_count"])
+
+    rating = DataProcessingHelper.format_extracted_data(
+        "rating", product_rating, Websites.FLIPKART)
+    rating_count = DataProcessingHelper.format_extracted_data(
+        "rating_count", product_rating_count, Websites.FLIPKART)
+
+    if rating is None or rating_count is None:
+        return None
+
+    return {"rating": rating, "rating_count": rating_count}
+
+
+class FlipkartRatingEnricher:
+    """
+    Fetches missing Flipkart ratings from product pages as a separate stage.
+
+    Ratings are served from the Redis rating cache first, misses are fetched over
+    plain HTTP, and only pages behind a bot wall are opened in background tabs of
+    the listing browser. A batch of up to `concurrency` tabs loads in parallel and
+    the listing tab is never navigated away so pagination stays intact.
+    """
+
+    def __init__(self, driver_utility: WebDriverUtility, redis_client: RedisDB, concurrency: int = RATING_ENRICHMENT_CONCURRENCY,
+                 http_fetcher: FlipkartRatingFetcher | None = None):
+        """
+        Initialize the enricher.
+
+        Args:
+            driver_utility (WebDriverUtility): The listing driver utility.
+            redis_client (RedisDB): The Redis client holding the rating cache.
+            concurrency (int): Maximum number of product pages loading at once.
+            http_fetcher (FlipkartRatingFetcher | None): HTTP fetcher, None only uses the browser.
+        """
+        self.driver_utility = driver_utility
+        self.redis_client = redis_client
+        self.concurrency = max(1, concurrency)
+        self.http_fetcher = http_fetcher
+        # Saves the product pages read in tabs, when recording
+        self.recorder: SnapshotStore | None = None
+
+    def enrich(self, urls: List[str]) -> Dict[str, RatingDetails]:
+        """
+        Fetch the rating details of the given product urls.
+
+        Args:
+            urls (List[str]): The product urls.
+
+        Returns:
+            Dict[str, RatingDetails]: Rating details per url, urls without rating are left out.
+        """
+        if not urls:
+            return {}
+
+        results: Dict[str, RatingDetails] = self.redis_client.get_cached_ratings(
+            urls) or {}
+        misses = [url for url in urls if url not in results]
+
+        fetched: Dict[str, RatingDetails] = {}
+        if self.http_fetcher is not None and misses:
+            fetched, misses = self.http_fetcher.fetch_ratings(misses)
+
+        fetched.update(self._fetch_from_tabs(misses))
+        self.redis_client.cache_ratings(fetched)
+
+        results.update(fetched)
+        return results
+
+    def enrich_in_browser(self, urls: List[str]) -> Dict[str, RatingDetails]:
+        """
+        Read ratings from background tabs only, for product pages the HTTP fetcher could not read.
+
+        Args:
+            urls (List[str]): The product urls.
+
+        Returns:
+            Dict[str, RatingDetails]: Rating details per url, urls without rating are left out.
+        """
+        ratings = self._fetch_from_tabs(urls)
+        self.redis_client.cache_ratings(ratings)
+
+        return ratings
+
+    def enrich_from_snapshots(self, urls: List[str], snapshots: SnapshotStore) -> Dict[str, RatingDetails]:
+        """
+        Read the rating details of the given product urls from the recorded product pages.
+
+        The rating cache is only read for the urls without a recorded page, those the recording
+        run found in the cache, so today's cache does not change what a replay finds.
+
+        Args:
+            urls (List[str]): The product urls.
+            snapshots (SnapshotStore): The store holding the recorded product pages.
+
+        Returns:
+            Dict[str, RatingDetails]: Rating details per url, urls without rating are left out.
+        """
+        if not urls:
+            return {}
+
+        results: Dict[str, RatingDetails] = {}
+        unrecorded_urls: List[str] = []
+
+        for url in urls:
+            snapshot = snapshots.product_page(Websites.FLIPKART, url)
+
+            if snapshot is None:
+                unrecorded_urls.append(url)
+                continue
+
+            rating_details = parse_rating_html(snapshot["html"])
+            if rating_details is not None:
+                results[url] = rating_details
+
+        if unrecorded_urls:
+            results.update(self.redis_client.get_cached_ratings(
+                unrecorded_urls) or {})
+
+        return results
+
+    def _fetch_from_tabs(self, urls: List[str]) -> Dict[str, RatingDetails]:
+        """
+        Load product pages in parallel background tabs and read their ratings.
+        """
+        driver = self.driver_utility.driver
+        results: Dict[str, RatingDetails] = {}
+
+        if driver is None or not urls:
+            return results
+
+        listing_handle = driver.current_window_handle
+        open_handles: List[str] = []
+
+        try:
+            for start in range(0, len(urls), self.concurrency):
+                batch = urls[start:start + self.concurrency]
+                handles = self.driver_utility.open_tabs(batch)
+                open_handles = list(handles)
+
+                for url, handle in zip(batch, handles):
+                    rating_details = self._read_tab(handle, url)
+                    open_handles.remove(handle)
+
+                    if rating_details is not None:
+                        results[url] = rating_details
+
+                driver.switch_to.window(listing_handle)
+        except WebDriverException as e:
+            warning(f"⚠️ Rating enrichment stopped early: {str(e)}")
+        finally:
+            # Tabs of the batch not read yet, whatever stopped the enrichment
+            for handle in open_handles:
+                try:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                except WebDriverException:
+                    continue
+
+            try:
+                driver.switch_to.window(listing_handle)
+            except WebDriverException:
+                pass
+
+        return results
+
+    def _read_tab(self, handle: str, url: str) -> RatingDetails | None:
+        """
+        Read the rating from a product tab and close it.
+        """
+        driver = self.driver_utility.driver
+
+        if driver is None:
+            return None
+
+        # Never close anything but the product tab, the listing tab must survive
+        driver.switch_to.window(handle)
+
+        try:
+            container = self.driver_utility.find_element_with_wait(
+                PRODUCT_CONTAINER[Websites.FLIPKART], timeout=10)
+
+            if container is None:
+                return None
+
+            if self.recorder is not None:
+                self.recorder.save_product_page(
+                    Websites.FLIPKART, url, driver.page_source)
+
+            return read_product_rating(self.driver_utility, container)
+        finally:
+            driver.close()
@@ -0,0 +1,266 @@
+from json import JSONDecodeError, loads
+from logging import warning
+from threading import Lock, Thread
+from typing import Any, Dict, List, Tuple
+from asyncio import AbstractEventLoop, Semaphore, gather, new_event_loop, run_coroutine_threadsafe, wrap_future
+
+from httpx import AsyncClient, HTTPError, Limits, Response, Timeout
+from selectolax.lexbor import LexborHTMLParser
+
+from ...lib.types import RatingDetails, Websites
+from ..utils.data_processor import DataProcessingHelper
+from ..utils.politeness import Politeness
+from ..utils.snapshot_store import SnapshotStore
+from ...constants.const import CRAWL_MODE, RATING_ENRICHMENT_CONCURRENCY
+from ..utils.css_selector.css_selector import PRODUCT_DETAILS
+
+
+# Status codes and page markers of Flipkart's bot protection
+BOT_WALL_STATUS_CODES = {403, 429, 503, 529}
+BOT_WALL_MARKERS = ("recaptcha", "captcha", "are you a human",
+                    "unusual traffic", "access denied")
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+
+def is_bot_wall(response: Response) -> bool:
+    """
+    Check whether a response is a bot wall instead of the product page.
+
+    Args:
+        response (Response): The HTTP response.
+
+    Returns:
+        bool: True if the page is blocked.
+    """
+    if response.status_code in BOT_WALL_STATUS_CODES:
+        return True
+
+    head = response.text[:5000].lower()
+    return any(marker in head for marker in BOT_WALL_MARKERS)
+
+
+def _find_aggregate_rating(data: Any) -> Dict | None:
+    if isinstance(data, list):
+        for item in data:
+            found = _find_aggregate_rating(item)
+            if found is not None:
+                return found
+
+    elif isinstance(data, dict):
+        if isinstance(data.get("aggregateRating"), dict):
+            return data["aggregateRating"]
+
+        for key in ("@graph", "mainEntity"):
+            found = _find_aggregate_rating(data.get(key))
+            if found is not None:
+                return found
+
+    return None
+
+
+def parse_rating_html(html: str) -> RatingDetails | None:
+    """
+    Read the rating and rating count from a Flipkart product page HTML.
+
+    The embedded JSON-LD `aggregateRating` is used first, the rating elements of
+    the server-rendered markup second.
+
+    Args:
+        html (str): The product page HTML.
+
+    Returns:
+        RatingDetails | None: The rating details, None if the page has none.
+    """
+    tree = LexborHTMLParser(html)
+
+    for script in tree.css('script[type="application/ld+json"]'):
+        try:
+            aggregate_rating = _find_aggregate_rating(loads(script.text()))
+        except JSONDecodeError:
+            continue
+
+        if aggregate_rating is None:
+            continue
+
+        rating = aggregate_rating.get("ratingValue")
+        rating_count = aggregate_rating.get(
+            "ratingCount", aggregate_rating.get("reviewCount"))
+
+        if rating is None or rating_count is None:
+            continue
+
+        # Values like "4.2/5" or "1,234" are left to the rating elements
+        try:
+            return {"rating": float(rating), "rating_count": int(rating_count)}
+        except (TypeError, ValueError):
+            continue
+
+    selectors = PRODUCT_DETAILS[Websites.FLIPKART]
+    rating_element = tree.css_first(", ".join(selectors["rating"]))
+    rating_count_element = tree.css_first(", ".join(selectors["rating_count"]))
+
+    if rating_element is None or rating_count_element is None:
+        return None
+
+    try:
+        rating = DataProcessingHelper.format_raw_data(
+            "rating", rating_element.text(deep=True), Websites.FLIPKART)
+        rating_count = DataProcessingHelper.format_raw_data(
+            "rating_count", rating_count_element.text(deep=True), Websites.FLIPKART)
+    except (ValueError, IndexError):
+        return None
+
+    if rating is None or rating_count is None:
+        return None
+
+    return {"rating": rating, "rating_count": rating_count}
+
+
+class FlipkartRatingFetcher:
+    """
+    Fetches Flipkart product pages over HTTP, without a browser, to read their ratings.
+
+    Requests run on a dedicated event loop thread through one pooled HTTP/2 client,
+    so synchronous scrapers can call `fetch_ratings` and reuse warm connections.
+    """
+
+    _shared: "FlipkartRatingFetcher | None" = None
+    _shared_lock = Lock()
+
+    def __init__(self, concurrency: int = RATING_ENRICHMENT_CONCURRENCY, timeout: float = 10.0, client: AsyncClient | None = None,
+                 recorder: SnapshotStore | None = None, politeness: Politeness | None = None):
+        """
+        Start the event loop thread and the HTTP client.
+
+        Args:
+            concurrency (int): Maximum number of requests in flight.
+            timeout (float): Request timeout in seconds.
+            client (AsyncClient | None): Client to use instead of the default pooled HTTP/2 client.
+            recorder (SnapshotStore | None): Save every product page read, for replays.
+            politeness (Politeness | None): Spaces out the requests, the process-wide instance the browsers use if omitted.
+        """
+        self.concurrency = max(1, concurrency)
+        self.recorder = recorder
+        self.politeness = politeness if politeness is not None else Politeness.shared()
+
+        self._loop: AbstractEventLoop = new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever,
+                              name="rating-fetcher", daemon=True)
+        self._thread.start()
+
+        self.client = client if client is not None else AsyncClient(
+            http2=True,
+            headers=REQUEST_HEADERS,
+            follow_redirects=True,
+            timeout=Timeout(timeout),
+            limits=Limits(max_connections=self.concurrency,
+                          max_keepalive_connections=self.concurrency),
+        )
+
+    @classmethod
+    def shared(cls) -> "FlipkartRatingFetcher":
+        """
+        Get the process-wide fetcher, so every scraper shares the same warm connections.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(recorder=SnapshotStore.shared()
+                                  if CRAWL_MODE == "record" else None)
+
+            return cls._shared
+
+    async def fetch_rating(self, url: str, semaphore: Semaphore) -> Tuple[str, RatingDetails | None, bool]:
+        """
+        Fetch a product page and read its rating.
+
+        Args:
+            url (str): The product url.
+            semaphore (Semaphore): Bounds the requests in flight.
+
+        Returns:
+            Tuple[str, RatingDetails | None, bool]: The url, its rating details and
+                whether the page was blocked (or unreachable) and needs the browser.
+        """
+        async with semaphore:
+            # Flipkart is throttled per domain, the browsers included
+            await self.politeness.throttle_async(url)
+
+            try:
+                response = await self.client.get(url)
+            except HTTPError as e:
+                warning(f"⚠️ Failed to fetch {url}: {str(e)}")
+                return url, None, True
+
+        if is_bot_wall(response):
+            return url, None, True
+
+        if response.status_code != 200:
+            return url, None, False
+
+        if self.recorder is not None:
+            self.recorder.save_product_page(
+                Websites.FLIPKART, url, response.text)
+
+        # An unreadable page only costs its own rating, the browser gets another go at it
+        try:
+            return url, parse_rating_html(response.text), False
+        except Exception as e:
+            warning(f"⚠️ Failed to read the rating of {url}: {str(e)}")
+            return url, None, True
+
+    async def fetch_ratings_async(self, urls: List[str]) -> Tuple[Dict[str, RatingDetails], List[str]]:
+        """
+        Fetch the ratings of several product pages concurrently.
+
+        Args:
+            urls (List[str]): The product urls.
+
+        Returns:
+            Tuple[Dict[str, RatingDetails], List[str]]: Rating details per url and
+                the urls that hit a bot wall.
+        """
+        semaphore = Semaphore(self.concurrency)
+        results = await gather(*(self.fetch_rating(url, semaphore) for url in urls), return_exceptions=True)
+
+        # One failing url must not cost the ratings of the others
+        for index, (url, result) in enumerate(zip(urls, results)):
+            if isinstance(result, Exception):
+                warning(f"⚠️ Failed to fetch {url}: {str(result)}")
+                results[index] = (url, None, True)
+            elif isinstance(result, BaseException):
+                raise result
+
+        ratings = {url: rating_details for url, rating_details,
+                   _ in results if rating_details is not None}
+        blocked = [url for url, _, is_blocked in results if is_blocked]
+
+        return ratings, blocked
+
+    async def fetch_ratings_threadsafe(self, urls: List[str]) -> Tuple[Dict[str, RatingDetails], List[str]]:
+        """
+        Await `fetch_ratings_async` from another event loop, the requests still run on the fetcher's loop.
+        """
+        if not urls:
+            return {}, []
+
+        return await wrap_future(run_coroutine_threadsafe(self.fetch_ratings_async(urls), self._loop))
+
+    def fetch_ratings(self, urls: List[str]) -> Tuple[Dict[str, RatingDetails], List[str]]:
+        """
+        Blocking wrapper around `fetch_ratings_async` for synchronous callers.
+        """
+        if not urls:
+            return {}, []
+
+        return run_coroutine_threadsafe(self.fetch_ratings_async(urls), self._loop).result()
+
+    def close(self):
+        """Close the HTTP client and stop the event loop thread"""
+        run_coroutine_threadsafe(self.client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -1,6 +1,4 @@
-from time import sleep
 from typing import List
-from random import uniform
 from selenium.webdriver.common.by import By
 
 from selenium.webdriver.remote.webelement import WebElement
@@ -79,9 +77,8 @@ class MyntraScraper(WebsiteScraper):
             return False
 
         old_products_set = set(old_products)
+        self.driver_utility.throttle(current_url)
 
         self.driver_utility._webdriver_wait(
             lambda d: d.current_url != current_url or set(d.find_elements(
                 By.CSS_SELECTOR, PRODUCT_CARDS[Websites.MYNTRA])) != old_products_set)
-
-        sleep(uniform(1, 3))
@@ -0,0 +1,150 @@
+from queue import Empty, Queue
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Tuple
+from logging import error, info
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+from .crawler import Crawler
+from .utils.web_driver_pool import WebDriverPool
+from ..db.redis import RedisDB
+from ..db.crawl_checkpoint import CrawlCheckpoints
+from ..lib.types import Product, ProductCategories, Websites
+from ..utils.best_discount_analyzer import BestDiscountAnalyzer
+
+
+CrawlJob = Tuple[ProductCategories, Websites, str]
+# The products of a job and whether its crawl went through
+JobResult = Tuple[List[Product], bool]
+
+
+class ParallelCrawler:
+    """
+    Crawl (category, website) pairs concurrently.
+
+    Every worker owns its own Crawler, borrows a WebDriver from the shared pool for
+    each job and pulls `Crawler.get_product` jobs from a shared queue until the
+    queue is empty.
+    """
+
+    def __init__(self, redis: RedisDB, discount_analyzer: BestDiscountAnalyzer, workers: int, driver_pool: WebDriverPool,
+                 checkpoints: CrawlCheckpoints | None = None):
+        """
+        Initialize the parallel crawler.
+
+        Args:
+            redis (RedisDB): The Redis client instance.
+            discount_analyzer (BestDiscountAnalyzer): Shared discount analyzer.
+            workers (int): Maximum number of concurrent WebDriver workers.
+            driver_pool (WebDriverPool): Pool the workers borrow their drivers from.
+            checkpoints (CrawlCheckpoints | None): Save the progress of every job, and resume from it.
+        """
+        self.redis_client = redis
+        self.discount_analyzer = discount_analyzer
+        self.driver_pool = driver_pool
+        self.checkpoints = checkpoints
+        self.workers = max(1, min(workers, driver_pool.size))
+
+        self._lock = Lock()
+
+    def crawl(self, urls: Dict[ProductCategories, Dict[Websites, str]],
+              on_category_done: Callable[[ProductCategories, List[Product], bool], None]) -> None:
+        """
+        Crawl every url and report each category once all of its websites are done.
+
+        Args:
+            urls (Dict[ProductCategories, Dict[Websites, str]]): The URLs to crawl.
+            on_category_done (Callable): Called with the merged products of a category,
+                in website order, as soon as its last job finishes, and whether every job went through.
+        """
+        jobs: Queue[CrawlJob] = Queue()
+        results: Dict[ProductCategories, Dict[Websites, JobResult]] = {}
+        pending: Dict[ProductCategories, int] = {}
+
+        for category in urls:
+            results[category] = {}
+            pending[category] = len(urls[category])
+
+            for website, url in urls[category].items():
+                jobs.put((category, website, url))
+
+        worker_count = min(self.workers, jobs.qsize())
+        if worker_count == 0:
+            return
+
+        info(f"🧵 Crawling {jobs.qsize()} jobs with {worker_count} workers")
+
+        threads = [
+            Thread(target=self._worker, args=(jobs, urls, results, pending, on_category_done),
+                   name=f"crawler-worker-{i}", daemon=True)
+            for i in range(worker_count)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    def _worker(self, jobs: "Queue[CrawlJob]", urls: Dict[ProductCategories, Dict[Websites, str]],
+                results: Dict[ProductCategories, Dict[Websites, JobResult]],
+                pending: Dict[ProductCategories, int],
+                on_category_done: Callable[[ProductCategories, List[Product], bool], None]) -> None:
+        """
+        Pull jobs from the queue until it is empty.
+        """
+        crawler = Crawler(self.redis_client, self.discount_analyzer,
+                          self.driver_pool, checkpoints=self.checkpoints)
+
+        try:
+            while True:
+                try:
+                    category, website, url = jobs.get_nowait()
+                except Empty:
+                    break
+
+                fetched_product, finished = None, False
+                try:
+                    fetched_product, finished = crawler.crawl_website(
+                        website, category, url)
+                except (WebDriverException, TimeoutException) as e:
+                    error(
+                        f"⚠️ Error fetching from {website} ({category.value}): {str(e)}")
+                except Exception as e:
+                    error(
+                        f"⚠️ Unexpected error for {website} ({category.value}): {str(e)}")
+
+                self._complete_job(category, website, fetched_product, finished,
+                                   urls, results, pending, on_category_done)
+        finally:
+            crawler.close()
+
+    def _complete_job(self, category: ProductCategories, website: Websites, fetched_product: List[Product] | None, finished: bool,
+                      urls: Dict[ProductCategories, Dict[Websites, str]],
+                      results: Dict[ProductCategories, Dict[Websites, JobResult]],
+                      pending: Dict[ProductCategories, int],
+                      on_category_done: Callable[[ProductCategories, List[Product], bool], None]) -> None:
+        """
+        Store a job result and report the category when it was the last one.
+
+        The category is reported outside the lock, a slow insert only holds up the worker
+        that finished it and not every worker storing a result.
+        """
+        with self._lock:
+            results[category][website] = (fetched_product or [], finished)
+            pending[category] -= 1
+
+            if pending[category] > 0:
+                return
+
+            # Merge in the same website order as the sequential crawl
+            products_by_cat: List[Product] = []
+            for site in urls[category]:
+                products_by_cat.extend(results[category].get(site, ([], False))[0])
+            category_finished = all(
+                job_finished for _, job_finished in results[category].values())
+
+        try:
+            on_category_done(category, products_by_cat, category_finished)
+        except Exception as e:
+            error(
+                f"⚠️ Error finishing category {category.value}: {str(e)}")
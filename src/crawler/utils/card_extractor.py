@@ -0,0 +1,192 @@
+from json import dumps
+from logging import warning
+from typing import Dict, List
+from urllib.parse import urljoin
+
+from selectolax.lexbor import LexborHTMLParser
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+from ...lib.types import ProductKey, RawCard, Websites
+from .web_driver_utility import WebDriverUtility
+from .css_selector.css_selector import PRODUCT_CARDS, PRODUCT_CONTAINER, PRODUCT_DETAILS
+
+
+# Reads every card of the container in one round trip.
+# Text fields use textContent (what BeautifulSoup returns for innerHTML) and url fields read
+# the resolved href/src property, which is what WebElement.get_attribute returns.
+BULK_EXTRACT_SCRIPT = """
+const container = arguments[0];
+const cardSelector = %s;
+const fields = %s;
+
+const rows = [];
+for (const card of container.querySelectorAll(cardSelector)) {
+    const values = {};
+
+    for (const [key, selector, source] of fields) {
+        const element = card.querySelector(selector);
+
+        if (element === null) {
+            values[key] = null;
+        } else if (source === 'text') {
+            values[key] = element.textContent;
+        } else {
+            values[key] = element[source] || element.getAttribute(source);
+        }
+    }
+
+    rows.push({card: card, fields: values});
+}
+
+return rows;
+"""
+
+
+def field_source(key: ProductKey) -> str:
+    """Where the raw value of a field comes from: the element text or one of its attributes"""
+    if key == "product_url":
+        return "href"
+    elif key == "product_image":
+        return "src"
+
+    return "text"
+
+
+class ScriptCardExtractor:
+    """
+    Extracts the raw fields of every product card on a page with a single `execute_script` call.
+    """
+
+    _scripts: Dict[Websites, str] = {}
+
+    @staticmethod
+    def compile(website_name: Websites) -> str:
+        """
+        Compile the card and field selectors of a website into the bulk extraction script.
+
+        Args:
+            website_name (Websites): The website to compile the script for.
+
+        Returns:
+            str: The JavaScript snippet.
+        """
+        script = ScriptCardExtractor._scripts.get(website_name)
+
+        if script is None:
+            fields = [[key, ", ".join(selectors), field_source(key)]
+                      for key, selectors in PRODUCT_DETAILS[website_name].items()]
+
+            script = BULK_EXTRACT_SCRIPT % (
+                dumps(", ".join(PRODUCT_CARDS[website_name])), dumps(fields))
+            ScriptCardExtractor._scripts[website_name] = script
+
+        return script
+
+    @staticmethod
+    def extract(driver_utility: WebDriverUtility, container: WebElement, website_name: Websites) -> List[RawCard] | None:
+        """
+        Extract the raw fields of every card inside the container.
+
+        Args:
+            driver_utility (WebDriverUtility): The WebDriver utility instance.
+            container (WebElement): The product container.
+            website_name (Websites): The website being scraped.
+
+        Returns:
+            List[RawCard] | None: One entry per card, None if the script could not run.
+        """
+        driver = driver_utility.driver
+
+        if driver is None:
+            return None
+
+        try:
+            rows = driver.execute_script(
+                ScriptCardExtractor.compile(website_name), container)
+        except WebDriverException as e:
+            warning(f"⚠️ Bulk card extraction failed: {str(e)}")
+            return None
+
+        if not isinstance(rows, list):
+            return None
+
+        return [{"card": row.get("card"), "fields": row.get("fields") or {}} for row in rows]
+
+
+class SourceCardExtractor:
+    """
+    Extracts the raw fields of every product card from the page HTML.
+
+    The page source is read once and parsed in-process with lexbor (C-backed), so the
+    browser is out of the per-field hot path and the same code works on saved HTML.
+    """
+
+    @staticmethod
+    def extract(driver_utility: WebDriverUtility, container: WebElement, website_name: Websites) -> List[RawCard] | None:
+        """
+        Extract the raw fields of every card from the current page source.
+
+        Args:
+            driver_utility (WebDriverUtility): The WebDriver utility instance.
+            container (WebElement): The live product container (only used to confirm the page is loaded).
+            website_name (Websites): The website being scraped.
+
+        Returns:
+            List[RawCard] | None: One entry per card, None if the page source could not be read.
+        """
+        driver = driver_utility.driver
+
+        if driver is None:
+            return None
+
+        try:
+            html = driver.page_source
+            base_url = driver.current_url
+        except WebDriverException as e:
+            warning(f"⚠️ Failed to read page source: {str(e)}")
+            return None
+
+        return SourceCardExtractor.extract_from_html(html, website_name, base_url)
+
+    @staticmethod
+    def extract_from_html(html: str, website_name: Websites, base_url: str = "") -> List[RawCard]:
+        """
+        Extract the raw fields of every card from a listing page HTML.
+
+        Args:
+            html (str): The listing page HTML.
+            website_name (Websites): The website the page belongs to.
+            base_url (str): The page URL, used to resolve relative href/src values.
+
+        Returns:
+            List[RawCard]: One entry per card.
+        """
+        tree = LexborHTMLParser(html)
+        container = tree.css_first(", ".join(PRODUCT_CONTAINER[website_name]))
+
+        if container is None:
+            return []
+
+        fields = [(key, ", ".join(selectors), field_source(key))
+                  for key, selectors in PRODUCT_DETAILS[website_name].items()]
+
+        raw_cards: List[RawCard] = []
+        for card in container.css(", ".join(PRODUCT_CARDS[website_name])):
+            values: Dict[ProductKey, str | None] = {}
+
+            for key, selector, source in fields:
+                element = card.css_first(selector)
+
+                if element is None:
+                    values[key] = None
+                elif source == "text":
+                    values[key] = element.text(deep=True)
+                else:
+                    value = element.attributes.get(source)
+                    values[key] = urljoin(
+                        base_url, value) if value is not None else None
+
+            raw_cards.append({"card": None, "fields": values})
+
+        return raw_cards
@@ -1,21 +1,30 @@
 
-from time import sleep
-from typing import List, cast
-from random import uniform
-from logging import error, info
+from time import perf_counter
+from typing import Dict, List, Set, Tuple, cast
+from logging import debug, error, info, warning
 
 from ...db.redis import RedisDB
 from ..utils.data_processor import DataProcessingHelper
 from ..utils.web_driver_utility import WebDriverUtility
-from ...lib.types import Product, ProductCategories, Websites
+from ...lib.types import ExtractionThroughput, Product, ProductCategories, RawCard, Websites
 from ...utils.best_discount_analyzer import BestDiscountAnalyzer
+from ..utils.card_extractor import ScriptCardExtractor, SourceCardExtractor
+from ..utils.snapshot_store import SnapshotStore
+from ...constants.const import EXTRACTION_BACKEND
+from ...lib.metrics import CARD_EXTRACTION_SECONDS, CARDS_EXTRACTED, PAGES_CRAWLED
 from ..utils.css_selector.css_selector import NEXT_BUTTON, PRODUCT_CARDS, PRODUCT_CONTAINER
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+
+EXTRACTION_BACKENDS = ("element", "script", "source")
+
+# Backends that return raw card fields, "element" parses every card through live WebElements
+RAW_CARD_EXTRACTORS = {
+    "script": ScriptCardExtractor,
+    "source": SourceCardExtractor,
+}
 
 
 class WebsiteScraper:
@@ -33,12 +42,29 @@ class WebsiteScraper:
         """
 
         self.processed_product_urls = set()
+        self.last_page_redis_round_trips = 0
+        self.last_page_card_count = 0
         self.category = category
         self.driver_utility = driver_utility
         self.redis_client = redis_client
         self.discount_analyzer = discount_analyzer
         self.data_helper = DataProcessingHelper()
         self.website_name: Websites = website_name
+        self.recorder: SnapshotStore | None = None
+        # Number of the listing page being loaded, recorded pages are saved under it
+        self.page_number = 1
+
+    def record_to(self, snapshots: SnapshotStore, from_page: int = 1):
+        """
+        Save every listing page this scraper loads as a snapshot.
+
+        Args:
+            snapshots (SnapshotStore): The store to save the pages to.
+            from_page (int): The page the crawl starts from, the pages before it recorded earlier are kept.
+        """
+        self.recorder = snapshots
+        snapshots.clear_listing_pages(
+            self.website_name, self.category, from_page)
 
     def get_product_container(self, url: str | None) -> WebElement | None:
         """
@@ -57,6 +83,7 @@ class WebsiteScraper:
             self.driver_utility.navigate_to(url)
 
         # Checking whether website is loaded or not
+        wait_start = perf_counter()
         isLoaded = self._wait_for_page_load()
         if not isLoaded:
             error(f"⌛ Timeout waiting for {website.value} page to load")
@@ -69,8 +96,30 @@ class WebsiteScraper:
             error("⛔ Failed to find the main container for Amazon products.")
             return None
 
+        self.driver_utility.record_page_load(perf_counter() - wait_start)
+        self._record_listing_page()
+
         return main_container
 
+    def _record_listing_page(self):
+        """
+        Save the loaded listing page when recording, a page loaded again overwrites its snapshot.
+        """
+        driver = self.driver_utility.driver
+
+        if self.recorder is None or driver is None:
+            return
+
+        try:
+            html = driver.page_source
+            url = driver.current_url
+        except WebDriverException as e:
+            warning(f"⚠️ Failed to record listing page: {str(e)}")
+            return
+
+        self.recorder.save_listing_page(
+            self.website_name, self.category, self.page_number, url, html)
+
     def extract_products(self, container: WebElement) -> List[Product] | None:
         """
         Extract products from the container.
@@ -84,24 +133,201 @@ class WebsiteScraper:
         if self.website_name is None:
             return []
 
-        driver_utility = self.driver_utility
+        return self.filter_products(self.get_cards_details(container))
 
-        products: List[Product] = []
-        product_cards = driver_utility.find_elements_from_parent(
+    def extract_products_from_html(self, html: str, url: str, snapshots: SnapshotStore | None = None) -> List[Product]:
+        """
+        Extract products from a recorded listing page, the replay counterpart of `extract_products`.
+
+        The dedup index is not looked up: the recording run added its own products to it,
+        and a replay must find the same products whatever the index holds today.
+
+        Args:
+            html (str): The listing page source.
+            url (str): The url the page was recorded from.
+            snapshots (SnapshotStore | None): The recorded product pages, for websites that read them.
+
+        Returns:
+            List[Product]: List of extracted products.
+        """
+        candidates, _ = self.select_candidates(
+            self.get_cards_details_from_html(html, url))
+        self.last_page_redis_round_trips = 0
+
+        return self.keep_deals(candidates, set())
+
+    @CARD_EXTRACTION_SECONDS.timed
+    def get_cards_details_from_html(self, html: str, url: str) -> List[Product]:
+        """
+        Parse every product card of a listing page source, without any validation.
+
+        Args:
+            html (str): The listing page source.
+            url (str): The url of the page, used to resolve relative links.
+
+        Returns:
+            List[Product]: The parsed product details.
+        """
+        raw_cards = SourceCardExtractor.extract_from_html(
+            html, self.website_name, url)
+
+        self.last_page_card_count = len(raw_cards)
+        PAGES_CRAWLED.inc()
+        CARDS_EXTRACTED.inc(len(raw_cards))
+
+        return self._parse_raw_cards(raw_cards)
+
+    @CARD_EXTRACTION_SECONDS.timed
+    def get_cards_details(self, container: WebElement, backend: str = EXTRACTION_BACKEND) -> List[Product]:
+        """
+        Parse every product card inside the container, without any validation.
+
+        The "script" backend reads the whole page in one `execute_script` call and falls
+        back to per-element extraction for cards it could not fully read, the "source"
+        backend parses the page source in-process and "element" queries every field.
+
+        Args:
+            container (WebElement): The container element.
+            backend (str): The extraction backend to use.
+
+        Returns:
+            List[Product]: The parsed product details.
+        """
+        extractor = RAW_CARD_EXTRACTORS.get(backend)
+
+        if extractor is not None:
+            raw_cards = extractor.extract(
+                self.driver_utility, container, self.website_name)
+
+            if raw_cards is not None:
+                self.last_page_card_count = len(raw_cards)
+                PAGES_CRAWLED.inc()
+                CARDS_EXTRACTED.inc(len(raw_cards))
+                return self._parse_raw_cards(raw_cards)
+
+        product_cards = self.driver_utility.find_elements_from_parent(
             container, PRODUCT_CARDS[self.website_name])
 
+        self.last_page_card_count = len(product_cards or [])
+        PAGES_CRAWLED.inc()
+        CARDS_EXTRACTED.inc(self.last_page_card_count)
         if product_cards is None or len(product_cards) == 0:
             return []
 
+        cards_details: List[Product] = []
         for card in product_cards:
-            product_details = self.extract_product_details(card)
+            product_details = DataProcessingHelper.get_product_details(
+                card, self.website_name, self.category)
 
-            if product_details is None:
-                continue
+            if product_details is not None:
+                cards_details.append(product_details)
 
-            products.append(product_details)
+        return cards_details
 
-        return products
+    def _parse_raw_cards(self, raw_cards: List[RawCard]) -> List[Product]:
+        """
+        Parse bulk extracted cards, re-reading a card element by element when the script missed fields.
+        """
+        cards_details: List[Product] = []
+
+        for raw_card in raw_cards:
+            product_details = DataProcessingHelper.get_product_details_from_raw(
+                raw_card["fields"], self.website_name, self.category)
+
+            # Only real product cards (with a link) are worth the per-element round trips
+            if product_details is None and raw_card["card"] is not None and raw_card["fields"].get("product_url"):
+                product_details = DataProcessingHelper.get_product_details(
+                    raw_card["card"], self.website_name, self.category)
+
+            if product_details is not None:
+                cards_details.append(product_details)
+
+        return cards_details
+
+    def extract_pages(self, urls: List[str], first_page: int = 1) -> List[List[Product]]:
+        """
+        Load several listing pages at once in background tabs and extract them in order.
+
+        Stops at the first page without product cards, the tabs of the pages after it
+        are closed without being read.
+
+        Args:
+            urls (List[str]): The listing page urls, in page order.
+            first_page (int): The page number of the first url.
+
+        Returns:
+            List[List[Product]]: The products of each page read, up to the first empty page.
+        """
+        driver = self.driver_utility.driver
+
+        if driver is None or not urls:
+            return []
+
+        origin_handle = driver.current_window_handle
+        handles = self.driver_utility.open_tabs(urls)
+        open_handles = list(handles)
+        pages: List[List[Product]] = []
+
+        try:
+            for index, handle in enumerate(handles):
+                driver.switch_to.window(handle)
+                self.page_number = first_page + index
+                container = self.get_product_container(None)
+
+                self.last_page_card_count = 0
+                page_products = self.extract_products(
+                    container) if container is not None else None
+
+                driver.close()
+                open_handles.remove(handle)
+
+                if container is None or self.last_page_card_count == 0:
+                    break
+
+                pages.append(page_products or [])
+        finally:
+            for handle in open_handles:
+                try:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                except WebDriverException:
+                    continue
+
+            driver.switch_to.window(origin_handle)
+
+        return pages
+
+    def measure_extraction_backends(self, container: WebElement, rounds: int = 3) -> Dict[str, ExtractionThroughput]:
+        """
+        Run every extraction backend on the same page and report their throughput.
+
+        Args:
+            container (WebElement): The container of the current page.
+            rounds (int): How many times each backend extracts the page.
+
+        Returns:
+            Dict[str, ExtractionThroughput]: Throughput per backend.
+        """
+        results: Dict[str, ExtractionThroughput] = {}
+
+        for backend in EXTRACTION_BACKENDS:
+            cards = 0
+            start = perf_counter()
+
+            for _ in range(rounds):
+                cards += len(self.get_cards_details(container, backend))
+
+            elapsed = perf_counter() - start
+            results[backend] = {
+                "cards": cards // rounds,
+                "seconds_per_page": elapsed / rounds,
+                "cards_per_second": cards / elapsed if elapsed > 0 else 0.0,
+            }
+
+            info(
+                f"⏱️ {self.website_name.value} | {backend} backend | {results[backend]['cards']} cards | {results[backend]['seconds_per_page']:.3f}s per page | {results[backend]['cards_per_second']:.1f} cards/s")
+
+        return results
 
     def has_next_page(self) -> bool:
         """
@@ -137,51 +363,108 @@ class WebsiteScraper:
         """
         raise NotImplementedError("Subclasses must implement this method")
 
-    def extract_product_details(self, card: WebElement) -> Product | None:
-        product_details = DataProcessingHelper.get_product_details(
-            card, self.website_name, self.category)
+    def rate_blocked_products(self, products: List[Product]) -> List[Product]:
+        """
+        Read in the browser the ratings the async page filter could not fetch, only Flipkart needs it.
+        """
+        return []
 
-        # Simple -- Return is "product_details" are None
-        if product_details is None:
-            return None
+    def filter_products(self, cards_details: List[Product]) -> List[Product]:
+        """
+        Validate the parsed products of a page against price, cache, discount and duplicate checks.
 
-        # Extract some details
-        url, price = (product_details.get(
-            k, None) for k in ("product_url", "price"))
-
-        # Checking in the flipkart is rating and rating count is there or not.
-        flipkartHasRating = (self.website_name == Websites.FLIPKART and (
-            product_details["rating"] is not None or product_details["rating_count"] is not None))
-
-        # Checking -- Whether product is valid or not.
-        isProductValid = (
-            DataProcessingHelper.is_product_valid(
-                url, price, self.redis_client, self.category)
-            and (
-                (self.website_name !=
-                 Websites.FLIPKART and self.discount_analyzer.is_best_discount(
-                     product_details)
-                 )
-                or (
-                    (self.website_name == Websites.FLIPKART and flipkartHasRating
-                     and self.discount_analyzer.is_best_discount(product_details))
-                ) or (
-                    self.website_name == Websites.FLIPKART and not flipkartHasRating
-                )
-            )
-            and (not self.processed_product_urls.__contains__(url))
-        )
-
-        if not isProductValid:
-            return None
+        Every candidate url of the page is checked against Redis in one multi-member lookup.
 
-        if product_details['rating'] is not None:
-            info(
-                f"✅ Best Deal found! 🛍️  {product_details['name']} | 💰 Price: ₹{product_details['price']} | 💰 Discount Price: ₹{product_details['discount_price']} | ⭐ Rating: {product_details['rating']} | 📱 {self.website_name.value}")
+        Args:
+            cards_details (List[Product]): The parsed product details of the page.
+
+        Returns:
+            List[Product]: The products that are deals worth keeping.
+        """
+        round_trips_before = self.redis_client.round_trips
+
+        candidates, candidate_urls = self.select_candidates(cards_details)
+        # A failed lookup counts as "not cached", like a failed is_url_cached did
+        cached_urls = (self.redis_client.get_cached_urls(
+            candidate_urls) if candidate_urls else None) or set()
 
-        self.processed_product_urls.add(url)
+        self.last_page_redis_round_trips = self.redis_client.round_trips - \
+            round_trips_before
+        debug(
+            f"🔁 {self.last_page_redis_round_trips} Redis round trips for {len(candidate_urls)} urls on {self.website_name.value} page")
 
-        return product_details
+        return self.keep_deals(candidates, cached_urls)
+
+    def select_candidates(self, cards_details: List[Product]) -> Tuple[List[Product], List[str]]:
+        """
+        Keep the products within the price limit that were not seen on an earlier page.
+
+        Args:
+            cards_details (List[Product]): The parsed product details of the page.
+
+        Returns:
+            Tuple[List[Product], List[str]]: The candidates and their unique urls, which need a cache lookup.
+        """
+        candidates = [
+            product_details for product_details in cards_details
+            if DataProcessingHelper.is_price_valid(
+                product_details.get("product_url", None), product_details.get("price", None), self.category)
+            and product_details["product_url"] not in self.processed_product_urls
+        ]
+
+        candidate_urls = list(
+            dict.fromkeys(product_details["product_url"] for product_details in candidates))
+
+        return candidates, candidate_urls
+
+    def keep_deals(self, candidates: List[Product], cached_urls: Set[str]) -> List[Product]:
+        """
+        Keep the candidates that are not cached and are deals worth keeping.
+
+        Args:
+            candidates (List[Product]): The candidates of the page.
+            cached_urls (Set[str]): The candidate urls found in the dedup index.
+
+        Returns:
+            List[Product]: The products that are deals worth keeping.
+        """
+        fresh_products = [
+            product_details for product_details in candidates if product_details["product_url"] not in cached_urls]
+        deals = self._find_deals(fresh_products)
+
+        products: List[Product] = []
+        for product_details, is_deal in zip(fresh_products, deals):
+            url = product_details["product_url"]
+
+            if not is_deal or url in self.processed_product_urls:
+                continue
+
+            if product_details['rating'] is not None:
+                info(
+                    f"✅ Best Deal found! 🛍️  {product_details['name']} | 💰 Price: ₹{product_details['price']} | 💰 Discount Price: ₹{product_details['discount_price']} | ⭐ Rating: {product_details['rating']} | 📱 {self.website_name.value}")
+
+            self.processed_product_urls.add(url)
+            products.append(product_details)
+
+        return products
+
+    def _find_deals(self, products: List[Product]) -> List[bool]:
+        """
+        Check the discount of every product of a page, Flipkart products without rating are kept
+        for rating enrichment.
+        """
+        if not products:
+            return []
+
+        deals = self.discount_analyzer.find_deals(products)
+
+        if self.website_name == Websites.FLIPKART:
+            # Checking in the flipkart is rating and rating count is there or not.
+            for index, product_details in enumerate(products):
+                if product_details["rating"] is None and product_details["rating_count"] is None:
+                    deals[index] = True
+
+        return deals
 
     def _wait_for_page_load(self) -> bool:
         """
@@ -195,22 +478,18 @@ class WebsiteScraper:
         attempt = 0
         max_retry = 2
         while attempt < max_retry:
-            try:
-                WebDriverWait(driver, 8).until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, ", ".join(PRODUCT_CONTAINER[self.website_name])))
-                )
-                sleep(uniform(1.5, 3))
+            container = self.driver_utility.wait_for_element(
+                PRODUCT_CONTAINER[self.website_name], PRODUCT_CARDS[self.website_name], timeout=8)
 
+            if container is not None:
                 return True
-            except TimeoutException:
-                attempt += 1
-                base_url_before_ref = driver.current_url
-                driver.refresh()
 
-                if base_url_before_ref != driver.current_url:
-                    return False
+            attempt += 1
+            base_url_before_ref = driver.current_url
+            self.driver_utility.throttle()
+            driver.refresh()
 
-                sleep(uniform(1, 3))
+            if base_url_before_ref != driver.current_url:
+                return False
 
         return False
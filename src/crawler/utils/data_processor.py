@@ -1,6 +1,6 @@
 from logging import error
 from re import search, sub
-from typing import Optional, cast
+from typing import Dict, Optional, cast
 from urllib.parse import parse_qs, unquote, urlparse
 
 from bs4 import BeautifulSoup
@@ -60,22 +60,70 @@ class DataProcessingHelper:
                 formatted_data = DataProcessingHelper.format_extracted_data(
                     key, element, website_name)
 
-                isProductValid = formatted_data is None and not (
-                    website_name == Websites.FLIPKART and (key == "rating" or key == "rating_count"))
-
-                if isProductValid:
+                if not DataProcessingHelper.set_product_field(product_details, key, formatted_data, website_name):
                     return None
+            except Exception as e:
+                error(f"Error extracting {key}: {str(e)}")
+                return None
 
-                if key == "product_image":
-                    url = cast(str, formatted_data)
-                    image_url = increaseImageQuality(url, website_name)
-                    formatted_data = image_url
+        return DataProcessingHelper.add_product_meta(product_details, website_name, category)
 
-                product_details[key] = formatted_data
+    @staticmethod
+    def get_product_details_from_raw(raw_fields: Dict[ProductKey, str | None], website_name: Websites, category: ProductCategories) -> Optional[Product]:
+        """
+        Build product details from raw field values (text or href/src) extracted in bulk.
+
+        Args:
+            raw_fields (Dict[ProductKey, str | None]): Raw value of each field, None when missing.
+            website_name (Website): Name of the website
+            category (ProductCategories): Category of the product
+
+        Returns:
+            Optional[Product]: A dictionary containing product details.
+        """
+        product_details: Product = {}
+
+        for key in PRODUCT_DETAILS[website_name]:
+            try:
+                formatted_data = DataProcessingHelper.format_raw_data(
+                    key, raw_fields.get(key), website_name)
+
+                if not DataProcessingHelper.set_product_field(product_details, key, formatted_data, website_name):
+                    return None
             except Exception as e:
                 error(f"Error extracting {key}: {str(e)}")
                 return None
 
+        return DataProcessingHelper.add_product_meta(product_details, website_name, category)
+
+    @staticmethod
+    def set_product_field(product_details: Product, key: ProductKey, formatted_data, website_name: Websites) -> bool:
+        """
+        Store a formatted field on the product.
+
+        Returns:
+            bool: False if a required field is missing and the product must be dropped.
+        """
+        isProductValid = formatted_data is None and not (
+            website_name == Websites.FLIPKART and (key == "rating" or key == "rating_count"))
+
+        if isProductValid:
+            return False
+
+        if key == "product_image":
+            url = cast(str, formatted_data)
+            image_url = increaseImageQuality(url, website_name)
+            formatted_data = image_url
+
+        product_details[key] = formatted_data
+
+        return True
+
+    @staticmethod
+    def add_product_meta(product_details: Product, website_name: Websites, category: ProductCategories) -> Optional[Product]:
+        """
+        Attach user, platform and category details to the product.
+        """
         if USER_ID is None or ASSOCIATED_APP is None:
             error(
                 "💀 USER_ID and ASSOCIATED_APP is None check immediately what's wrong...")
@@ -108,11 +156,6 @@ class DataProcessingHelper:
         if key == "product_image" or key == "product_url":
             attr = "href" if key == "product_url" else "src"
             element = element_data.get_attribute(attr)
-
-            if element is None:
-                return None
-
-            return element if key == "product_image" else DataProcessingHelper.url_shorter(element, website_name)
         else:
             elem = element_data.get_attribute("innerHTML")
 
@@ -120,9 +163,29 @@ class DataProcessingHelper:
                 soup = BeautifulSoup(elem, "html.parser")
                 element = soup.text
 
+        return DataProcessingHelper.format_raw_data(key, element, website_name)
+
+    @staticmethod
+    def format_raw_data(key: ProductKey, element: str | None, website_name: Websites):
+        """
+        Format a raw field value, the text of the element or its href/src attribute.
+
+        Args:
+            key (ProductKey): The type of data to format.
+            element (str | None): The raw value to format.
+
+        Returns:
+            Union[float, int, str, None]: The formatted data.
+        """
         if element is None:
             return None
 
+        if key == "product_image":
+            return element
+
+        if key == "product_url":
+            return DataProcessingHelper.url_shorter(element, website_name)
+
         # Format the give data by website_name
         if key == "price" or key == "discount_price":
             return HelperFunctions.format_price(element, website_name)
@@ -144,6 +207,27 @@ class DataProcessingHelper:
             price (BeautifulSoup): The price element.
             url (BeautifulSoup): The URL element.
 
+        Returns:
+            bool: True if the product is valid, False otherwise.
+        """
+        if not DataProcessingHelper.is_price_valid(url, original_price, category):
+            return False
+
+        if redis.is_url_cached(url):
+            return False
+        else:
+            return True
+
+    @staticmethod
+    def is_price_valid(url: str | None, original_price: str | int | float | None, category: ProductCategories) -> bool:
+        """
+        Validate if a product has a url and a price below the category limit, without checking the cache.
+
+        Args:
+            url (str | None): The product url.
+            original_price (str | int | float | None): The original price.
+            category (ProductCategories): Category of the product
+
         Returns:
             bool: True if the product is valid, False otherwise.
         """
@@ -155,13 +239,7 @@ class DataProcessingHelper:
 
         price_limit = PRODUCT_URL_DETAILS[category]["max_price"]
 
-        if original_price < price_limit:
-            if redis.is_url_cached(url):
-                return False
-            else:
-                return True
-        else:
-            return False
+        return original_price < price_limit
 
     @staticmethod
     def url_shorter(url: str, website_name: Websites) -> str | None:
@@ -0,0 +1,146 @@
+from asyncio import sleep as async_sleep
+from random import uniform
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict
+from urllib.parse import urlparse
+
+from ...lib.types import PolitenessStats
+from ...constants.const import POLITENESS_DOMAIN_INTERVALS, POLITENESS_ENABLED, POLITENESS_JITTER, POLITENESS_MIN_INTERVAL
+
+
+def get_domain(url: str) -> str:
+    """
+    Get the domain a url belongs to, without the `www.` prefix.
+
+    Args:
+        url (str): The url.
+
+    Returns:
+        str: The domain, or an empty string for urls without one (about:blank, data:...).
+    """
+    domain = urlparse(url).netloc.lower()
+
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class Politeness:
+    """
+    Spaces out the requests made to each domain.
+
+    Every request reserves the next free slot of its domain, slots are at least the
+    domain's minimum interval (plus some jitter) apart. Time already spent since the
+    previous request (page loads, extraction...) counts towards the interval, so the
+    caller only sleeps for what is left of it.
+    """
+
+    _shared: "Politeness | None" = None
+    _shared_lock = Lock()
+
+    def __init__(self, min_interval: float = POLITENESS_MIN_INTERVAL, jitter: float = POLITENESS_JITTER,
+                 enabled: bool = POLITENESS_ENABLED, domain_intervals: Dict[str, float] | None = None):
+        """
+        Args:
+            min_interval (float): Minimum seconds between two requests to the same domain.
+            jitter (float): Maximum random seconds added on top of the interval.
+            enabled (bool): Whether to wait at all, disable for replay and local runs.
+            domain_intervals (Dict[str, float] | None): Minimum interval overrides per domain.
+        """
+        self.min_interval = max(0.0, min_interval)
+        self.jitter = max(0.0, jitter)
+        self.enabled = enabled
+        self.domain_intervals = domain_intervals if domain_intervals is not None else POLITENESS_DOMAIN_INTERVALS
+
+        self._lock = Lock()
+        self._next_slot: Dict[str, float] = {}
+        self._stats: PolitenessStats = {"requests": 0, "delayed": 0,
+                                        "idle_time": 0.0, "idle_time_by_domain": {}}
+
+    @classmethod
+    def shared(cls) -> "Politeness":
+        """
+        Get the process-wide instance, so parallel workers share the same per-domain slots.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    def throttle(self, url: str) -> float:
+        """
+        Wait until a request to the url's domain is allowed.
+
+        Args:
+            url (str): The url about to be requested.
+
+        Returns:
+            float: The seconds slept.
+        """
+        delay = self._reserve(url)
+
+        if delay > 0:
+            sleep(delay)
+
+        return delay
+
+    async def throttle_async(self, url: str) -> float:
+        """
+        Same as `throttle` without blocking the event loop, the slots are shared with the browsers.
+
+        Args:
+            url (str): The url about to be requested.
+
+        Returns:
+            float: The seconds waited.
+        """
+        delay = self._reserve(url)
+
+        if delay > 0:
+            await async_sleep(delay)
+
+        return delay
+
+    def _reserve(self, url: str) -> float:
+        """
+        Reserve the next slot of the url's domain.
+
+        Returns:
+            float: The seconds left until the slot.
+        """
+        domain = get_domain(url)
+
+        if not self.enabled or not domain:
+            return 0.0
+
+        interval = self.domain_intervals.get(domain, self.min_interval)
+
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + interval + uniform(0, self.jitter)
+
+            delay = slot - now
+            self._stats["requests"] += 1
+            if delay > 0:
+                self._stats["delayed"] += 1
+                self._stats["idle_time"] += delay
+                self._stats["idle_time_by_domain"][domain] = self._stats["idle_time_by_domain"].get(
+                    domain, 0.0) + delay
+
+        return delay
+
+    def stats(self) -> PolitenessStats:
+        """
+        Get the requests throttled and the time slept since the last reset.
+        """
+        with self._lock:
+            return {**self._stats, "idle_time_by_domain": dict(self._stats["idle_time_by_domain"])}
+
+    def reset_stats(self):
+        """
+        Start counting idle time for a new run.
+        """
+        with self._lock:
+            self._stats = {"requests": 0, "delayed": 0,
+                           "idle_time": 0.0, "idle_time_by_domain": {}}
@@ -0,0 +1,175 @@
+from gzip import open as gzip_open
+from json import dump, load
+from logging import debug, warning
+from os import replace
+from pathlib import Path
+from re import sub
+from threading import Lock
+from time import time
+from typing import List
+
+from ...lib.types import PageSnapshot, ProductCategories, Websites
+from ...constants.const import SNAPSHOT_DIR
+from ...helpers.helper_functions import get_canonical_product_id
+
+# Product pages are stored per website rather than per category, a product is rated once
+PRODUCT_PAGES_DIR = "products"
+
+
+class SnapshotStore:
+    """
+    Saves the pages a crawl visits as gzip compressed JSON snapshots and reads them back for replays.
+
+    Listing pages are stored as `<directory>/<website>/<category>/page-NNNN.json.gz` and
+    product pages as `<directory>/<website>/products/<product id>.json.gz`, each with the
+    url it was read from and when.
+    """
+
+    _shared: "SnapshotStore | None" = None
+    _shared_lock = Lock()
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        """
+        Args:
+            directory (str): The directory holding the snapshots.
+        """
+        self.directory = Path(directory)
+
+    @classmethod
+    def shared(cls) -> "SnapshotStore":
+        """
+        Get the process-wide store of SNAPSHOT_DIR.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    def clear_listing_pages(self, website: Websites, category: ProductCategories, from_page: int = 1):
+        """
+        Remove the listing pages of a previous recording, so a shorter crawl does not leave stale pages behind.
+
+        Args:
+            website (Websites): The website.
+            category (ProductCategories): The category.
+            from_page (int): Keep the pages before this one, a resumed crawl recorded them already.
+        """
+        for path in self._listing_dir(website, category).glob("page-*.json.gz"):
+            page = path.name[len("page-"):-len(".json.gz")]
+
+            if not page.isdigit() or int(page) >= from_page:
+                path.unlink(missing_ok=True)
+
+    def save_listing_page(self, website: Websites, category: ProductCategories, page: int, url: str, html: str):
+        """
+        Save a listing page.
+
+        Args:
+            website (Websites): The website the page belongs to.
+            category (ProductCategories): The category being crawled.
+            page (int): The page number, starting at 1.
+            url (str): The url of the page.
+            html (str): The page source.
+        """
+        self._write(self._listing_dir(website, category) / f"page-{page:04d}.json.gz", {
+            "url": url,
+            "website": website.value,
+            "category": category.value,
+            "page": page,
+            "timestamp": time(),
+            "html": html,
+        })
+
+    def save_product_page(self, website: Websites, url: str, html: str):
+        """
+        Save a product page.
+
+        Args:
+            website (Websites): The website the page belongs to.
+            url (str): The product url.
+            html (str): The page source.
+        """
+        self._write(self._product_path(website, url), {
+            "url": url,
+            "website": website.value,
+            "category": "",
+            "page": 0,
+            "timestamp": time(),
+            "html": html,
+        })
+
+    def listing_pages(self, website: Websites, category: ProductCategories) -> List[PageSnapshot]:
+        """
+        Get the recorded listing pages of a website and category.
+
+        Args:
+            website (Websites): The website.
+            category (ProductCategories): The category.
+
+        Returns:
+            List[PageSnapshot]: The pages in page order, empty if nothing was recorded.
+        """
+        snapshots = [self._read(path) for path in sorted(
+            self._listing_dir(website, category).glob("page-*.json.gz"))]
+
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    def product_page(self, website: Websites, url: str) -> PageSnapshot | None:
+        """
+        Get the recorded page of a product.
+
+        Args:
+            website (Websites): The website.
+            url (str): The product url, any tracking variant of it matches.
+
+        Returns:
+            PageSnapshot | None: The snapshot, None if the product page was not recorded.
+        """
+        path = self._product_path(website, url)
+
+        return self._read(path) if path.exists() else None
+
+    def categories(self) -> List[ProductCategories]:
+        """
+        Get the categories with recorded listing pages, for any website.
+        """
+        recorded = {path.parent.name for path in self.directory.glob(
+            "*/*/page-*.json.gz")}
+
+        return [category for category in ProductCategories if category.value in recorded]
+
+    def _listing_dir(self, website: Websites, category: ProductCategories) -> Path:
+        return self.directory / website.value / category.value
+
+    def _product_path(self, website: Websites, url: str) -> Path:
+        file_name = sub(r"[^A-Za-z0-9_-]+", "_",
+                        get_canonical_product_id(url))[:150]
+
+        return self.directory / website.value / PRODUCT_PAGES_DIR / f"{file_name}.json.gz"
+
+    def _write(self, path: Path, snapshot: PageSnapshot):
+        """
+        Write a snapshot through a temporary file, so a replay never reads a half written page.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.tmp")
+
+        try:
+            with gzip_open(temp_path, "wt", encoding="utf-8", compresslevel=6) as file:
+                dump(snapshot, file)
+
+            replace(temp_path, path)
+        except OSError as e:
+            warning(f"⚠️ Failed to save snapshot of {snapshot['url']}: {str(e)}")
+            return
+
+        debug(f"📼 Recorded {snapshot['url']}")
+
+    def _read(self, path: Path) -> PageSnapshot | None:
+        try:
+            with gzip_open(path, "rt", encoding="utf-8") as file:
+                return load(file)
+        except (OSError, ValueError) as e:
+            warning(f"⚠️ Failed to read snapshot {path}: {str(e)}")
+            return None
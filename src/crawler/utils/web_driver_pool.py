@@ -0,0 +1,157 @@
+from queue import Queue
+from time import perf_counter
+from threading import Lock
+from contextlib import contextmanager
+from logging import error, info, warning
+from typing import Iterator, List
+
+from ...lib.types import DriverPoolStats
+from .web_driver_utility import WebDriverUtility
+from ...constants.const import DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB
+
+
+class WebDriverPool:
+    """
+        Keeps a fixed number of warm WebDriver instances and lends them to scrapers.
+        Drivers are recycled after a page budget or RSS threshold and crashed
+        sessions are replaced with a fresh browser.
+    """
+
+    def __init__(self, size: int = 1, max_pages: int = DRIVER_MAX_PAGES, max_rss_mb: int = DRIVER_MAX_RSS_MB):
+        """
+        Pre-launch the pool drivers.
+
+        Args:
+            size (int): Number of browsers to keep warm.
+            max_pages (int): Recycle a driver after this many loaded pages, 0 disables it.
+            max_rss_mb (int): Recycle a driver once its browser RSS passes this many MB, 0 disables it.
+        """
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+
+        self._idle: Queue[WebDriverUtility] = Queue()
+        self._drivers: List[WebDriverUtility] = []
+        self._lock = Lock()
+
+        self._checkouts = 0
+        self._checkout_latency_total = 0.0
+        self._checkout_latency_max = 0.0
+        self._recycle_count = 0
+        self._crash_count = 0
+
+        for _ in range(self.size):
+            try:
+                driver_utility = WebDriverUtility()
+            except Exception as e:
+                error(f"⛔ Failed to launch pooled driver: {str(e)}")
+                continue
+
+            self._drivers.append(driver_utility)
+            self._idle.put(driver_utility)
+
+        if not self._drivers:
+            raise RuntimeError("Unable to launch any WebDriver for the pool")
+
+        info(f"🚗 WebDriver pool ready with {len(self._drivers)} drivers")
+
+    @contextmanager
+    def lease(self) -> Iterator[WebDriverUtility]:
+        """
+        Borrow a driver for the duration of the `with` block.
+
+        Yields:
+            WebDriverUtility: A live driver utility.
+        """
+        start = perf_counter()
+        driver_utility = self._idle.get()
+
+        try:
+            if not driver_utility.is_alive():
+                self.replace_crashed(driver_utility)
+
+            self._record_checkout(perf_counter() - start)
+
+            yield driver_utility
+        finally:
+            self._release(driver_utility)
+
+    def replace_crashed(self, driver_utility: WebDriverUtility):
+        """
+        Replace a crashed browser session in place, so holders of the utility keep working.
+
+        Args:
+            driver_utility (WebDriverUtility): The utility whose session crashed.
+        """
+        with self._lock:
+            self._crash_count += 1
+
+        warning("💥 WebDriver session crashed, launching a replacement")
+        driver_utility.restart_driver()
+
+    def stats(self) -> DriverPoolStats:
+        """
+        Get the pool counters.
+
+        Returns:
+            DriverPoolStats: Checkout latency, recycle and crash counts.
+        """
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": len(self._drivers),
+                "checkouts": checkouts,
+                "avg_checkout_latency": self._checkout_latency_total / checkouts if checkouts else 0.0,
+                "max_checkout_latency": self._checkout_latency_max,
+                "recycle_count": self._recycle_count,
+                "crash_count": self._crash_count,
+            }
+
+    def close(self):
+        """Quit every pooled driver and log the pool counters"""
+        stats = self.stats()
+        info(
+            f"🚗 WebDriver pool stats | checkouts: {stats['checkouts']} | avg checkout: {stats['avg_checkout_latency']:.3f}s | max checkout: {stats['max_checkout_latency']:.3f}s | recycled: {stats['recycle_count']} | crashed: {stats['crash_count']}")
+
+        for driver_utility in self._drivers:
+            try:
+                driver_utility.close_driver()
+            except Exception as e:
+                warning(f"⚠️ Error while closing pooled driver: {str(e)}")
+
+        self._drivers = []
+
+    def _record_checkout(self, latency: float):
+        with self._lock:
+            self._checkouts += 1
+            self._checkout_latency_total += latency
+            self._checkout_latency_max = max(
+                self._checkout_latency_max, latency)
+
+    def _needs_recycle(self, driver_utility: WebDriverUtility) -> bool:
+        if self.max_pages and driver_utility.pages_loaded >= self.max_pages:
+            return True
+
+        if self.max_rss_bytes and driver_utility.get_rss_bytes() >= self.max_rss_bytes:
+            return True
+
+        return False
+
+    def _release(self, driver_utility: WebDriverUtility):
+        """
+        Return a driver to the pool, recycling or replacing it first when needed.
+        """
+        try:
+            if not driver_utility.is_alive():
+                self.replace_crashed(driver_utility)
+            elif self._needs_recycle(driver_utility):
+                with self._lock:
+                    self._recycle_count += 1
+
+                info(
+                    f"♻️ Recycling WebDriver after {driver_utility.pages_loaded} pages")
+                driver_utility.restart_driver()
+        except Exception as e:
+            error(f"⛔ Failed to refresh pooled driver: {str(e)}")
+        finally:
+            self._idle.put(driver_utility)
@@ -1,15 +1,26 @@
-from time import sleep
+from math import ceil
 from typing import List
-from logging import error, warning
-from random import choice, uniform
+from time import perf_counter
+from psutil import NoSuchProcess, Process
+from logging import error, info, warning
+from random import choice
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 
+from .politeness import Politeness
+from ...lib.metrics import NAVIGATE_SECONDS, PAGE_LOAD_WAIT_SECONDS
+from ...constants.const import LEAN_BROWSER, READINESS_MODE
+from ...lib.types import PageStats, PageStatsTotals, ReadinessTotals
+from ...constants.browser import BLOCKED_HOST_PATTERNS, BLOCKED_RESOURCE_PATTERNS, PAGE_STATS_SCRIPT, WAIT_FOR_ELEMENT_SCRIPT
+
+# WebDriverWait's default poll frequency, used to estimate what the polling path would have waited
+POLL_FREQUENCY = 0.5
+
 
 class WebDriverUtility:
     """
@@ -17,21 +28,49 @@ class WebDriverUtility:
         This class is responsible for browser-specific operations.
     """
 
-    def __init__(self):
-        """Initialize the WebDriver with Chrome options"""
+    def __init__(self, lean: bool = LEAN_BROWSER, politeness: Politeness | None = None):
+        """
+        Initialize the WebDriver with Chrome options
+
+        Args:
+            lean (bool): Run headless, block heavy resources and use the `eager` page-load strategy.
+            politeness (Politeness | None): Spaces out requests per domain, the process-wide instance if omitted.
+        """
         self.driver = None
+        self.lean = lean
+        self.politeness = politeness if politeness is not None else Politeness.shared()
+        self.pages_loaded = 0
+        self.last_page_stats: PageStats | None = None
+        self.page_totals: PageStatsTotals = {
+            "pages": 0,
+            "bytes_transferred": 0,
+            "timed_pages": 0,
+            "load_time": 0.0,
+            "wait_time": 0.0,
+        }
+        self.readiness_totals: ReadinessTotals = {
+            "waits": 0,
+            "wait_time": 0.0,
+            "saved_time": 0.0,
+        }
         self.setup_driver()
 
     def setup_driver(self):
         """Set up the Chrome WebDriver with appropriate options"""
 
         chrome_options = Options()
-        # chrome_options.add_argument("--headless")
+        if self.lean:
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument(
+                "--blink-settings=imagesEnabled=false")
+            chrome_options.page_load_strategy = "eager"
+
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument(
             "--disable-blink-features=AutomationControlled")
         chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-popup-blocking")
         chrome_options.add_argument('--memory-pressure-off')
 
         user_agents = [
@@ -44,11 +83,171 @@ class WebDriverUtility:
         self.driver = Chrome(options=chrome_options)
         self.driver.set_window_size(1920, 1080)
 
+        if self.lean:
+            self._block_heavy_resources()
+
+    def _block_heavy_resources(self):
+        """Block images, fonts, media and ad/analytics hosts through CDP"""
+        if self.driver is None:
+            return
+
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                "urls": BLOCKED_RESOURCE_PATTERNS + BLOCKED_HOST_PATTERNS
+            })
+        except WebDriverException as e:
+            warning(f"⚠️ Failed to enable resource blocking: {str(e)}")
+
+    def restart_driver(self):
+        """Quit the current browser (if any) and launch a fresh one in its place"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                warning(f"⚠️ Error while quitting driver: {str(e)}")
+
+        self.driver = None
+        self.pages_loaded = 0
+        self.setup_driver()
+
+    def is_alive(self) -> bool:
+        """
+        Check whether the browser session still responds.
+
+        Returns:
+            bool: True if the session is usable, False if it crashed or was closed.
+        """
+        if self.driver is None:
+            return False
+
+        try:
+            self.driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def get_rss_bytes(self) -> int:
+        """
+        Get the resident memory of chromedriver and every browser process it spawned.
+
+        Returns:
+            int: The total RSS in bytes, 0 if it cannot be determined.
+        """
+        if self.driver is None:
+            return 0
+
+        try:
+            service_process = Process(self.driver.service.process.pid)
+            processes = [service_process] + \
+                service_process.children(recursive=True)
+        except (NoSuchProcess, AttributeError):
+            return 0
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except NoSuchProcess:
+                continue
+
+        return total
+
+    def record_page_load(self, wait_time: float = 0.0):
+        """
+        Count a loaded page towards the driver recycle budget and collect its transfer stats.
+
+        Args:
+            wait_time (float): Seconds spent waiting for the page to become ready.
+        """
+        self.pages_loaded += 1
+        PAGE_LOAD_WAIT_SECONDS.observe(wait_time)
+
+        if self.driver is None:
+            return
+
+        try:
+            stats = self.driver.execute_script(PAGE_STATS_SCRIPT)
+        except WebDriverException:
+            return
+
+        load_time = stats.get("loadTime")
+        page_stats: PageStats = {
+            "url": self.driver.current_url,
+            "bytes_transferred": int(stats.get("bytes") or 0),
+            "resources": int(stats.get("resources") or 0),
+            "load_time": load_time / 1000 if load_time is not None else None,
+            "wait_time": wait_time,
+        }
+
+        self.last_page_stats = page_stats
+        self.page_totals["pages"] += 1
+        self.page_totals["bytes_transferred"] += page_stats["bytes_transferred"]
+        if page_stats["load_time"] is not None:
+            self.page_totals["timed_pages"] += 1
+            self.page_totals["load_time"] += page_stats["load_time"]
+        self.page_totals["wait_time"] += wait_time
+
+    def throttle(self, url: str | None = None) -> float:
+        """
+        Wait for the politeness window of a request to the url, the current page if omitted.
+
+        Call it before anything that makes the browser load a page (navigation, clicks, refreshes).
+
+        Args:
+            url (str | None): The url about to be requested.
+
+        Returns:
+            float: The seconds slept.
+        """
+        if url is None:
+            if self.driver is None:
+                return 0.0
+            url = self.driver.current_url
+
+        return self.politeness.throttle(url)
+
     def navigate_to(self, url: str):
         """Navigate to the specified URL"""
         if self.driver:
-            self.driver.get(url)
-            sleep(uniform(1, 3.5))
+            self.throttle(url)
+            with NAVIGATE_SECONDS.time():
+                self.driver.get(url)
+
+    def open_tabs(self, urls: List[str]) -> List[str]:
+        """
+        Open each URL in a new background tab without waiting for it to load.
+
+        The current tab stays selected, so pages load in parallel while the caller keeps working.
+
+        Args:
+            urls (List[str]): The URLs to open.
+
+        Returns:
+            List[str]: The window handle of each new tab, in the same order as the URLs.
+        """
+        if self.driver is None:
+            return []
+
+        handles: List[str] = []
+        known_handles = set(self.driver.window_handles)
+
+        for url in urls:
+            self.throttle(url)
+            self.driver.execute_script(
+                "window.open(arguments[0], '_blank');", url)
+
+            current_handles = self.driver.window_handles
+            new_handles = [
+                handle for handle in current_handles if handle not in known_handles]
+
+            if not new_handles:
+                raise WebDriverException(f"Failed to open a tab for {url}")
+
+            handles.append(new_handles[0])
+            known_handles.update(current_handles)
+
+        return handles
 
     def find_element_with_wait(self, selectors: List[str], timeout: int = 5) -> WebElement | None:
         """
@@ -62,7 +261,60 @@ class WebDriverUtility:
         Returns:
             WebElement | List[WebElement] | None: The found element(s) or None if not found.
         """
-        def any_element_present(driver):
+        return self.wait_for_element(selectors, timeout=timeout)
+
+    def wait_for_element(self, selectors: List[str], child_selectors: List[str] | None = None, timeout: int = 5,
+                         settle_time: float = 1.0) -> WebElement | None:
+        """
+        Wait for an element, and optionally for one of its children, to be in the page.
+
+        In the `observer` readiness mode a MutationObserver resolves as soon as the DOM
+        matches, instead of polling the page every 0.5s through WebDriverWait.
+
+        Args:
+            selectors (List[str]): List of CSS selectors of the element.
+            child_selectors (List[str] | None): CSS selectors of which at least one child must be present.
+            timeout (int): The maximum time to wait in seconds.
+            settle_time (float): Seconds without DOM changes after which a loaded element without
+                children (an empty page) is returned as is.
+
+        Returns:
+            WebElement | None: The found element or None if not found.
+        """
+        if self.driver is None:
+            return None
+
+        if READINESS_MODE != "observer":
+            return self._poll_for_element(selectors, child_selectors, timeout)
+
+        wait_start = perf_counter()
+        try:
+            self.driver.set_script_timeout(timeout + 5)
+            element, _ = self.driver.execute_async_script(
+                WAIT_FOR_ELEMENT_SCRIPT,
+                ", ".join(selectors),
+                ", ".join(child_selectors) if child_selectors else None,
+                timeout * 1000,
+                settle_time * 1000,
+            )
+        except (JavascriptException, TimeoutException) as e:
+            # The page navigated away while the script was running, poll the new one
+            warning(f"⚠️  Readiness observer failed, polling instead: {e.msg}")
+            return self._poll_for_element(selectors, child_selectors, timeout)
+
+        if element is None:
+            error("⌛ Timeout waiting for condition to be met")
+            return None
+
+        self._record_readiness(perf_counter() - wait_start)
+
+        return element
+
+    def _poll_for_element(self, selectors: List[str], child_selectors: List[str] | None, timeout: int) -> WebElement | None:
+        """
+        Wait for an element, and optionally for one of its children, by polling through WebDriverWait.
+        """
+        def element_present(driver):
             all_selectors = ", ".join(selectors)
             element = None
 
@@ -70,11 +322,28 @@ class WebDriverUtility:
                 element = driver.find_element(
                     By.CSS_SELECTOR, all_selectors)
 
+                if child_selectors and not element.find_elements(By.CSS_SELECTOR, ", ".join(child_selectors)):
+                    return None
+
                 return element if element is not None else None
             except Exception:
                 return None
 
-        return self._webdriver_wait(any_element_present, timeout)
+        return self._webdriver_wait(element_present, timeout)
+
+    def _record_readiness(self, wait_time: float):
+        """
+        Add an observer wait to the totals, along with the latency it saved over polling.
+
+        WebDriverWait checks the page every POLL_FREQUENCY seconds, so it only notices a
+        page that was ready after `wait_time` seconds at the next poll.
+        """
+        polling_wait_time = ceil(
+            round(wait_time / POLL_FREQUENCY, 6)) * POLL_FREQUENCY
+
+        self.readiness_totals["waits"] += 1
+        self.readiness_totals["wait_time"] += wait_time
+        self.readiness_totals["saved_time"] += polling_wait_time - wait_time
 
     def find_element_from_parent(self, parent: WebElement | WebDriver, selectors: List[str]) -> WebElement | None:
         """
@@ -139,6 +408,18 @@ class WebDriverUtility:
 
     def close_driver(self):
         """Close the WebDriver"""
+        totals = self.page_totals
+        if totals["pages"] > 0:
+            # Pages loaded in place (clicks, infinite scroll) report no load time
+            avg_load = f"{totals['load_time'] / totals['timed_pages']:.2f}s" if totals["timed_pages"] > 0 else "n/a"
+            info(
+                f"📊 {'Lean' if self.lean else 'Full'} browser | pages: {totals['pages']} | avg transferred: {totals['bytes_transferred'] / totals['pages'] / 1024:.1f} KB | avg load: {avg_load} | avg wait: {totals['wait_time'] / totals['pages']:.2f}s")
+
+        readiness = self.readiness_totals
+        if readiness["waits"] > 0:
+            info(
+                f"⚡ Readiness observer | waits: {readiness['waits']} | avg wait: {readiness['wait_time'] / readiness['waits']:.2f}s | saved over polling: {readiness['saved_time']:.2f}s")
+
         if self.driver:
             self.driver.quit()
             self.driver = None
@@ -0,0 +1,182 @@
+from time import time
+from json import dumps, loads
+from asyncio import to_thread
+from typing import Dict, List, Set
+from logging import warning, error
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .redis import RedisDB
+from ..lib.types import RatingDetails
+from ..lib.metrics import REDIS_DEDUP_SECONDS, REDIS_DEDUP_URLS
+from ..constants.const import FLIPKART_RATING_CACHE_TTL
+from ..helpers.helper_functions import get_canonical_product_id
+from ..constants.redis_key import PRODUCT_RATING_CACHE_KEY, PRODUCT_DEDUP_EXPIRE_TIME, PRODUCT_DEDUP_INDEX_KEY
+
+
+def async_redis_call(func):
+    async def wrapper(self, *args, **kwargs):
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return None
+
+        try:
+            return await func(self, *args, **kwargs)
+        except RedisError as e:
+            error(f"⛔ Redis error: {e}")
+            return None
+        except Exception as e:
+            error(f"⛔ Unexpected error: {e}")
+            return None
+
+    return wrapper
+
+
+class AsyncRedisDB:
+    """
+    asyncio counterpart of the RedisDB lookups made while crawling.
+
+    It connects to the same database as the given RedisDB and shares its in-memory
+    dedup tiers (url snapshot and bloom filter), so both clients stay consistent.
+    """
+
+    def __init__(self, redis: RedisDB):
+        """
+        Args:
+            redis (RedisDB): The connected synchronous client to mirror.
+        """
+        self.sync = redis
+        self.client: Redis | None = Redis(
+            host=redis.host,
+            port=redis.port,
+            password=redis.password,
+            username=redis.username,
+            db=redis.db,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=2,
+            health_check_interval=30
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @async_redis_call
+    @REDIS_DEDUP_SECONDS.timed
+    async def get_cached_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Get which of the given URLs are already in the dedup index, in one round trip.
+
+        args:
+            urls (List[str]): The URLs to check.
+
+        return:
+            Set[str]: The URLs that are cached.
+        """
+        if not urls:
+            return set()
+
+        REDIS_DEDUP_URLS.inc(len(urls))
+        product_ids = {url: get_canonical_product_id(url) for url in urls}
+
+        snapshot = self.sync.url_snapshot
+        if snapshot is not None:
+            return {url for url, product_id in product_ids.items() if product_id in snapshot}
+
+        # Only probable hits of the bloom filter need the authoritative lookup
+        bloom_filter = self.sync.bloom_filter
+        if bloom_filter is not None:
+            product_ids = {url: product_id for url, product_id in product_ids.items()
+                           if product_id in bloom_filter}
+
+            if not product_ids:
+                return set()
+
+        scores = await self.client.zmscore(
+            PRODUCT_DEDUP_INDEX_KEY, list(product_ids.values()))
+
+        now = time()
+        return {url for url, expires_at in zip(product_ids, scores) if expires_at is not None and expires_at > now}
+
+    @async_redis_call
+    async def add_to_dedup_index(self, urls: List[str], expire_time: int = PRODUCT_DEDUP_EXPIRE_TIME) -> int:
+        """
+        Add product urls to the dedup index.
+
+        args:
+            urls (List[str]): The product urls to add.
+            expire_time (int): The expiration time in seconds.
+
+        return:
+            int: The number of new entries.
+        """
+        if not urls:
+            return 0
+
+        now = time()
+        expires_at = now + expire_time
+        product_ids = [get_canonical_product_id(url) for url in urls]
+
+        self.sync._add_to_snapshot(product_ids)
+        # The file backend is saved on a thread, the Redis bitmap is written with the index
+        bloom_positions = await to_thread(self.sync._add_to_bloom_filter, product_ids)
+
+        pipe = self.client.pipeline()
+        pipe.zadd(PRODUCT_DEDUP_INDEX_KEY, {
+            product_id: expires_at for product_id in product_ids}, gt=True)
+        pipe.zremrangebyscore(PRODUCT_DEDUP_INDEX_KEY, "-inf", now)
+        pipe.expire(PRODUCT_DEDUP_INDEX_KEY, expire_time)
+        RedisDB.queue_bloom_bits(pipe, bloom_positions, len(product_ids))
+
+        return (await pipe.execute())[0]
+
+    @async_redis_call
+    async def get_cached_ratings(self, urls: List[str]) -> Dict[str, RatingDetails]:
+        """
+        Get the cached rating details of the given product urls, in one round trip.
+
+        args:
+            urls (List[str]): The product urls.
+
+        return:
+            Dict[str, RatingDetails]: Rating details per url, misses are left out.
+        """
+        if not urls:
+            return {}
+
+        values = await self.client.mget(
+            [f"{PRODUCT_RATING_CACHE_KEY}{get_canonical_product_id(url)}" for url in urls])
+
+        ratings = {url: loads(value)
+                   for url, value in zip(urls, values) if value is not None}
+
+        with self.sync._stats_lock:
+            self.sync.rating_cache_stats["hits"] += len(ratings)
+            self.sync.rating_cache_stats["misses"] += len(urls) - len(ratings)
+
+        return ratings
+
+    @async_redis_call
+    async def cache_ratings(self, ratings: Dict[str, RatingDetails], expire_time: int = FLIPKART_RATING_CACHE_TTL) -> bool:
+        """
+        Cache rating details per canonical product id.
+
+        args:
+            ratings (Dict[str, RatingDetails]): Rating details per product url.
+            expire_time (int): The expiration time in seconds.
+
+        return:
+            bool: True if the ratings were cached, False otherwise.
+        """
+        if not ratings:
+            return True
+
+        pipe = self.client.pipeline()
+        for url, rating_details in ratings.items():
+            pipe.set(f"{PRODUCT_RATING_CACHE_KEY}{get_canonical_product_id(url)}",
+                     dumps(rating_details), ex=expire_time)
+        await pipe.execute()
+
+        return True
@@ -0,0 +1,90 @@
+from hashlib import blake2b
+from math import ceil, log
+from struct import calcsize, pack, unpack
+from typing import Iterable, List, Set
+
+# File layout: magic, capacity, error rate, item count, then the bitmap
+FILE_HEADER = ">4sQdQ"
+FILE_MAGIC = b"BLM1"
+
+
+class BloomFilter:
+    """
+    Bloom filter over canonical product ids.
+
+    Bits are stored most significant bit first, the same layout as a Redis bitmap,
+    so the raw bytes can be stored with SET and read back with GET or GETBIT.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, bits: bytes | None = None, count: int = 0):
+        """
+        Size the filter for `capacity` items at the given false-positive rate.
+
+        args:
+            capacity (int): Expected number of items.
+            error_rate (float): Target false-positive rate (0-1).
+            bits (bytes | None): Existing bitmap to load.
+            count (int): Number of items already in the bitmap.
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+
+        self.size = max(8, ceil(-self.capacity * log(error_rate) / (log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * log(2)))
+
+        byte_size = ceil(self.size / 8)
+        if bits is not None and len(bits) != byte_size:
+            raise ValueError("Bloom filter bitmap does not match its parameters")
+
+        self.bits = bytearray(bits) if bits is not None else bytearray(byte_size)
+        self.count = count
+
+    def _positions(self, item: str) -> List[int]:
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, items: Iterable[str]) -> Set[int]:
+        """
+        Add items to the filter.
+
+        args:
+            items (Iterable[str]): The items to add.
+
+        return:
+            Set[int]: The bit positions of the items, to set them in a stored bitmap with SETBIT.
+        """
+        positions: Set[int] = set()
+
+        for item in items:
+            for position in self._positions(item):
+                self.bits[position >> 3] |= 0x80 >> (position & 7)
+                positions.add(position)
+
+            self.count += 1
+
+        return positions
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (0x80 >> (position & 7)) for position in self._positions(item))
+
+    @property
+    def is_saturated(self) -> bool:
+        """True once more items than planned were added and the error rate is no longer met"""
+        return self.count > self.capacity
+
+    def to_file_bytes(self) -> bytes:
+        return pack(FILE_HEADER, FILE_MAGIC, self.capacity, self.error_rate, self.count) + bytes(self.bits)
+
+    @staticmethod
+    def from_file_bytes(data: bytes) -> "BloomFilter":
+        header_size = calcsize(FILE_HEADER)
+        magic, capacity, error_rate, count = unpack(
+            FILE_HEADER, data[:header_size])
+
+        if magic != FILE_MAGIC:
+            raise ValueError("Not a bloom filter file")
+
+        return BloomFilter(capacity, error_rate, data[header_size:], count)
@@ -0,0 +1,169 @@
+from time import time
+from json import dumps, loads
+from logging import info
+from typing import Callable, List
+
+from .redis import RedisDB, redis_call
+from ..lib.types import CrawlCheckpoint, CrawlRun, Product, ProductCategories, Websites
+from ..constants.const import CHECKPOINT_WINDOW_HOURS
+from ..constants.redis_key import CRAWL_CHECKPOINT_KEY, CRAWL_DONE_CATEGORIES_KEY, CRAWL_RUN_KEY
+
+
+class CrawlCheckpoints:
+    """
+    Crawl progress stored in Redis, so a killed or crashed run can be restarted where it stopped.
+
+    A run keeps the categories it picked for `window_hours`. Every (category, website) unit
+    saves its current page, the url to reload it from and the products found before it,
+    finished units keep their products and finished categories are skipped altogether.
+    """
+
+    def __init__(self, redis: RedisDB, window_hours: float = CHECKPOINT_WINDOW_HOURS):
+        """
+        Args:
+            redis (RedisDB): The connected Redis client.
+            window_hours (float): How long an unfinished run can be resumed.
+        """
+        self.redis = redis
+        self.window_seconds = max(1, int(window_hours * 60 * 60))
+        self.run_id: str | None = None
+
+    @property
+    def client(self):
+        return self.redis.client
+
+    def begin_run(self, pick_categories: Callable[[], List[ProductCategories]]) -> List[ProductCategories]:
+        """
+        Resume the unfinished run of the current window, or start a new one.
+
+        args:
+            pick_categories (Callable): Picks the categories of a new run.
+
+        return:
+            List[ProductCategories]: The categories to crawl.
+        """
+        run = self._get_run()
+
+        if run is not None and time() - run["started_at"] < self.window_seconds:
+            self.run_id = run["run_id"]
+            info(
+                f"♻️ Resuming crawl run {self.run_id} with categories: {', '.join(run['categories'])}")
+
+            return [category for category in ProductCategories if category.value in run["categories"]]
+
+        categories = pick_categories()
+        self.run_id = str(int(time() * 1000))
+        self._save_run({"run_id": self.run_id, "started_at": time(),
+                        "categories": [category.value for category in categories]})
+
+        return categories
+
+    def finish_run(self):
+        """
+        Forget the finished run, the next run picks new categories.
+        """
+        if self.run_id is None:
+            return
+
+        self._delete_run()
+        self.run_id = None
+
+    @redis_call
+    def _get_run(self) -> CrawlRun | None:
+        value = self.client.get(CRAWL_RUN_KEY)
+        self.redis._count_round_trip()
+
+        return loads(value) if value is not None else None
+
+    @redis_call
+    def _save_run(self, run: CrawlRun):
+        self.client.set(CRAWL_RUN_KEY, dumps(run), ex=self.window_seconds)
+        self.redis._count_round_trip()
+
+    @redis_call
+    def _delete_run(self):
+        self.client.delete(CRAWL_RUN_KEY,
+                           f"{CRAWL_DONE_CATEGORIES_KEY}{self.run_id}")
+        self.redis._count_round_trip()
+
+    @redis_call
+    def load(self, category: ProductCategories, website: Websites) -> CrawlCheckpoint | None:
+        """
+        Get the checkpoint of a unit of the current run.
+
+        args:
+            category (ProductCategories): The category.
+            website (Websites): The website.
+
+        return:
+            CrawlCheckpoint | None: The checkpoint, None if the unit was not started.
+        """
+        if self.run_id is None:
+            return None
+
+        value = self.client.get(self._key(category, website))
+        self.redis._count_round_trip()
+
+        return loads(value) if value is not None else None
+
+    def save_progress(self, category: ProductCategories, website: Websites, page: int, page_url: str | None,
+                      products: List[Product]):
+        """
+        Save the page a unit is on.
+
+        args:
+            category (ProductCategories): The category.
+            website (Websites): The website.
+            page (int): The page number being crawled.
+            page_url (str | None): The url to reload the page from, None when pages are built from `page=N`.
+            products (List[Product]): The products found before this page.
+        """
+        self._save(category, website, {"page": page, "page_url": page_url, "products": products,
+                                        "done": False, "updated_at": time()})
+
+    def complete(self, category: ProductCategories, website: Websites, products: List[Product]):
+        """
+        Mark a unit as finished, with all of its products.
+        """
+        self._save(category, website, {"page": 0, "page_url": None, "products": products,
+                                        "done": True, "updated_at": time()})
+
+    @redis_call
+    def complete_category(self, category: ProductCategories):
+        """
+        Mark a category as finished, its products are cached and inserted.
+        """
+        if self.run_id is None:
+            return
+
+        pipe = self.client.pipeline()
+        pipe.sadd(f"{CRAWL_DONE_CATEGORIES_KEY}{self.run_id}", category.value)
+        pipe.expire(
+            f"{CRAWL_DONE_CATEGORIES_KEY}{self.run_id}", self.window_seconds)
+        pipe.execute()
+        self.redis._count_round_trip()
+
+    @redis_call
+    def done_categories(self) -> List[ProductCategories]:
+        """
+        Get the categories the current run already finished.
+        """
+        if self.run_id is None:
+            return []
+
+        done = self.client.smembers(f"{CRAWL_DONE_CATEGORIES_KEY}{self.run_id}")
+        self.redis._count_round_trip()
+
+        return [category for category in ProductCategories if category.value in done]
+
+    @redis_call
+    def _save(self, category: ProductCategories, website: Websites, checkpoint: CrawlCheckpoint):
+        if self.run_id is None:
+            return
+
+        self.client.set(self._key(category, website), dumps(checkpoint),
+                        ex=self.window_seconds)
+        self.redis._count_round_trip()
+
+    def _key(self, category: ProductCategories, website: Websites) -> str:
+        return f"{CRAWL_CHECKPOINT_KEY}{self.run_id}:{category.value}:{website.value}"
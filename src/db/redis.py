@@ -1,10 +1,19 @@
-from os import getenv
+from os import getenv, replace
+from time import time
 from redis import Redis
-from typing import Awaitable, Optional
+from json import dumps, loads
+from threading import Lock, local
+from typing import Awaitable, Dict, List, Optional, Set
 from logging import warning, error, info
 from redis.exceptions import ConnectionError, RedisError, MaxConnectionsError
 
-from ..constants.redis_key import PRODUCT_URL_CACHE_KEY
+from .bloom_filter import BloomFilter
+from .url_snapshot import UrlSnapshot
+from ..lib.types import RatingCacheStats, RatingDetails
+from ..lib.metrics import REDIS_DEDUP_SECONDS, REDIS_DEDUP_URLS
+from ..constants.const import BLOOM_FILTER, BLOOM_FILTER_CAPACITY, BLOOM_FILTER_ERROR_RATE, BLOOM_FILTER_PATH, FLIPKART_RATING_CACHE_TTL, URL_SNAPSHOT_MAX_SIZE
+from ..helpers.helper_functions import get_canonical_product_id
+from ..constants.redis_key import PRODUCT_RATING_CACHE_KEY, PRODUCT_DEDUP_BLOOM_KEY, PRODUCT_DEDUP_BLOOM_META_KEY, PRODUCT_DEDUP_EXPIRE_TIME, PRODUCT_DEDUP_INDEX_KEY, PRODUCT_URL_CACHE_KEY
 
 
 def redis_call(func):
@@ -35,6 +44,33 @@ class RedisDB:
         self.client = None
         self.pool = None
 
+        # Round trips are counted per thread so parallel workers can measure their own pages
+        self._local = local()
+
+        # In-process copy of the dedup index, None means lookups go to Redis
+        self.url_snapshot: UrlSnapshot | None = None
+        self.url_snapshot_max_size = URL_SNAPSHOT_MAX_SIZE
+
+        # Bloom filter in front of the dedup index, definite misses skip the exact lookup
+        self.bloom_filter: BloomFilter | None = None
+        self.bloom_backend = BLOOM_FILTER
+        self.bloom_path = BLOOM_FILTER_PATH
+        self.binary_client = None
+        # Categories are cached from several threads, the in-memory tiers are updated one write at a time
+        self._tiers_lock = Lock()
+
+        # Rating cache counters of the current run
+        self._stats_lock = Lock()
+        self.rating_cache_stats: RatingCacheStats = {"hits": 0, "misses": 0}
+
+    @property
+    def round_trips(self) -> int:
+        """Number of Redis round trips made by the current thread"""
+        return getattr(self._local, "round_trips", 0)
+
+    def _count_round_trip(self, count: int = 1):
+        self._local.round_trips = self.round_trips + count
+
     def __enter__(self):
         try:
             self.client = Redis(
@@ -68,8 +104,28 @@ class RedisDB:
             warning(f"⚠️ Max connection hit error: {e}")
             return False
 
+    def _get_binary_client(self) -> Redis:
+        """Client without response decoding, for raw bitmaps"""
+        if self.binary_client is None:
+            self.binary_client = Redis(
+                host=self.host,
+                port=self.port,
+                password=self.password,
+                username=self.username,
+                db=self.db,
+                socket_timeout=5,
+                socket_connect_timeout=2,
+                health_check_interval=30
+            )
+
+        return self.binary_client
+
     def __exit__(self, exc_type, exc_value, traceback):
         try:
+            if self.binary_client:
+                self.binary_client.connection_pool.disconnect()
+                self.binary_client = None
+
             if self.client and self.pool:
                 self.pool.disconnect()
                 self.client = None
@@ -99,6 +155,7 @@ class RedisDB:
         return:
             bool: True if the value is a member of the set, False otherwise.
         """
+        self._count_round_trip()
         if self.client.sismember(key, member):
             return True
         else:
@@ -115,6 +172,7 @@ class RedisDB:
         return:
             list: A list of all members of the set.
         """
+        self._count_round_trip()
         return list(self.client.smembers(key))
 
     @redis_call
@@ -137,9 +195,11 @@ class RedisDB:
 
         member = [member] if isinstance(member, str) else member
         result = self.client.sadd(key, *member)
+        self._count_round_trip()
 
         if expire_time:
             self.client.expire(key, expire_time)
+            self._count_round_trip()
 
         return result
 
@@ -158,17 +218,19 @@ class RedisDB:
             warning("⚠️ Redis client is not connected.")
             return 0
 
+        self._count_round_trip()
         return self.client.delete(key)
 
     @redis_call
-    def is_url_cached(self, url: str, pattern: str = f"{PRODUCT_URL_CACHE_KEY}*") -> bool:
+    @REDIS_DEDUP_SECONDS.timed
+    def is_url_cached(self, url: str) -> bool:
         """
         Check if the given URL is already in the Redis database.
 
+        The lookup is a single ZSCORE on the dedup index, whatever the number of categories.
+
         args:
             url (str): The URL to check.
-            pattern (str): The pattern to match keys.
-                Default is PRODUCT_URL_CACHE_KEY.
 
         return:
             bool: True if the URL is found, False otherwise.
@@ -177,25 +239,412 @@ class RedisDB:
             warning("⚠️ Redis client is not connected.")
             return False
 
-        cursor = 0
+        REDIS_DEDUP_URLS.inc()
+        product_id = get_canonical_product_id(url)
+
+        snapshot = self.url_snapshot
+        if snapshot is not None:
+            return product_id in snapshot
+
+        bloom_filter = self.bloom_filter
+        if bloom_filter is not None and product_id not in bloom_filter:
+            return False
 
-        while True:
-            cursor, keys = self.client.scan(cursor=cursor, match=pattern)
+        expires_at = self.client.zscore(PRODUCT_DEDUP_INDEX_KEY, product_id)
+        self._count_round_trip()
 
-            if not keys:
-                if cursor == 0:
-                    break
-                continue
+        return expires_at is not None and expires_at > time()
 
+    @redis_call
+    def add_to_dedup_index(self, urls: List[str], expire_time: int = PRODUCT_DEDUP_EXPIRE_TIME) -> int:
+        """
+        Add product urls to the dedup index.
+
+        Every entry expires on its own after `expire_time` seconds, expired entries
+        are pruned on write.
+
+        args:
+            urls (List[str]): The product urls to add.
+            expire_time (int): The expiration time in seconds.
+
+        return:
+            int: The number of new entries.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return 0
+
+        if not urls:
+            return 0
+
+        now = time()
+        expires_at = now + expire_time
+        product_ids = [get_canonical_product_id(url) for url in urls]
+
+        self._add_to_snapshot(product_ids)
+        bloom_positions = self._add_to_bloom_filter(product_ids)
+
+        pipe = self.client.pipeline()
+        pipe.zadd(PRODUCT_DEDUP_INDEX_KEY, {
+            product_id: expires_at for product_id in product_ids}, gt=True)
+        pipe.zremrangebyscore(PRODUCT_DEDUP_INDEX_KEY, "-inf", now)
+        pipe.expire(PRODUCT_DEDUP_INDEX_KEY, expire_time)
+        self.queue_bloom_bits(pipe, bloom_positions, len(product_ids))
+
+        result = pipe.execute()[0]
+        self._count_round_trip()
+
+        return result
+
+    @redis_call
+    @REDIS_DEDUP_SECONDS.timed
+    def get_cached_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Get which of the given URLs are already in the dedup index, in one round trip.
+
+        args:
+            urls (List[str]): The URLs to check.
+
+        return:
+            Set[str]: The URLs that are cached.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return set()
+
+        if not urls:
+            return set()
+
+        REDIS_DEDUP_URLS.inc(len(urls))
+        product_ids = {url: get_canonical_product_id(url) for url in urls}
+
+        snapshot = self.url_snapshot
+        if snapshot is not None:
+            return {url for url, product_id in product_ids.items() if product_id in snapshot}
+
+        # Without a snapshot (too large, or dropped mid-run) only probable hits of the bloom filter need the authoritative lookup
+        bloom_filter = self.bloom_filter
+        if bloom_filter is not None:
+            product_ids = {url: product_id for url, product_id in product_ids.items()
+                           if product_id in bloom_filter}
+
+            if not product_ids:
+                return set()
+
+        scores = self.client.zmscore(
+            PRODUCT_DEDUP_INDEX_KEY, list(product_ids.values()))
+        self._count_round_trip()
+
+        now = time()
+        return {url for url, expires_at in zip(product_ids, scores) if expires_at is not None and expires_at > now}
+
+    @redis_call
+    def migrate_url_cache_sets(self, pattern: str = f"{PRODUCT_URL_CACHE_KEY}*") -> int:
+        """
+        Move the legacy `url_cache_<category>` sets into the dedup index.
+
+        Members keep the remaining TTL of their set, migrated sets are deleted so
+        the migration only runs once.
+
+        args:
+            pattern (str): The pattern to match legacy keys.
+
+        return:
+            int: The number of migrated urls.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return 0
+
+        migrated = 0
+        now = time()
+        latest_expiry = now + PRODUCT_DEDUP_EXPIRE_TIME
+
+        for key in self.client.scan_iter(match=pattern):
             pipe = self.client.pipeline()
-            for key in keys:
-                pipe.sismember(key, url)
+            pipe.smembers(key)
+            pipe.ttl(key)
+            members, ttl = pipe.execute()
 
-            results = pipe.execute()
-            if any(results):
-                return True
+            expires_at = now + (ttl if ttl > 0 else PRODUCT_DEDUP_EXPIRE_TIME)
+            latest_expiry = max(latest_expiry, expires_at)
+
+            pipe = self.client.pipeline()
+            if members:
+                pipe.zadd(PRODUCT_DEDUP_INDEX_KEY, {
+                    get_canonical_product_id(url): expires_at for url in members}, gt=True)
+            pipe.delete(key)
+            pipe.execute()
+            self._count_round_trip(2)
+
+            migrated += len(members)
+
+        if migrated:
+            self.client.expireat(PRODUCT_DEDUP_INDEX_KEY, int(latest_expiry))
+            self._count_round_trip()
+            info(f"🔀 Migrated {migrated} cached urls into the dedup index.")
+
+        return migrated
+
+    @redis_call
+    def load_url_snapshot(self) -> bool:
+        """
+        Load the live entries of the dedup index into memory, so dedup checks skip Redis.
+
+        Nothing is loaded when the index holds more than `url_snapshot_max_size`
+        entries, lookups then stay live.
+
+        return:
+            bool: True if the snapshot was loaded, False otherwise.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return False
+
+        self.url_snapshot = None
+
+        if self.url_snapshot_max_size <= 0:
+            return False
+
+        now = time()
+        size = self.client.zcount(PRODUCT_DEDUP_INDEX_KEY, now, "+inf")
+        self._count_round_trip()
 
-            if cursor == 0:
-                break
+        if size > self.url_snapshot_max_size:
+            warning(
+                f"⚠️ Dedup index has {size} entries (limit {self.url_snapshot_max_size}), using live lookups.")
+            return False
+
+        snapshot = UrlSnapshot()
+        snapshot.add(self.client.zrangebyscore(
+            PRODUCT_DEDUP_INDEX_KEY, now, "+inf"))
+        self._count_round_trip()
+
+        self.url_snapshot = snapshot
+        info(f"📸 Loaded {len(snapshot)} cached urls into memory.")
+
+        return True
+
+    def load_dedup_tiers(self):
+        """
+        Load the in-memory tiers answering the dedup checks of a run.
+
+        The url snapshot answers every check while it is loaded. The bloom filter is loaded
+        whatever the snapshot does, so it sees every write: it screens the ZMSCORE lookups
+        once the snapshot is dropped for outgrowing its limit, and a filter persisted while
+        the snapshot was active never misses urls added in the meantime.
+        """
+        self.load_url_snapshot()
+        self.load_bloom_filter()
+
+    def _add_to_snapshot(self, product_ids: List[str]):
+        """
+        Keep the snapshot in sync with writes, dropping it once it outgrows its limit.
+        """
+        with self._tiers_lock:
+            snapshot = self.url_snapshot
+            if snapshot is None:
+                return
+
+            snapshot.add(product_ids)
+
+            if len(snapshot) > self.url_snapshot_max_size:
+                warning("⚠️ Url snapshot outgrew its limit, using live lookups.")
+                self.url_snapshot = None
+
+    def _add_to_bloom_filter(self, product_ids: List[str]) -> Set[int]:
+        """
+        Keep the bloom filter in sync with writes, saving the file backend.
+
+        return:
+            Set[int]: The bit positions to set in the Redis bitmap, empty for the other backends.
+        """
+        with self._tiers_lock:
+            bloom_filter = self.bloom_filter
+            if bloom_filter is None:
+                return set()
+
+            positions = bloom_filter.add(product_ids)
+
+            if self.bloom_backend == "file":
+                self.save_bloom_filter()
+                return set()
+
+            return positions
+
+    @staticmethod
+    def queue_bloom_bits(pipe, positions: Set[int], count: int):
+        """
+        Queue the SETBIT writes of new bloom filter entries on a pipeline.
+
+        Only the new bits are written, not the whole bitmap, so entries other processes
+        added since this one loaded the filter are kept.
+
+        args:
+            pipe: The pipeline of the dedup index write.
+            positions (Set[int]): The bit positions to set.
+            count (int): The number of entries they belong to.
+        """
+        if not positions:
+            return
+
+        for position in sorted(positions):
+            pipe.setbit(PRODUCT_DEDUP_BLOOM_KEY, position, 1)
+        pipe.hincrby(PRODUCT_DEDUP_BLOOM_META_KEY, "count", count)
+
+    @redis_call
+    def load_bloom_filter(self) -> bool:
+        """
+        Load the persisted bloom filter, rebuilding it from the dedup index when it
+        is missing, sized differently or saturated.
+
+        return:
+            bool: True if the bloom filter tier is active, False otherwise.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return False
+
+        self.bloom_filter = None
+
+        if self.bloom_backend not in ("redis", "file"):
+            return False
+
+        bloom_filter = None
+        try:
+            bloom_filter = self._read_bloom_filter()
+        except (OSError, ValueError) as e:
+            warning(f"⚠️ Stored bloom filter is unusable: {e}")
+
+        if bloom_filter is None or bloom_filter.is_saturated or bloom_filter.capacity != BLOOM_FILTER_CAPACITY or bloom_filter.error_rate != BLOOM_FILTER_ERROR_RATE:
+            bloom_filter = BloomFilter(
+                BLOOM_FILTER_CAPACITY, BLOOM_FILTER_ERROR_RATE)
+
+            now = time()
+            bloom_filter.add(product_id for product_id, expires_at in self.client.zscan_iter(
+                PRODUCT_DEDUP_INDEX_KEY) if expires_at > now)
+            self._count_round_trip()
+
+            self.bloom_filter = bloom_filter
+            self.save_bloom_filter()
+            info(
+                f"🌸 Rebuilt bloom filter with {bloom_filter.count} urls.")
+        else:
+            self.bloom_filter = bloom_filter
+            info(f"🌸 Loaded bloom filter with {bloom_filter.count} urls.")
+
+        return True
+
+    @redis_call
+    def save_bloom_filter(self) -> bool:
+        """
+        Persist the bloom filter as a Redis bitmap or a local file.
+
+        return:
+            bool: True if the filter was saved, False otherwise.
+        """
+        bloom_filter = self.bloom_filter
+        if bloom_filter is None:
+            return False
+
+        if self.bloom_backend == "file":
+            temp_path = f"{self.bloom_path}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(bloom_filter.to_file_bytes())
+            replace(temp_path, self.bloom_path)
+            return True
+
+        pipe = self._get_binary_client().pipeline()
+        pipe.set(PRODUCT_DEDUP_BLOOM_KEY, bytes(bloom_filter.bits))
+        pipe.hset(PRODUCT_DEDUP_BLOOM_META_KEY, mapping={
+            "capacity": bloom_filter.capacity,
+            "error_rate": repr(bloom_filter.error_rate),
+            "count": bloom_filter.count,
+        })
+        pipe.execute()
+        self._count_round_trip()
+
+        return True
+
+    def _read_bloom_filter(self) -> BloomFilter | None:
+        if self.bloom_backend == "file":
+            try:
+                with open(self.bloom_path, "rb") as file:
+                    return BloomFilter.from_file_bytes(file.read())
+            except FileNotFoundError:
+                return None
+
+        pipe = self._get_binary_client().pipeline()
+        pipe.get(PRODUCT_DEDUP_BLOOM_KEY)
+        pipe.hgetall(PRODUCT_DEDUP_BLOOM_META_KEY)
+        bits, meta = pipe.execute()
+        self._count_round_trip()
+
+        if bits is None or not meta:
+            return None
+
+        return BloomFilter(int(meta[b"capacity"]), float(meta[b"error_rate"]), bits, int(meta[b"count"]))
+
+    @redis_call
+    def get_cached_ratings(self, urls: List[str]) -> Dict[str, RatingDetails]:
+        """
+        Get the cached rating details of the given product urls, in one round trip.
+
+        args:
+            urls (List[str]): The product urls.
+
+        return:
+            Dict[str, RatingDetails]: Rating details per url, misses are left out.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return {}
+
+        if not urls:
+            return {}
+
+        values = self.client.mget(
+            [f"{PRODUCT_RATING_CACHE_KEY}{get_canonical_product_id(url)}" for url in urls])
+        self._count_round_trip()
+
+        ratings = {url: loads(value)
+                   for url, value in zip(urls, values) if value is not None}
+
+        with self._stats_lock:
+            self.rating_cache_stats["hits"] += len(ratings)
+            self.rating_cache_stats["misses"] += len(urls) - len(ratings)
+
+        return ratings
+
+    @redis_call
+    def cache_ratings(self, ratings: Dict[str, RatingDetails], expire_time: int = FLIPKART_RATING_CACHE_TTL) -> bool:
+        """
+        Cache rating details per canonical product id.
+
+        args:
+            ratings (Dict[str, RatingDetails]): Rating details per product url.
+            expire_time (int): The expiration time in seconds.
+
+        return:
+            bool: True if the ratings were cached, False otherwise.
+        """
+        if not self.client:
+            warning("⚠️ Redis client is not connected.")
+            return False
+
+        if not ratings:
+            return True
+
+        pipe = self.client.pipeline()
+        for url, rating_details in ratings.items():
+            pipe.set(f"{PRODUCT_RATING_CACHE_KEY}{get_canonical_product_id(url)}",
+                     dumps(rating_details), ex=expire_time)
+        pipe.execute()
+        self._count_round_trip()
+
+        return True
 
-        return False
+    def reset_rating_cache_stats(self):
+        """Reset the rating cache counters at the start of a run"""
+        with self._stats_lock:
+            self.rating_cache_stats = {"hits": 0, "misses": 0}
@@ -1,11 +1,22 @@
-from logging import error, warning
-from time import sleep
-from typing import List
+from logging import error, info, warning
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any, Dict, List
+from asyncio import Semaphore, gather, sleep as async_sleep
+from concurrent.futures import ThreadPoolExecutor
+from httpx import AsyncClient, Client as HttpClient, Limits, Timeout
 from supabase import create_client, Client
 from supabase.client import ClientOptions
 from os import getenv
 
-from ..lib.types import Product
+from ..lib.types import InsertResult, InsertStats, Product
+from ..lib.metrics import SUPABASE_FAILED_PRODUCTS, SUPABASE_INSERT_SECONDS, SUPABASE_INSERTED_PRODUCTS, LabelValues, current_labels
+from ..constants.const import SUPABASE_INSERT_CHUNK_SIZE, SUPABASE_INSERT_CONCURRENCY
+
+# Rows are keyed by product url, a chunk sent again (retry or rerun) leaves the stored rows untouched.
+# Needs the unique constraint of supabase/migrations/20261018000000_products_product_url_unique.sql
+UPSERT_PARAMS = {"on_conflict": "product_url"}
+UPSERT_HEADERS = {"Prefer": "resolution=ignore-duplicates,return=minimal"}
 
 
 def retry(max_retries: int):
@@ -26,8 +37,34 @@ def retry(max_retries: int):
     return decorator
 
 
+def async_retry(max_retries: int):
+    def decorator(func):
+        async def wrapper(*args, **kwargs):
+            for retry_count in range(max_retries):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if retry_count < max_retries - 1:
+                        wait_time = 2 ** retry_count
+                        warning(
+                            f"Attempt {retry_count + 1}/{max_retries} failed: {str(e)}. Retrying in {wait_time} seconds...")
+                        await async_sleep(wait_time)
+                    else:
+                        return None
+        return wrapper
+    return decorator
+
+
 class SupaBaseClient:
-    def __init__(self) -> None:
+    def __init__(self, chunk_size: int = SUPABASE_INSERT_CHUNK_SIZE, concurrency: int = SUPABASE_INSERT_CONCURRENCY,
+                 http_client: HttpClient | None = None) -> None:
+        """
+        Args:
+            chunk_size (int): Products sent per insert request.
+            concurrency (int): Maximum number of insert requests in flight.
+            http_client (HttpClient | None): Client to send inserts with instead of the pooled HTTP/2
+                client, its base url must point at the PostgREST root (`<SUPABASE_URL>/rest/v1`).
+        """
         url = getenv("SUPABASE_URL")
         key = getenv("SUPABASE_KEY")
 
@@ -38,6 +75,14 @@ class SupaBaseClient:
         self.supabase_key: str = key  # type: ignore
 
         self.MAIN_TABLE = "products"
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+        self.http: HttpClient | None = http_client
+        self.async_http: AsyncClient | None = None
+
+        self._stats_lock = Lock()
+        self._stats: InsertStats = {"chunks": 0, "failed_chunks": 0, "products": 0,
+                                    "failed_products": 0, "avg_chunk_latency": 0.0, "max_chunk_latency": 0.0}
 
     def connect(self):
         try:
@@ -53,15 +98,181 @@ class SupaBaseClient:
 
             self.supabase = supabase_client
 
+            if self.http is None:
+                self.http = HttpClient(**self._http_client_options())
+
             return self
         except Exception as e:
             error(f"⛔ Unexpected error: {e}")
             return False
 
+    def _http_client_options(self) -> Dict[str, Any]:
+        """Options of the pooled HTTP/2 clients sending inserts to PostgREST"""
+        return {
+            "http2": True,
+            "base_url": f"{self.supabase_url.rstrip('/')}/rest/v1",
+            "headers": {
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}",
+            },
+            "timeout": Timeout(10),
+            "limits": Limits(max_connections=self.concurrency,
+                             max_keepalive_connections=self.concurrency),
+        }
+
+    def insert_products(self, products: List[Product]) -> InsertResult:
+        """
+        Upsert products in chunks sent concurrently, each chunk is retried on its own.
+
+        A product url is sent once per call, and a url already stored is skipped by the
+        server, so retried chunks and reruns never duplicate rows.
+
+        Args:
+            products (List[Product]): The products to insert.
+
+        Returns:
+            InsertResult: The number of products sent successfully and of products whose chunk failed.
+        """
+        chunks = self._split_in_chunks(products)
+
+        if len(chunks) == 0:
+            return {"inserted": 0, "failed": 0}
+
+        # Executor threads do not inherit the caller's metric labels
+        labels = current_labels()
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks)), thread_name_prefix="supabase-insert") as executor:
+            results = list(executor.map(
+                lambda chunk: self._insert_chunk(chunk, labels), chunks))
+
+        return self._summarize(chunks, results)
+
+    async def insert_products_async(self, products: List[Product]) -> InsertResult:
+        """
+        Same as `insert_products`, with the chunks sent from the running event loop.
+
+        Args:
+            products (List[Product]): The products to insert.
+
+        Returns:
+            InsertResult: The number of products sent successfully and of products whose chunk failed.
+        """
+        chunks = self._split_in_chunks(products)
+
+        if len(chunks) == 0:
+            return {"inserted": 0, "failed": 0}
+
+        semaphore = Semaphore(self.concurrency)
+
+        async def insert_chunk(chunk: List[Product]) -> bool:
+            async with semaphore:
+                start = perf_counter()
+                res = await self._post_chunk_async(chunk)
+                self._record_chunk(chunk, perf_counter() - start,
+                                   res is not None, current_labels())
+
+                return res is not None
+
+        results = await gather(*(insert_chunk(chunk) for chunk in chunks))
+
+        return self._summarize(chunks, list(results))
+
+    def _split_in_chunks(self, products: List[Product]) -> List[List[Product]]:
+        # One row per url, a product found twice in a run is inserted once
+        products_by_url: Dict[str, Product] = {}
+        for product in products:
+            if product.get("product_url"):
+                products_by_url.setdefault(product["product_url"], product)
+
+        unique_products = list(products_by_url.values())
+
+        return [unique_products[start:start + self.chunk_size]
+                for start in range(0, len(unique_products), self.chunk_size)]
+
+    def _summarize(self, chunks: List[List[Product]], results: List[bool]) -> InsertResult:
+        total = sum(len(chunk) for chunk in chunks)
+        failed = sum(len(chunk) for chunk, inserted in zip(
+            chunks, results) if not inserted)
+
+        if failed > 0:
+            error(
+                f"⛔ Failed to insert {failed}/{total} products into Supabase")
+
+        return {"inserted": total - failed, "failed": failed}
+
+    def _insert_chunk(self, chunk: List[Product], labels: LabelValues) -> bool:
+        start = perf_counter()
+        res = self._post_chunk(chunk)
+        self._record_chunk(chunk, perf_counter() - start,
+                           res is not None, labels)
+
+        return res is not None
+
+    def _record_chunk(self, chunk: List[Product], latency: float, inserted: bool, labels: LabelValues):
+        SUPABASE_INSERT_SECONDS.observe(latency, labels)
+        if inserted:
+            SUPABASE_INSERTED_PRODUCTS.inc(len(chunk), labels)
+        else:
+            SUPABASE_FAILED_PRODUCTS.inc(len(chunk), labels)
+
+        with self._stats_lock:
+            stats = self._stats
+            stats["chunks"] += 1
+            stats["products"] += len(chunk)
+            stats["avg_chunk_latency"] += (latency -
+                                           stats["avg_chunk_latency"]) / stats["chunks"]
+            stats["max_chunk_latency"] = max(
+                stats["max_chunk_latency"], latency)
+
+            if not inserted:
+                stats["failed_chunks"] += 1
+                stats["failed_products"] += len(chunk)
+
     @retry(3)
-    def insert_products(self, products: List[Product]):
-        res = self.supabase.rpc("insert_products", {
-            "products": products
-        }).execute()
+    def _post_chunk(self, chunk: List[Product]):
+        if self.http is None:
+            raise RuntimeError("Supabase client is not connected")
+
+        res = self.http.post(f"/{self.MAIN_TABLE}", params=UPSERT_PARAMS,
+                             headers=UPSERT_HEADERS, json=chunk)
+        res.raise_for_status()
 
         return res
+
+    @async_retry(3)
+    async def _post_chunk_async(self, chunk: List[Product]):
+        if self.async_http is None:
+            self.async_http = AsyncClient(**self._http_client_options())
+
+        res = await self.async_http.post(f"/{self.MAIN_TABLE}", params=UPSERT_PARAMS,
+                                         headers=UPSERT_HEADERS, json=chunk)
+        res.raise_for_status()
+
+        return res
+
+    async def aclose(self):
+        """
+        Close the connections opened by `insert_products_async`, from the loop that used them.
+        """
+        if self.async_http is not None:
+            await self.async_http.aclose()
+            self.async_http = None
+
+    def insert_stats(self) -> InsertStats:
+        """
+        Get the chunk counts, failures and latencies of the inserts made so far.
+        """
+        with self._stats_lock:
+            return {**self._stats}
+
+    def close(self):
+        """
+        Close the insert connections and log the insert stats.
+        """
+        stats = self.insert_stats()
+        if stats["chunks"] > 0:
+            info(
+                f"🗄️  Supabase inserts | chunks: {stats['chunks']} | failed chunks: {stats['failed_chunks']} | avg latency: {stats['avg_chunk_latency']:.2f}s | max latency: {stats['max_chunk_latency']:.2f}s")
+
+        if self.http is not None:
+            self.http.close()
+            self.http = None
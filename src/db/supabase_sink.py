@@ -0,0 +1,174 @@
+from queue import Queue
+from threading import Lock, Thread
+from logging import error, info, warning
+from typing import List, Set, Tuple
+
+from .supabase import SupaBaseClient
+from .crawl_checkpoint import CrawlCheckpoints
+from ..lib.metrics import metric_labels
+from ..lib.types import Product, ProductCategories, SinkStats
+from ..constants.const import SUPABASE_SINK_BATCH_SIZE, SUPABASE_SINK_MAX_PENDING
+
+
+class SupabaseSink:
+    """
+        Streams products to Supabase while the crawl goes on.
+        Products are buffered and handed to a background thread per category or
+        once a batch fills up. At most `max_pending` batches wait to be inserted,
+        adding more blocks the caller until the inserts catch up.
+        With checkpoints, a category is marked done once every batch of it was inserted.
+    """
+
+    def __init__(self, supabase: SupaBaseClient, batch_size: int = SUPABASE_SINK_BATCH_SIZE, max_pending: int = SUPABASE_SINK_MAX_PENDING,
+                 checkpoints: CrawlCheckpoints | None = None):
+        """
+        Start the insert thread.
+
+        Args:
+            supabase (SupaBaseClient): The connected Supabase client.
+            batch_size (int): Flush the buffer once it holds this many products, 0 only flushes per category.
+            max_pending (int): Maximum number of batches waiting to be inserted.
+            checkpoints (CrawlCheckpoints | None): Mark the categories whose products were all inserted as done.
+        """
+        self.supabase = supabase
+        self.batch_size = max(0, batch_size)
+        self.checkpoints = checkpoints
+
+        self._buffer: List[Product] = []
+        # Category label of the buffered products, for the insert metrics
+        self._buffer_category = ""
+        self._lock = Lock()
+        # Batches to insert, a category once all its batches are queued, None to stop
+        self._pending: Queue[Tuple[str, List[Product]] | ProductCategories | None] = Queue(
+            maxsize=max(1, max_pending))
+        # Labels of the categories with a failed batch, they are not marked done
+        self._failed_categories: Set[str] = set()
+        self._stats: SinkStats = {"batches": 0, "failed_batches": 0,
+                                  "products_inserted": 0, "products_failed": 0}
+
+        self._thread = Thread(target=self._run, name="supabase-sink", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "SupabaseSink":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, products: List[Product], category: str = ""):
+        """
+        Buffer products, flushing every full batch.
+        A batch only holds products of one category, the buffer is flushed first when the category changes.
+
+        Args:
+            products (List[Product]): The products to insert.
+            category (str): The category label of the products.
+        """
+        with self._lock:
+            if len(self._buffer) > 0 and category != self._buffer_category:
+                self._pending.put((self._buffer_category, self._buffer))
+                self._buffer = []
+
+            self._buffer.extend(products)
+            self._buffer_category = category
+
+            while self.batch_size and len(self._buffer) >= self.batch_size:
+                batch = self._buffer[:self.batch_size]
+                self._buffer = self._buffer[self.batch_size:]
+                self._pending.put((category, batch))
+
+    def add_category(self, category: ProductCategories, products: List[Product], finished: bool = True):
+        """
+        Insert the products of a finished category without waiting for a full batch,
+        and mark it done once they are inserted.
+
+        Args:
+            category (ProductCategories): The finished category.
+            products (List[Product]): Its best products.
+            finished (bool): False when a crawl of the category stopped early, it is left for a resumed run.
+        """
+        if len(products) > 0:
+            info(
+                f"📤 Queued {len(products)} {category.value} products for Supabase")
+            self.add(products, category.value)
+            self.flush()
+
+        if finished:
+            self._pending.put(category)
+
+    def flush(self):
+        """
+        Hand the buffered products to the insert thread.
+        """
+        with self._lock:
+            if len(self._buffer) == 0:
+                return
+
+            batch = self._buffer
+            self._buffer = []
+            self._pending.put((self._buffer_category, batch))
+
+    def stats(self) -> SinkStats:
+        """
+        Get the batches and products inserted so far.
+        """
+        return {**self._stats}
+
+    def close(self):
+        """
+        Flush the buffer, wait for every pending insert and log the totals.
+        """
+        if not self._thread.is_alive():
+            return
+
+        self.flush()
+        self._pending.put(None)
+        self._thread.join()
+
+        stats = self._stats
+        info(
+            f"🗄️  Supabase sink | batches: {stats['batches']} | inserted: {stats['products_inserted']} | failed: {stats['products_failed']}")
+
+        if stats["failed_batches"] > 0:
+            error(
+                f"⛔ {stats['failed_batches']} Supabase batches failed, {stats['products_failed']} products were not inserted")
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+
+            if item is None:
+                return
+
+            if isinstance(item, ProductCategories):
+                self._complete_category(item)
+                continue
+
+            category, batch = item
+            try:
+                with metric_labels(category=category):
+                    res = self.supabase.insert_products(batch)
+            except Exception as e:
+                warning(f"⚠️ Error inserting products into Supabase: {str(e)}")
+                res = {"inserted": 0, "failed": len(batch)}
+
+            self._stats["batches"] += 1
+            self._stats["products_inserted"] += res["inserted"]
+            self._stats["products_failed"] += res["failed"]
+            if res["failed"] > 0:
+                self._stats["failed_batches"] += 1
+                self._failed_categories.add(category)
+
+    def _complete_category(self, category: ProductCategories):
+        """
+        Mark a category done once all its batches went through, the batches before it in the queue are inserted.
+        """
+        if self.checkpoints is None:
+            return
+
+        if category.value in self._failed_categories:
+            warning(
+                f"⚠️ Not marking {category.value} as done, some of its products were not inserted")
+            return
+
+        self.checkpoints.complete_category(category)
@@ -0,0 +1,34 @@
+from hashlib import blake2b
+from typing import Iterable, Set
+
+
+class UrlSnapshot:
+    """
+    Compact in-memory copy of the dedup index.
+
+    Canonical product ids are stored as 64-bit hashes, which keeps a snapshot of
+    100k products at a few MB while the chance of a false match stays negligible.
+    """
+
+    def __init__(self):
+        self._hashes: Set[int] = set()
+
+    @staticmethod
+    def _hash(product_id: str) -> int:
+        return int.from_bytes(blake2b(product_id.encode(), digest_size=8).digest(), "big")
+
+    def add(self, product_ids: Iterable[str]):
+        """
+        Add canonical product ids to the snapshot.
+
+        args:
+            product_ids (Iterable[str]): The canonical product ids.
+        """
+        self._hashes.update(UrlSnapshot._hash(product_id)
+                            for product_id in product_ids)
+
+    def __contains__(self, product_id: str) -> bool:
+        return UrlSnapshot._hash(product_id) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
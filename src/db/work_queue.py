@@ -0,0 +1,328 @@
+from json import dumps, loads
+from logging import info, warning
+from os import getpid
+from socket import gethostname
+from typing import Dict, Iterable, List, Set
+from uuid import uuid4
+from redis.commands.core import Script
+
+from .redis import RedisDB, redis_call
+from ..lib.types import LeasedJob, Product, QueueJob, QueueStats
+from ..constants.const import CRAWL_QUEUE_MAX_ATTEMPTS, CRAWL_QUEUE_NAME, CRAWL_QUEUE_VISIBILITY_TIMEOUT
+from ..constants.redis_key import CRAWL_QUEUE_EXPIRE_TIME, CRAWL_QUEUE_KEY
+
+# Result of a job given up after too many leases
+FAILED_RESULT = '{"products":[],"failed":true}'
+
+# KEYS: pending, leases, owners. Leases not renewed in time go back to the front of the queue
+REQUEUE_EXPIRED = """
+local now = tonumber(redis.call('TIME')[1])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], job_id)
+    redis.call('HDEL', KEYS[3], job_id)
+    redis.call('LPUSH', KEYS[1], job_id)
+end
+"""
+
+REQUEUE_SCRIPT = REQUEUE_EXPIRED + "return #expired\n"
+
+# KEYS: pending, leases, owners, jobs, results
+# ARGV: visibility timeout, lease token, max attempts, key ttl
+LEASE_SCRIPT = REQUEUE_EXPIRED + """
+while true do
+    local job_id = redis.call('LPOP', KEYS[1])
+    if not job_id then
+        return {#expired, false}
+    end
+
+    local encoded = redis.call('HGET', KEYS[4], job_id)
+    if encoded and redis.call('HEXISTS', KEYS[5], job_id) == 0 then
+        local job = cjson.decode(encoded)
+
+        if job['attempts'] >= tonumber(ARGV[3]) then
+            redis.call('HSET', KEYS[5], job_id, '""" + FAILED_RESULT + """')
+        else
+            job['attempts'] = job['attempts'] + 1
+            encoded = cjson.encode(job)
+            redis.call('HSET', KEYS[4], job_id, encoded)
+            redis.call('ZADD', KEYS[2], now + tonumber(ARGV[1]), job_id)
+            redis.call('HSET', KEYS[3], job_id, ARGV[2])
+            redis.call('EXPIRE', KEYS[2], ARGV[4])
+            redis.call('EXPIRE', KEYS[3], ARGV[4])
+            return {#expired, encoded}
+        end
+    end
+end
+"""
+
+# KEYS: leases, owners. ARGV: job id, lease token, visibility timeout
+EXTEND_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+# KEYS: pending, leases, owners, results. ARGV: job id, result, key ttl
+# The first result wins, a job finished by a worker whose lease had expired is not crawled again
+COMPLETE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[4], ARGV[1]) == 1 then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[4], ARGV[3])
+return 1
+"""
+
+# KEYS: pending, leases, owners. ARGV: job id, lease token
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class CrawlQueue:
+    """
+    Queue of (category, website, url) crawl jobs shared by processes on any number of machines.
+
+    A worker leases a job for `visibility_timeout` seconds and renews the lease while it
+    crawls. A lease that is not renewed or completed in time (the worker crashed, hung or
+    lost its connection) puts the job back at the front of the queue for the next worker.
+    A job is given up, with no products, once it was leased `max_attempts` times.
+    Every transition is a Lua script, so two workers never hold the same live lease.
+    """
+
+    def __init__(self, redis: RedisDB, name: str = CRAWL_QUEUE_NAME,
+                 visibility_timeout: int = CRAWL_QUEUE_VISIBILITY_TIMEOUT, max_attempts: int = CRAWL_QUEUE_MAX_ATTEMPTS):
+        """
+        Args:
+            redis (RedisDB): The connected Redis client.
+            name (str): The queue name, coordinators and workers of a crawl share it.
+            visibility_timeout (int): Seconds a lease lasts without being renewed.
+            max_attempts (int): Leases of a job before it is given up.
+        """
+        self.redis = redis
+        self.name = name
+        self.visibility_timeout = max(1, visibility_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.worker_id = f"{gethostname()}:{getpid()}"
+
+        prefix = f"{CRAWL_QUEUE_KEY}{name}:"
+        self.pending_key = f"{prefix}pending"
+        self.leases_key = f"{prefix}leases"
+        self.owners_key = f"{prefix}owners"
+        self.jobs_key = f"{prefix}jobs"
+        self.results_key = f"{prefix}results"
+
+        # Scripts by source, registered once per client so their sha is not hashed on every call
+        self._scripts: Dict[str, Script] = {}
+        self._scripts_client = None
+        if self.client:
+            self._register_scripts()
+
+    @property
+    def client(self):
+        return self.redis.client
+
+    def _register_scripts(self):
+        self._scripts_client = self.client
+        self._scripts = {source: self.client.register_script(source) for source in (
+            LEASE_SCRIPT, EXTEND_SCRIPT, COMPLETE_SCRIPT, RELEASE_SCRIPT, REQUEUE_SCRIPT)}
+
+    def _script(self, source: str) -> Script:
+        """
+        Get a registered script, registering them again if the Redis client was replaced.
+        """
+        if self._scripts_client is not self.client:
+            self._register_scripts()
+
+        return self._scripts[source]
+
+    @redis_call
+    def enqueue(self, jobs: List[QueueJob]) -> int:
+        """
+        Replace whatever the queue held with the given jobs.
+
+        args:
+            jobs (List[QueueJob]): The jobs, leased in this order.
+
+        return:
+            int: The number of queued jobs.
+        """
+        pipe = self.client.pipeline()
+        pipe.delete(self.pending_key, self.leases_key,
+                    self.owners_key, self.jobs_key, self.results_key)
+
+        if jobs:
+            pipe.hset(self.jobs_key, mapping={
+                      job["job_id"]: dumps(job) for job in jobs})
+            pipe.rpush(self.pending_key, *[job["job_id"] for job in jobs])
+            pipe.expire(self.jobs_key, CRAWL_QUEUE_EXPIRE_TIME)
+            pipe.expire(self.pending_key, CRAWL_QUEUE_EXPIRE_TIME)
+
+        pipe.execute()
+        self.redis._count_round_trip()
+
+        info(f"📬 Queued {len(jobs)} crawl jobs on {self.name}")
+
+        return len(jobs)
+
+    @redis_call
+    def lease(self) -> LeasedJob | None:
+        """
+        Lease the next job, putting expired leases back in the queue first.
+
+        return:
+            LeasedJob | None: The job and the token to renew, complete or release it with, None if the queue is empty.
+        """
+        token = f"{self.worker_id}:{uuid4().hex}"
+        requeued, encoded = self._script(LEASE_SCRIPT)(
+            keys=[self.pending_key, self.leases_key, self.owners_key,
+                  self.jobs_key, self.results_key],
+            args=[self.visibility_timeout, token, self.max_attempts, CRAWL_QUEUE_EXPIRE_TIME])
+        self.redis._count_round_trip()
+
+        if requeued:
+            warning(f"⚠️ Re-queued {requeued} crawl jobs whose lease expired")
+
+        if encoded is None:
+            return None
+
+        return {"job": loads(encoded), "token": token}
+
+    @redis_call
+    def extend(self, leased: LeasedJob) -> bool:
+        """
+        Renew a lease for another `visibility_timeout` seconds.
+
+        return:
+            bool: False if the lease was lost, the job may be crawled by another worker.
+        """
+        extended = self._script(EXTEND_SCRIPT)(
+            keys=[self.leases_key, self.owners_key],
+            args=[leased["job"]["job_id"], leased["token"], self.visibility_timeout])
+        self.redis._count_round_trip()
+
+        return extended == 1
+
+    @redis_call
+    def complete(self, leased: LeasedJob, products: List[Product]) -> bool:
+        """
+        Store the products of a leased job and drop its lease.
+
+        args:
+            leased (LeasedJob): The leased job.
+            products (List[Product]): The products it found.
+
+        return:
+            bool: False if another worker already completed the job.
+        """
+        completed = self._script(COMPLETE_SCRIPT)(
+            keys=[self.pending_key, self.leases_key,
+                  self.owners_key, self.results_key],
+            args=[leased["job"]["job_id"], dumps({"products": products, "failed": False}), CRAWL_QUEUE_EXPIRE_TIME])
+        self.redis._count_round_trip()
+
+        return completed == 1
+
+    @redis_call
+    def release(self, leased: LeasedJob) -> bool:
+        """
+        Give a job back to the queue after a failed attempt.
+
+        return:
+            bool: False if the lease was already lost.
+        """
+        released = self._script(RELEASE_SCRIPT)(
+            keys=[self.pending_key, self.leases_key, self.owners_key],
+            args=[leased["job"]["job_id"], leased["token"]])
+        self.redis._count_round_trip()
+
+        return released == 1
+
+    @redis_call
+    def requeue_expired(self) -> int:
+        """
+        Put the jobs whose lease expired back at the front of the queue.
+
+        return:
+            int: The number of re-queued jobs.
+        """
+        requeued = self._script(REQUEUE_SCRIPT)(
+            keys=[self.pending_key, self.leases_key, self.owners_key])
+        self.redis._count_round_trip()
+
+        if requeued:
+            warning(f"⚠️ Re-queued {requeued} crawl jobs whose lease expired")
+
+        return requeued
+
+    @redis_call
+    def done_job_ids(self) -> Set[str]:
+        """
+        Get the ids of the jobs with a result, given up jobs included.
+        """
+        job_ids = self.client.hkeys(self.results_key)
+        self.redis._count_round_trip()
+
+        return set(job_ids)
+
+    @redis_call
+    def results(self, job_ids: Iterable[str]) -> Dict[str, List[Product] | None]:
+        """
+        Get the products of finished jobs.
+
+        args:
+            job_ids (Iterable[str]): The job ids.
+
+        return:
+            Dict[str, List[Product] | None]: The products per job id, None for jobs given up or not finished.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+
+        values = self.client.hmget(self.results_key, job_ids)
+        self.redis._count_round_trip()
+
+        results: Dict[str, List[Product] | None] = {}
+        for job_id, value in zip(job_ids, values):
+            result = loads(value) if value is not None else None
+            results[job_id] = None if result is None or result["failed"] else result["products"]
+
+        return results
+
+    @redis_call
+    def stats(self) -> QueueStats:
+        """
+        Get the number of pending, leased and finished jobs.
+        """
+        pipe = self.client.pipeline()
+        pipe.llen(self.pending_key)
+        pipe.zcard(self.leases_key)
+        pipe.hlen(self.results_key)
+        pipe.hlen(self.jobs_key)
+        pending, leased, done, total = pipe.execute()
+        self.redis._count_round_trip()
+
+        return {"pending": pending, "leased": leased, "done": done, "total": total}
+
+    @redis_call
+    def clear(self):
+        """
+        Remove the queue and its results.
+        """
+        self.client.delete(self.pending_key, self.leases_key,
+                           self.owners_key, self.jobs_key, self.results_key)
+        self.redis._count_round_trip()
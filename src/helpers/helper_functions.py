@@ -1,6 +1,8 @@
 from random import weibullvariate
+from re import search, sub
 from time import sleep
 from logging import warning
+from urllib.parse import unquote, urlparse
 
 from ..lib.types import Websites
 
@@ -54,6 +56,52 @@ def convert_to_number(value_str: str) -> int:
     return int(number * multipliers.get(suffix, 1))
 
 
+def get_canonical_product_id(url: str) -> str:
+    """
+    Get a stable id for a product url, so tracking variants of the same product match.
+
+    Args:
+        url (str): The product url.
+
+    Returns:
+        str: "amazon:<ASIN>", "flipkart:<item id>" or the url without query and fragment.
+    """
+    parsed_url = urlparse(unquote(url))
+    host = parsed_url.netloc.lower()
+
+    if "amazon." in host:
+        asin = search(r"/dp/([a-zA-Z0-9]{10})", parsed_url.path)
+        if asin:
+            return f"{Websites.AMAZON.value}:{asin.group(1).upper()}"
+
+    elif "flipkart." in host:
+        item_id = search(r"/p/(itm[a-zA-Z0-9]+)", parsed_url.path)
+        if item_id:
+            return f"{Websites.FLIPKART.value}:{item_id.group(1)}"
+
+    return f"{parsed_url.scheme}://{host}{parsed_url.path.rstrip('/')}"
+
+
+def set_page_param(url: str, page: int) -> str:
+    """
+    Set the `page` query parameter of a listing url.
+
+    The rest of the url is left untouched, so pre-encoded filters survive.
+
+    Args:
+        url (str): The listing url.
+        page (int): The page number.
+
+    Returns:
+        str: The url of the given page.
+    """
+    if search(r"[?&]page=\d*", url):
+        return sub(r"([?&])page=\d*", rf"\g<1>page={page}", url)
+
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}page={page}"
+
+
 class HelperFunctions:
     """A collection of helper functions for various tasks."""
 
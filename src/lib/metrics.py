@@ -0,0 +1,401 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import info
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Tuple, TypeVar
+
+from ..constants.const import METRICS_ENABLED, METRICS_EXPORT, METRICS_PATH, METRICS_PORT
+
+# Labels of the crawl the current thread or task works on
+current_website: ContextVar[str] = ContextVar("current_website", default="")
+current_category: ContextVar[str] = ContextVar("current_category", default="")
+
+LabelValues = Tuple[str, str]
+F = TypeVar("F", bound=Callable)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@contextmanager
+def metric_labels(website: str | None = None, category: str | None = None) -> Iterator[None]:
+    """
+    Label every metric recorded inside the block with the given website and category.
+
+    Args:
+        website (str | None): The website, unchanged if omitted.
+        category (str | None): The category, unchanged if omitted.
+    """
+    website_token = current_website.set(
+        website) if website is not None else None
+    category_token = current_category.set(
+        category) if category is not None else None
+
+    try:
+        yield
+    finally:
+        if website_token is not None:
+            current_website.reset(website_token)
+        if category_token is not None:
+            current_category.reset(category_token)
+
+
+def current_labels() -> LabelValues:
+    """Website and category labels of the current context"""
+    return current_website.get(), current_category.get()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues, extra: str = "") -> str:
+    website, category = labels
+    label_text = f'website="{_escape(website)}",category="{_escape(category)}"'
+
+    return "{" + label_text + (f",{extra}" if extra else "") + "}"
+
+
+class Counter:
+    """
+    Monotonic counter per (website, category).
+    """
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0, labels: LabelValues | None = None):
+        """
+        Args:
+            amount (float): Amount to add.
+            labels (LabelValues | None): Labels to use instead of the current context.
+        """
+        if not METRICS_ENABLED:
+            return
+
+        key = labels if labels is not None else current_labels()
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """
+    Value that can go up and down per (website, category).
+    """
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def set(self, value: float, labels: LabelValues | None = None):
+        """
+        Args:
+            value (float): The new value.
+            labels (LabelValues | None): Labels to use instead of the current context.
+        """
+        if not METRICS_ENABLED:
+            return
+
+        key = labels if labels is not None else current_labels()
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} gauge"]
+
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """
+    Distribution of observed values per (website, category), with fixed buckets.
+    """
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # Per labels: count of each bucket (not cumulative), then sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, labels: LabelValues | None = None):
+        """
+        Args:
+            value (float): The observed value, in seconds for timings.
+            labels (LabelValues | None): Labels to use instead of the current context.
+        """
+        if not METRICS_ENABLED:
+            return
+
+        key = labels if labels is not None else current_labels()
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._values[key] = values
+
+            bucket_counts, totals = values
+            bucket_counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+    def timed(self, func: F) -> F:
+        """Decorator observing the duration of every call, for functions and coroutines"""
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self.time():
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.time():
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    def total(self, labels: LabelValues | None = None) -> Tuple[float, int]:
+        """
+        Get the sum and count of the values observed with the given labels.
+
+        Args:
+            labels (LabelValues | None): Labels to read instead of the current context.
+
+        Returns:
+            Tuple[float, int]: The sum and count, zeros if nothing was observed.
+        """
+        key = labels if labels is not None else current_labels()
+
+        with self._lock:
+            values = self._values.get(key)
+
+        if values is None:
+            return 0.0, 0
+
+        return values[1][0], int(values[1][1])
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for labels, (bucket_counts, totals) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, bucket_counts):
+                    cumulative += count
+                    bound_label = 'le="' + str(bound) + '"'
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(labels, bound_label)} {cumulative}")
+
+                inf_label = 'le="+Inf"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(labels, inf_label)} {int(totals[1])}")
+                lines.append(
+                    f"{self.name}_sum{_format_labels(labels)} {totals[0]}")
+                lines.append(
+                    f"{self.name}_count{_format_labels(labels)} {int(totals[1])}")
+
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """
+    Holds every metric of the process and exports them in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def counter(self, name: str, description: str) -> Counter:
+        with self._lock:
+            metric = self._metrics.setdefault(name, Counter(name, description))
+
+        return metric  # type: ignore
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        with self._lock:
+            metric = self._metrics.setdefault(name, Gauge(name, description))
+
+        return metric  # type: ignore
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.setdefault(
+                name, Histogram(name, description, buckets))
+
+        return metric  # type: ignore
+
+    def render(self) -> str:
+        """
+        Get every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Write the metrics to a file, for the node exporter textfile collector or a later diff.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+
+        info(f"📈 Metrics written to {path}")
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """
+        Serve the metrics on `http://<host>:<port>/metrics` from a background thread.
+
+        Args:
+            port (int): The port to listen on.
+            host (str): The interface to listen on.
+        """
+        if self._server is not None:
+            return
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        Thread(target=self._server.serve_forever,
+               name="metrics-server", daemon=True).start()
+        info(f"📈 Serving metrics on http://{host}:{port}/metrics")
+
+    def reset(self):
+        """Clear every recorded value, the metrics stay registered"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        for metric in metrics:
+            metric.reset()
+
+
+METRICS = MetricsRegistry()
+
+
+def start_metrics_export():
+    """Serve the metrics when METRICS_EXPORT is "http", call it once at startup"""
+    if METRICS_ENABLED and METRICS_EXPORT == "http":
+        METRICS.serve(METRICS_PORT)
+
+
+def finish_metrics_export():
+    """Write the metrics file when METRICS_EXPORT is "file", call it at the end of a run"""
+    if METRICS_ENABLED and METRICS_EXPORT == "file":
+        METRICS.write(METRICS_PATH)
+
+
+# CRAWL STAGES
+NAVIGATE_SECONDS = METRICS.histogram(
+    "aladdin_navigate_seconds", "Time spent in driver navigations, politeness waits excluded")
+PAGE_LOAD_WAIT_SECONDS = METRICS.histogram(
+    "aladdin_page_load_wait_seconds", "Time spent waiting for listing pages to be ready")
+CARD_EXTRACTION_SECONDS = METRICS.histogram(
+    "aladdin_card_extraction_seconds", "Time spent extracting the product cards of a page")
+CARDS_EXTRACTED = METRICS.counter(
+    "aladdin_cards_extracted_total", "Product cards extracted from listing pages")
+PAGES_CRAWLED = METRICS.counter(
+    "aladdin_pages_crawled_total", "Listing pages extracted")
+
+# DEDUP, SCORING AND INSERTS
+REDIS_DEDUP_SECONDS = METRICS.histogram(
+    "aladdin_redis_dedup_seconds", "Time spent answering dedup lookups")
+REDIS_DEDUP_URLS = METRICS.counter(
+    "aladdin_redis_dedup_urls_total", "Urls checked against the dedup index")
+SCORING_SECONDS = METRICS.histogram(
+    "aladdin_scoring_seconds", "Time spent scoring a batch of products", (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+PRODUCTS_SCORED = METRICS.counter(
+    "aladdin_products_scored_total", "Products scored by the discount analyzer")
+SUPABASE_INSERT_SECONDS = METRICS.histogram(
+    "aladdin_supabase_insert_chunk_seconds", "Time spent inserting a chunk of products, retries included")
+SUPABASE_INSERTED_PRODUCTS = METRICS.counter(
+    "aladdin_supabase_inserted_products_total", "Products stored in Supabase")
+SUPABASE_FAILED_PRODUCTS = METRICS.counter(
+    "aladdin_supabase_failed_products_total", "Products whose insert chunk failed")
+
+# SCHEDULER
+SCHEDULER_NEXT_RUN_TIMESTAMP = METRICS.gauge(
+    "aladdin_scheduler_next_run_timestamp_seconds", "Unix time the daemon starts its next crawl at")
+SCHEDULER_LAST_RUN_TIMESTAMP = METRICS.gauge(
+    "aladdin_scheduler_last_run_timestamp_seconds", "Unix time the last crawl of the daemon started at")
+SCHEDULER_LAST_RUN_SECONDS = METRICS.gauge(
+    "aladdin_scheduler_last_run_duration_seconds", "Duration of the last crawl of the daemon")
+SCHEDULER_RUNS = METRICS.counter(
+    "aladdin_scheduler_runs_total", "Crawls started by the daemon")
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, NotRequired, TypedDict, Literal
+from typing import Any, Dict, List, NotRequired, TypedDict, Literal
 
 
 class Product(TypedDict):
@@ -28,6 +28,11 @@ ProductKey = Literal[
 ]
 
 
+class RawCard(TypedDict):
+    card: Any
+    fields: Dict[ProductKey, str | None]
+
+
 class Websites(Enum):
     AMAZON = "amazon"
     FLIPKART = "flipkart"
@@ -76,3 +81,135 @@ class ProductUrlDetailsValue(TypedDict):
     website: List[Websites]
     amazon_url_props: NotRequired[AmazonUrlProps]
     flipkart_url_props: NotRequired[FlipkartUrlProps]
+
+
+class DriverPoolStats(TypedDict):
+    size: int
+    checkouts: int
+    avg_checkout_latency: float
+    max_checkout_latency: float
+    recycle_count: int
+    crash_count: int
+
+
+class PageStats(TypedDict):
+    url: str
+    bytes_transferred: int
+    resources: int
+    load_time: float | None
+    wait_time: float
+
+
+class PageStatsTotals(TypedDict):
+    pages: int
+    bytes_transferred: int
+    # Pages whose navigation timing reported a load time, load_time sums theirs only
+    timed_pages: int
+    load_time: float
+    wait_time: float
+
+
+class ReadinessTotals(TypedDict):
+    waits: int
+    wait_time: float
+    saved_time: float
+
+
+class ExtractionThroughput(TypedDict):
+    cards: int
+    seconds_per_page: float
+    cards_per_second: float
+
+
+class RatingDetails(TypedDict):
+    rating: float
+    rating_count: int
+
+
+class RatingCacheStats(TypedDict):
+    hits: int
+    misses: int
+
+
+class InsertResult(TypedDict):
+    inserted: int
+    failed: int
+
+
+class InsertStats(TypedDict):
+    chunks: int
+    failed_chunks: int
+    products: int
+    failed_products: int
+    avg_chunk_latency: float
+    max_chunk_latency: float
+
+
+class FilteredPage(TypedDict):
+    products: List[Product]
+    blocked: List[Product]
+
+
+class SinkStats(TypedDict):
+    batches: int
+    failed_batches: int
+    products_inserted: int
+    products_failed: int
+
+
+class PolitenessStats(TypedDict):
+    requests: int
+    delayed: int
+    idle_time: float
+    idle_time_by_domain: Dict[str, float]
+
+
+class PageSnapshot(TypedDict):
+    url: str
+    website: str
+    category: str
+    page: int
+    timestamp: float
+    html: str
+
+
+class CrawlRun(TypedDict):
+    run_id: str
+    started_at: float
+    categories: List[str]
+
+
+class CrawlCheckpoint(TypedDict):
+    page: int
+    page_url: str | None
+    products: List[Product]
+    done: bool
+    updated_at: float
+
+
+class QueueJob(TypedDict):
+    job_id: str
+    category: str
+    website: str
+    url: str
+    attempts: int
+
+
+class LeasedJob(TypedDict):
+    job: QueueJob
+    token: str
+
+
+class QueueStats(TypedDict):
+    pending: int
+    leased: int
+    done: int
+    total: int
+
+
+class SchedulerStatus(TypedDict):
+    next_run: str | None
+    last_run_started: str | None
+    last_run_finished: str | None
+    last_run_seconds: float | None
+    runs: int
@@ -1,12 +1,19 @@
 from asyncio import run
 from typing import List
 from dotenv import load_dotenv
-from logging import warning, basicConfig, INFO
+from logging import info, warning, basicConfig, INFO
+from signal import SIGINT, SIGTERM, signal
 
 from .db.supabase import SupaBaseClient
+from .db.supabase_sink import SupabaseSink
 from .db.redis import RedisDB
+from .db.crawl_checkpoint import CrawlCheckpoints
 
-from .utils import Utils, get_daily_category
+from .utils import AsyncPipeline, CrawlCoordinator, CrawlScheduler, CrawlWorker, Utils, get_daily_category, get_unique_random_category
+from .constants.const import CHECKPOINT_ENABLED, CRAWL_MODE, CRAWL_ROLE, CRAWL_WORKERS, DAEMON_ENABLED, PIPELINE_MODE
+from .crawler.utils.snapshot_store import SnapshotStore
+from .crawler.utils.web_driver_pool import WebDriverPool
+from .lib.metrics import finish_metrics_export, start_metrics_export
 from .lib.types import ProductCategories
 
 load_dotenv()
@@ -17,29 +24,110 @@ basicConfig(
 )
 
 
-async def main(redis: RedisDB, supabase: SupaBaseClient, categories: List[ProductCategories]) -> None:
+async def main(redis: RedisDB, supabase: SupaBaseClient, categories: List[ProductCategories],
+               checkpoints: CrawlCheckpoints | None = None, driver_pool: WebDriverPool | None = None) -> None:
     """
     Main function of the application that is called when the application is run.
+    The daemon passes its warm `driver_pool`, a one-off run launches its browsers.
     """
 
     urls = Utils.generate_urls(categories)
 
     try:
-        products = Utils.get_products_from_web(urls, redis)
-
-        # Let's add products in to the supabase database
-        if len(products) > 0:
-            supabase.insert_products(products)
+        if CRAWL_MODE == "replay":
+            # Replayed products were already inserted when they were recorded
+            if PIPELINE_MODE == "async":
+                products = await AsyncPipeline(redis, driver_pool=driver_pool).run(urls)
+            else:
+                products = Utils.get_products_from_web(
+                    urls, redis, driver_pool=driver_pool)
+
+            info(f"📼 Replayed {len(products)} products")
+        elif CRAWL_ROLE == "coordinator":
+            # Workers on any machine crawl the jobs, finished categories are inserted from here
+            with SupabaseSink(supabase, checkpoints=checkpoints) as sink:
+                products = CrawlCoordinator(redis).run(
+                    urls, on_products=sink.add_category, checkpoints=checkpoints)
+        elif PIPELINE_MODE == "async":
+            products = await AsyncPipeline(redis, supabase, driver_pool=driver_pool, checkpoints=checkpoints).run(urls)
         else:
+            # Products are inserted in the background as soon as their category is done
+            with SupabaseSink(supabase, checkpoints=checkpoints) as sink:
+                products = Utils.get_products_from_web(
+                    urls, redis, driver_pool=driver_pool, on_products=sink.add_category, checkpoints=checkpoints)
+
+        if len(products) == 0:
             warning("⚠️ No products found to insert into the database.")
 
+        # The run went through, the next one starts afresh
+        if checkpoints is not None:
+            checkpoints.finish_run()
+
     except Exception as e:
         warning(f"⚠️ Error occurred while fetching products: {str(e)}")
+    finally:
+        finish_metrics_export()
+
+
+def serve(redis: RedisDB, supabase: SupaBaseClient, checkpoints: CrawlCheckpoints | None) -> None:
+    """
+    Stay resident and crawl at every DAEMON_SCHEDULE time, with the browsers and connections kept warm.
+    """
+    # Coordinators and replays open no browser, crashed browsers are replaced on checkout
+    driver_pool = WebDriverPool(
+        CRAWL_WORKERS) if CRAWL_ROLE != "coordinator" and CRAWL_MODE != "replay" else None
+
+    def crawl():
+        if CRAWL_MODE == "replay":
+            categories = SnapshotStore.shared().categories()
+        elif checkpoints is not None:
+            categories = checkpoints.begin_run(
+                lambda: get_unique_random_category(redis))
+        else:
+            categories = get_unique_random_category(redis)
+
+        if len(categories) == 0:
+            warning("⚠️ No categories to crawl, skipping this run.")
+            return
+
+        run(main(redis, supabase, categories, checkpoints, driver_pool))
+
+    scheduler = CrawlScheduler(crawl)
+    signal(SIGTERM, lambda *_: scheduler.stop())
+    signal(SIGINT, lambda *_: scheduler.stop())
+
+    try:
+        scheduler.run_forever()
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
 
 
+def work(redis: RedisDB) -> None:
+    """
+    Crawl the jobs of the shared crawl queue, the coordinator caches and inserts the products.
+    """
+    try:
+        CrawlWorker(redis).run()
+    except Exception as e:
+        warning(f"⚠️ Error occurred while working on the crawl queue: {str(e)}")
+    finally:
+        finish_metrics_export()
+
 
 if __name__ == "__main__":
     with RedisDB() as redis_db:
+        # Workers need no Supabase and pick no categories
+        if CRAWL_ROLE == "worker":
+            if not redis_db:
+                warning("⚠️ Redis client is not connected properly.")
+                exit(1)
+
+            start_metrics_export()
+            work(redis_db)
+            exit(0)
+
+        supabase = None
         try:
             supabase = SupaBaseClient().connect()
 
@@ -51,10 +139,32 @@ if __name__ == "__main__":
                 warning("⚠️ Redis client is not connected properly.")
                 exit(1)
 
-            categories = get_daily_category(redis_db)
+            # One-off move of the legacy per-category url sets into the dedup index
+            redis_db.migrate_url_cache_sets()
+
+            checkpoints = CrawlCheckpoints(
+                redis_db) if CHECKPOINT_ENABLED and CRAWL_MODE != "replay" else None
+
+            start_metrics_export()
+
+            if DAEMON_ENABLED:
+                serve(redis_db, supabase, checkpoints)
+            else:
+                # Replays crawl the recorded categories, without picking (and marking) new ones
+                if CRAWL_MODE == "replay":
+                    categories = SnapshotStore.shared().categories()
+                elif checkpoints is not None:
+                    # A restart within the run window reuses the categories of the unfinished run
+                    categories = checkpoints.begin_run(
+                        lambda: get_daily_category(redis_db))
+                else:
+                    categories = get_daily_category(redis_db)
 
-            run(main(redis_db, supabase, categories))
+                run(main(redis_db, supabase, categories, checkpoints))
         except Exception as e:
             warning(f"⚠️ Error connecting to Supabase: {str(e)}")
-            supabase = None
             exit(1)
+        finally:
+            # Logs the insert stats and closes the insert connections, whatever ended the run
+            if supabase:
+                supabase.close()
@@ -1,2 +1,5 @@
-from .random_category import get_daily_category
+from .random_category import get_daily_category, get_unique_random_category
 from .utils import Utils
+from .async_pipeline import AsyncPipeline
+from .distributed_crawl import CrawlCoordinator, CrawlWorker
+from .scheduler import CrawlScheduler
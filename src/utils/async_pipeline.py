@@ -0,0 +1,160 @@
+from asyncio import gather, get_running_loop, to_thread
+from concurrent.futures import ThreadPoolExecutor
+from logging import error, info, warning
+from typing import Dict, List, Tuple
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+from .utils import Utils
+from ..crawler.crawler import Crawler
+from ..crawler.async_page_filter import AsyncPageFilter
+from ..crawler.flipkart.rating_fetcher import FlipkartRatingFetcher
+from ..crawler.utils.politeness import Politeness
+from ..crawler.utils.web_driver_pool import WebDriverPool
+from ..constants.redis_key import PRODUCT_DEDUP_EXPIRE_TIME
+from ..constants.const import CRAWL_MODE, CRAWL_WORKERS, FLIPKART_HTTP_RATINGS
+from .best_discount_analyzer import BestDiscountAnalyzer
+from ..db.async_redis import AsyncRedisDB
+from ..db.redis import RedisDB
+from ..db.crawl_checkpoint import CrawlCheckpoints
+from ..db.supabase import SupaBaseClient
+from ..lib.metrics import current_category
+from ..lib.types import Product, ProductCategories, Websites
+
+
+class AsyncPipeline:
+    """
+    Crawl on an event loop instead of blocking on every I/O call.
+
+    Browser jobs run in an executor bounded by the number of warm drivers. The
+    dedup lookups and rating fetches of a page run on the loop while its browser
+    loads the next page. Each finished category is cached and inserted into
+    Supabase while the other categories are still crawling.
+    """
+
+    def __init__(self, redis: RedisDB, supabase: SupaBaseClient | None = None, workers: int = CRAWL_WORKERS,
+                 driver_pool: WebDriverPool | None = None, checkpoints: CrawlCheckpoints | None = None):
+        """
+        Args:
+            redis (RedisDB): The connected Redis client, an async client to the same database is opened per run.
+            supabase (SupaBaseClient | None): Insert every finished category, None only returns the products.
+            workers (int): Maximum number of browsers crawling at once.
+            driver_pool (WebDriverPool | None): Warm drivers to borrow, a pool is created for the run if omitted.
+            checkpoints (CrawlCheckpoints | None): Skip what the run already finished, resume the rest and save the progress.
+        """
+        self.redis = redis
+        self.supabase = supabase
+        self.workers = max(1, workers)
+        self.driver_pool = driver_pool
+        self.checkpoints = checkpoints
+
+    async def run(self, urls: Dict[ProductCategories, Dict[Websites, str]]) -> List[Product]:
+        """
+        Crawl every url, caching and inserting the best products of each category as soon as it is done.
+
+        args:
+            urls: Dict[ProductCategories, Dict[Websites, str]] - The URLs of the products to fetch.
+
+        return:
+            List[Product] - The best products of every category.
+        """
+        loop = get_running_loop()
+        discount_analyzer = BestDiscountAnalyzer()
+        all_products: List[Product] = []
+        urls = Utils.skip_done_categories(urls, self.checkpoints)
+
+        # Answer dedup checks from memory for the rest of the run
+        self.redis.load_dedup_tiers()
+        self.redis.reset_rating_cache_stats()
+        Politeness.shared().reset_stats()
+
+        async_redis = AsyncRedisDB(self.redis)
+        page_filter = AsyncPageFilter(
+            loop, async_redis, FlipkartRatingFetcher.shared() if FLIPKART_HTTP_RATINGS else None)
+
+        # Replays read recorded pages, they need no browser
+        owns_pool = self.driver_pool is None and CRAWL_MODE != "replay"
+        pool = WebDriverPool(self.workers) if owns_pool else self.driver_pool
+        crawler = Crawler(self.redis, discount_analyzer, pool,
+                          page_filter, checkpoints=self.checkpoints)
+        browser_count = min(self.workers, pool.size) if pool is not None else self.workers
+        executor = ThreadPoolExecutor(
+            max_workers=browser_count, thread_name_prefix="browser")
+
+        async def crawl_category(category: ProductCategories, website_urls: Dict[Websites, str]):
+            # Every category runs in its own task, so its labels do not leak into the others
+            current_category.set(category.value)
+            fetched = await gather(*(
+                loop.run_in_executor(executor, self._get_product,
+                                     crawler, website, category, url)
+                for website, url in website_urls.items()))
+
+            # Merge in the same website order as the sequential crawl
+            products_by_cat = [
+                product for products, _ in fetched for product in products]
+            finished = all(website_finished for _, website_finished in fetched)
+            best_products = Utils.sort_products(products_by_cat)
+
+            if len(best_products) == 0:
+                return
+
+            all_products.extend(best_products)
+
+            # Replays must give the same result every time, they leave the dedup index alone
+            if CRAWL_MODE == "replay":
+                return
+
+            # Let's cache the products url to prevent re-fetching
+            await async_redis.add_to_dedup_index(
+                [product["product_url"] for product in best_products],
+                expire_time=PRODUCT_DEDUP_EXPIRE_TIME  # 4 days
+            )
+
+            if self.supabase is not None:
+                info(
+                    f"📤 Inserting {len(best_products)} {category.value} products into Supabase")
+                res = await self.supabase.insert_products_async(best_products)
+
+                if res["failed"] > 0:
+                    warning(
+                        f"⚠️ Not marking {category.value} as done, some of its products were not inserted")
+                    return
+
+            # A website stopped by an error is continued by a resumed run
+            if self.checkpoints is not None and finished:
+                await to_thread(self.checkpoints.complete_category, category)
+
+        info(
+            f"🧵 Crawling {len(urls)} categories with {browser_count} browsers on the event loop")
+
+        try:
+            await gather(*(crawl_category(category, website_urls)
+                           for category, website_urls in urls.items()))
+        finally:
+            executor.shutdown(wait=True)
+            if owns_pool and pool is not None:
+                pool.close()
+            discount_analyzer.clear_cache()
+            await async_redis.close()
+            if self.supabase is not None:
+                await self.supabase.aclose()
+            Utils.log_rating_cache_stats(self.redis)
+            Utils.log_politeness_stats()
+
+        return all_products
+
+    @staticmethod
+    def _get_product(crawler: Crawler, website: Websites, category: ProductCategories, url: str) -> Tuple[List[Product], bool]:
+        """
+        Crawl one website of a category on an executor thread, telling whether the crawl went through.
+        """
+        try:
+            products, finished = crawler.crawl_website(website, category, url)
+            return products or [], finished
+        except (WebDriverException, TimeoutException) as e:
+            error(
+                f"⚠️ Error fetching from {website} ({category.value}): {str(e)}")
+        except Exception as e:
+            error(
+                f"⚠️ Unexpected error for {website} ({category.value}): {str(e)}")
+
+        return [], False
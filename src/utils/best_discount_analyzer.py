@@ -1,7 +1,17 @@
 import numpy as np
 import math
+from typing import List, Sequence, Tuple
 
 from ..lib.types import Product
+from ..lib.metrics import PRODUCTS_SCORED, SCORING_SECONDS
+
+# Batch scores this close to their threshold are re-scored through the scalar path,
+# so rounding differences between NumPy and `math` can never flip a decision
+SCORE_TIE_TOLERANCE = 1e-9
+
+# Below this many products NumPy's per-call overhead outweighs its gains, listing pages
+# (24 to 40 products) are scored one by one
+BATCH_SCORING_MIN_SIZE = 500
 
 
 class BestDiscountAnalyzer:
@@ -33,6 +43,8 @@ class BestDiscountAnalyzer:
             popularity_weight / total,
             price_range_weight / total
         ])
+        # Plain floats for the scalar path, both paths sum the terms in this order
+        self._weight_terms = tuple(float(weight) for weight in self.weights)
 
         # Pre-computed constants for speed
         self.ln_10 = math.log(10)
@@ -112,38 +124,188 @@ class BestDiscountAnalyzer:
         Returns:
             bool: True if product has best discount, False otherwise
         """
+        scored = self._score_product(product.get("price", 0), product.get("discount_price", 0),
+                                     product.get("rating", 0), product.get("rating_count", 0),
+                                     min_discount_threshold, min_rating_threshold, min_rating_count)
+        if scored is None:
+            return False
+
+        final_score, threshold = scored
+
+        return final_score >= threshold
+
+    def _score_product(self, price: float, discount_price: float, rating: float, rating_count: int,
+                       min_discount_threshold: float, min_rating_threshold: float,
+                       min_rating_count: int) -> Tuple[float, float] | None:
+        """
+        Score a single product.
 
+        Returns:
+            Tuple[float, float] | None: The final score and the threshold it must reach,
+                None if the product fails the minimum checks
+        """
         # Quick elimination checks for speed
         discount_pct = self._calculate_discount_percentage(
-            product.get("price", 0), product.get("discount_price", 0))
+            price, discount_price)
 
         # Fast early elimination
         if (discount_pct < min_discount_threshold or
-            product.get("rating", 0) < min_rating_threshold or
-                product.get("rating_count", 0) < min_rating_count):
-            return False
+            rating < min_rating_threshold or
+                rating_count < min_rating_count):
+            return None
 
         # Calculate weighted score using optimized operations
         discount_score = min(1.0, discount_pct * self.discount_normalizer)
-        rating_score = (product.get("rating", 0) - 1.0) * \
-            self.rating_normalizer
-        popularity_score = self._calculate_popularity_score(
-            product.get("rating_count", 0))
-        price_score = self._calculate_price_attractiveness(
-            product.get("price", 0))
-
-        # Vectorized final score calculation
-        scores = np.array([discount_score, rating_score,
-                          popularity_score, price_score])
-        final_score = np.dot(scores, self.weights)
-
-        # Optimized threshold selection
+        rating_score = (rating - 1.0) * self.rating_normalizer
+        popularity_score = self._calculate_popularity_score(rating_count)
+        price_score = self._calculate_price_attractiveness(price)
+
+        # Weighted sum, in the same order as the batch path
+        discount_weight, rating_weight, popularity_weight, price_weight = self._weight_terms
+        final_score = discount_score * discount_weight + rating_score * rating_weight + \
+            popularity_score * popularity_weight + price_score * price_weight
+
+        return final_score, self._get_score_threshold(discount_pct)
+
+    @staticmethod
+    def _get_score_threshold(discount_pct: float) -> float:
+        """Score a product must reach, bigger discounts need a lower score"""
         if discount_pct >= 50:
-            return final_score >= 0.6
+            return 0.6
         elif discount_pct >= 30:
-            return final_score >= 0.7
+            return 0.7
         else:
-            return final_score >= 0.75
+            return 0.75
+
+    @SCORING_SECONDS.timed
+    def score_batch(self, prices: Sequence[float], discount_prices: Sequence[float],
+                    ratings: Sequence[float], rating_counts: Sequence[float],
+                    min_discount_threshold: float = 15.0,
+                    min_rating_threshold: float = 3.5,
+                    min_rating_count: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a page or category worth of products at once, from columnar arrays
+
+        Gives the same decisions as `is_best_discount` on every row. Missing values
+        (None or NaN) fail the minimum checks.
+
+        Args:
+            prices: Actual price of each product
+            discount_prices: Discounted price of each product
+            ratings: Rating of each product
+            rating_counts: Number of ratings of each product
+            min_discount_threshold: Minimum discount % to consider
+            min_rating_threshold: Minimum rating to consider
+            min_rating_count: Minimum number of ratings to consider
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Boolean mask of the best discounts and the final
+                score of each product (0 for products failing the minimum checks)
+        """
+        price = np.asarray(prices, dtype=np.float64)
+        PRODUCTS_SCORED.inc(len(price))
+        discount_price = np.asarray(discount_prices, dtype=np.float64)
+        rating = np.asarray(ratings, dtype=np.float64)
+        rating_count = np.asarray(rating_counts, dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            has_discount = (price > 0) & (discount_price >= 0) & (
+                discount_price < price)
+            discount_pct = np.where(
+                has_discount, ((price - discount_price) / price) * 100, 0.0)
+
+            eligible = (discount_pct >= min_discount_threshold) & (
+                rating >= min_rating_threshold) & (rating_count >= min_rating_count)
+
+            discount_score = np.minimum(
+                1.0, discount_pct * self.discount_normalizer)
+            rating_score = (rating - 1.0) * self.rating_normalizer
+            popularity_score = np.where(rating_count > 0, np.minimum(
+                1.0, np.log(rating_count + 1) / self.ln_10), 0.0)
+
+            log_price = np.log(price + 1)
+            price_score = np.where(log_price <= 4, log_price * 0.25, np.where(
+                log_price <= 5.3, 1.0, np.maximum(0.1, 1.0 - (log_price - 5.3) / 3)))
+            price_score = np.where(price > 0, price_score, 0.0)
+
+        discount_weight, rating_weight, popularity_weight, price_weight = self._weight_terms
+        final_score = discount_score * discount_weight + rating_score * rating_weight + \
+            popularity_score * popularity_weight + price_score * price_weight
+        final_score = np.where(eligible, final_score, 0.0)
+
+        threshold = np.where(discount_pct >= 50, 0.6,
+                             np.where(discount_pct >= 30, 0.7, 0.75))
+        mask = eligible & (final_score >= threshold)
+
+        # Settle near-ties with the scalar path
+        for index in np.flatnonzero(eligible & (np.abs(final_score - threshold) <= SCORE_TIE_TOLERANCE)):
+            scored = self._score_product(float(price[index]), float(discount_price[index]),
+                                         float(rating[index]), int(rating_count[index]),
+                                         min_discount_threshold, min_rating_threshold, min_rating_count)
+            final_score[index] = scored[0] if scored is not None else 0.0
+            mask[index] = scored is not None and scored[0] >= scored[1]
+
+        return mask, final_score
+
+    def score_products(self, products: List[Product],
+                       min_discount_threshold: float = 15.0,
+                       min_rating_threshold: float = 3.5,
+                       min_rating_count: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score products through `score_batch`
+
+        Args:
+            products: Products with price and rating data
+            min_discount_threshold: Minimum discount % to consider
+            min_rating_threshold: Minimum rating to consider
+            min_rating_count: Minimum number of ratings to consider
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Boolean mask of the best discounts and the final scores
+        """
+        def column(key: str) -> List[float]:
+            return [np.nan if product.get(key) is None else product.get(key) for product in products]
+
+        return self.score_batch(column("price"), column("discount_price"),
+                                column("rating"), column("rating_count"),
+                                min_discount_threshold, min_rating_threshold, min_rating_count)
+
+    def find_deals(self, products: List[Product],
+                   min_discount_threshold: float = 15.0,
+                   min_rating_threshold: float = 3.5,
+                   min_rating_count: int = 5) -> List[bool]:
+        """
+        Decide which products are best discounts, through the scalar path for page sized
+        inputs and `score_batch` from BATCH_SCORING_MIN_SIZE products on
+
+        Args:
+            products: Products with price and rating data, missing values fail the checks
+            min_discount_threshold: Minimum discount % to consider
+            min_rating_threshold: Minimum rating to consider
+            min_rating_count: Minimum number of ratings to consider
+
+        Returns:
+            List[bool]: Whether each product is a best discount
+        """
+        if len(products) >= BATCH_SCORING_MIN_SIZE:
+            return self.score_products(products, min_discount_threshold, min_rating_threshold, min_rating_count)[0].tolist()
+
+        PRODUCTS_SCORED.inc(len(products))
+        with SCORING_SECONDS.time():
+            deals: List[bool] = []
+
+            for product in products:
+                try:
+                    scored = self._score_product(product["price"], product["discount_price"],
+                                                 product["rating"], product["rating_count"],
+                                                 min_discount_threshold, min_rating_threshold, min_rating_count)
+                except (KeyError, TypeError):
+                    # Missing values fail the checks, as in `score_batch`
+                    scored = None
+
+                deals.append(scored is not None and scored[0] >= scored[1])
+
+            return deals
 
     def clear_cache(self):
         """Clear internal caches to free memory"""
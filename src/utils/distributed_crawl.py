@@ -0,0 +1,346 @@
+from logging import error, info, warning
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Callable, Dict, List
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+from .utils import Utils
+from .best_discount_analyzer import BestDiscountAnalyzer
+from ..crawler.crawler import Crawler
+from ..crawler.utils.politeness import Politeness
+from ..crawler.utils.web_driver_pool import WebDriverPool
+from ..constants.const import CRAWL_MODE, CRAWL_QUEUE_IDLE_TIMEOUT, CRAWL_QUEUE_TIMEOUT, CRAWL_WORKERS
+from ..db.redis import RedisDB
+from ..db.crawl_checkpoint import CrawlCheckpoints
+from ..db.work_queue import CrawlQueue
+from ..lib.types import LeasedJob, Product, ProductCategories, QueueJob, Websites
+
+# Seconds between two looks at the queue, for idle workers and the coordinator
+POLL_INTERVAL = 2.0
+
+
+class CrawlCoordinator:
+    """
+    Split a run into (category, website) jobs on the shared crawl queue and aggregate what the workers send back.
+
+    Each category is sorted, cached and reported as soon as the last of its jobs is done,
+    with the products merged in the same website order as a local crawl.
+    """
+
+    def __init__(self, redis: RedisDB, queue: CrawlQueue | None = None, poll_interval: float = POLL_INTERVAL,
+                 timeout: int = CRAWL_QUEUE_TIMEOUT):
+        """
+        Args:
+            redis (RedisDB): The connected Redis client.
+            queue (CrawlQueue | None): The queue to fill, CRAWL_QUEUE_NAME if omitted.
+            poll_interval (float): Seconds between two looks at the results.
+            timeout (int): Stop waiting for the workers after this many seconds, the unfinished categories are dropped.
+        """
+        self.redis = redis
+        self.queue = queue if queue is not None else CrawlQueue(redis)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def run(self, urls: Dict[ProductCategories, Dict[Websites, str]],
+            on_products: Callable[[ProductCategories, List[Product], bool], None] | None = None,
+            checkpoints: CrawlCheckpoints | None = None) -> List[Product]:
+        """
+        Queue every url and wait for the workers to crawl them.
+
+        args:
+            urls: Dict[ProductCategories, Dict[Websites, str]] - The URLs of the products to fetch.
+            on_products: Callable | None - Called with the best products of each category as soon as it is done and whether all its crawls went through, it marks the category done once they are stored.
+            checkpoints: CrawlCheckpoints | None - Skip the categories the run already finished and mark the new ones.
+
+        return:
+            List[Product] - The best products of every finished category.
+        """
+        all_products: List[Product] = []
+        urls = Utils.skip_done_categories(urls, checkpoints)
+
+        jobs: List[QueueJob] = []
+        remaining: Dict[ProductCategories, List[str]] = {}
+        for category, website_urls in urls.items():
+            remaining[category] = []
+
+            for website, url in website_urls.items():
+                job_id = f"{category.value}:{website.value}"
+                remaining[category].append(job_id)
+                jobs.append({"job_id": job_id, "category": category.value,
+                             "website": website.value, "url": url, "attempts": 0})
+
+        if not jobs:
+            return all_products
+
+        # Finished categories are cached from here, the bloom filter must see those writes
+        self.redis.load_bloom_filter()
+
+        if self.queue.enqueue(jobs) is None:
+            error("⛔ Could not queue the crawl jobs.")
+            return all_products
+
+        deadline = monotonic() + self.timeout
+        last_done = -1
+
+        try:
+            while remaining:
+                done = self.queue.done_job_ids() or set()
+
+                for category, job_ids in list(remaining.items()):
+                    if all(job_id in done for job_id in job_ids):
+                        all_products.extend(self._finish_category(
+                            category, job_ids, on_products, checkpoints))
+                        del remaining[category]
+
+                if not remaining:
+                    break
+
+                if monotonic() > deadline:
+                    warning(
+                        f"⚠️ Stopped waiting for the workers, unfinished categories: {', '.join(category.value for category in remaining)}")
+                    break
+
+                if len(done) != last_done:
+                    last_done = len(done)
+                    stats = self.queue.stats()
+                    if stats is not None:
+                        info(
+                            f"📬 Crawl queue | done: {stats['done']}/{stats['total']} | leased: {stats['leased']} | pending: {stats['pending']}")
+
+                # Jobs of crashed workers go back to the queue even while no worker is leasing
+                self.queue.requeue_expired()
+                sleep(self.poll_interval)
+        finally:
+            self.queue.clear()
+
+        return all_products
+
+    def _finish_category(self, category: ProductCategories, job_ids: List[str],
+                         on_products: Callable[[ProductCategories, List[Product], bool], None] | None,
+                         checkpoints: CrawlCheckpoints | None) -> List[Product]:
+        """
+        Merge the results of a finished category, cache its best products and report them.
+        """
+        results = self.queue.results(job_ids) or {}
+
+        products_by_cat: List[Product] = []
+        finished = True
+        for job_id in job_ids:
+            products = results.get(job_id)
+
+            if products is None:
+                warning(
+                    f"⚠️ Gave up on {job_id} after {self.queue.max_attempts} attempts")
+                finished = False
+                continue
+
+            products_by_cat.extend(products)
+
+        try:
+            best_products = Utils.cache_category_products(
+                category, products_by_cat, self.redis)
+
+            # The products are not inserted yet, whoever receives them marks the category done.
+            # A category with a job given up stays open, a resumed run queues it again
+            if on_products is not None:
+                on_products(category, best_products, finished)
+            elif checkpoints is not None and finished:
+                checkpoints.complete_category(category)
+        except Exception as e:
+            error(f"⚠️ Error finishing category {category.value}: {str(e)}")
+            return []
+
+        return best_products
+
+
+class CrawlWorker:
+    """
+    Lease jobs from the shared crawl queue, crawl them and push the products back.
+
+    Every thread owns its own Crawler and borrows its driver from the warm pool, while a
+    heartbeat thread renews the leases of the jobs being crawled. A job that fails is
+    handed back to the queue for another attempt, possibly on another machine.
+    """
+
+    def __init__(self, redis: RedisDB, workers: int = CRAWL_WORKERS, queue: CrawlQueue | None = None,
+                 driver_pool: WebDriverPool | None = None, idle_timeout: int = CRAWL_QUEUE_IDLE_TIMEOUT,
+                 poll_interval: float = POLL_INTERVAL):
+        """
+        Args:
+            redis (RedisDB): The connected Redis client.
+            workers (int): Number of jobs crawled at once.
+            queue (CrawlQueue | None): The queue to lease from, CRAWL_QUEUE_NAME if omitted.
+            driver_pool (WebDriverPool | None): Warm drivers to borrow, a pool is created for the run if omitted.
+            idle_timeout (int): Stop after this many seconds without a job, 0 waits forever.
+            poll_interval (float): Seconds between two lease attempts on an empty queue.
+        """
+        self.redis = redis
+        self.workers = max(1, workers)
+        self.queue = queue if queue is not None else CrawlQueue(redis)
+        self.driver_pool = driver_pool
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+
+        self._leases: Dict[str, LeasedJob] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        # Set once every thread returned, the heartbeat keeps renewing until then
+        self._finished = Event()
+        self._completed = 0
+        # Start of the last dedup tiers load, on the monotonic clock
+        self._tiers_lock = Lock()
+        self._tiers_loaded_at: float | None = None
+
+    def run(self) -> int:
+        """
+        Crawl jobs until the worker is idle for `idle_timeout` seconds or stopped.
+
+        return:
+            int - The number of jobs completed.
+        """
+        discount_analyzer = BestDiscountAnalyzer()
+        self._stop.clear()
+        self._finished.clear()
+
+        self.redis.reset_rating_cache_stats()
+        Politeness.shared().reset_stats()
+
+        # Replays read recorded pages, they need no browser
+        owns_pool = self.driver_pool is None and CRAWL_MODE != "replay"
+        pool = WebDriverPool(self.workers) if owns_pool else self.driver_pool
+        thread_count = min(self.workers, pool.size) if pool is not None else self.workers
+
+        info(
+            f"👷 Crawl worker {self.queue.worker_id} waiting for jobs on {self.queue.name} with {thread_count} threads")
+
+        heartbeat = Thread(target=self._heartbeat,
+                           name="crawl-queue-heartbeat", daemon=True)
+        threads = [
+            Thread(target=self._worker, args=(discount_analyzer, pool),
+                   name=f"crawl-queue-worker-{i}", daemon=True)
+            for i in range(thread_count)
+        ]
+
+        try:
+            heartbeat.start()
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+        finally:
+            self._finished.set()
+            heartbeat.join()
+
+            if owns_pool and pool is not None:
+                pool.close()
+            discount_analyzer.clear_cache()
+            Utils.log_rating_cache_stats(self.redis)
+            Utils.log_politeness_stats()
+
+        info(f"👷 Crawl worker {self.queue.worker_id} completed {self._completed} jobs")
+
+        return self._completed
+
+    def stop(self):
+        """
+        Stop leasing new jobs, the jobs being crawled are finished first.
+        """
+        self._stop.set()
+
+    def _worker(self, discount_analyzer: BestDiscountAnalyzer, pool: WebDriverPool | None):
+        """
+        Lease and crawl jobs until idle or stopped.
+        """
+        crawler = Crawler(self.redis, discount_analyzer, pool)
+        idle_since = monotonic()
+
+        try:
+            while not self._stop.is_set():
+                leased = self.queue.lease()
+
+                if leased is None:
+                    if self.idle_timeout and monotonic() - idle_since >= self.idle_timeout:
+                        return
+
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                self._crawl(crawler, leased)
+                idle_since = monotonic()
+        finally:
+            crawler.close()
+
+    def _crawl(self, crawler: Crawler, leased: LeasedJob):
+        """
+        Crawl a leased job, completing it with its products or handing it back on failure.
+        """
+        job = leased["job"]
+        category = ProductCategories(job["category"])
+        website = Websites(job["website"])
+
+        info(
+            f"👷 Crawling {job['job_id']} (attempt {job['attempts']}/{self.queue.max_attempts})")
+
+        with self._lock:
+            self._leases[job["job_id"]] = leased
+
+        self._load_dedup_tiers(monotonic())
+
+        try:
+            # Partial products are dropped, the job is crawled again from scratch
+            fetched_product = crawler.get_product(
+                website, category, job["url"], keep_partial=False)
+        except (WebDriverException, TimeoutException) as e:
+            error(f"⚠️ Error fetching from {website} ({category.value}): {str(e)}")
+            self.queue.release(leased)
+            return
+        except Exception as e:
+            error(f"⚠️ Unexpected error for {website} ({category.value}): {str(e)}")
+            self.queue.release(leased)
+            return
+        finally:
+            with self._lock:
+                self._leases.pop(job["job_id"], None)
+
+        # get_product swallows the crawl errors, no products means the page never loaded or the crawl failed
+        if fetched_product is None:
+            warning(
+                f"⚠️ No products for {job['job_id']}, handing it back to the queue")
+            self.queue.release(leased)
+            return
+
+        if self.queue.complete(leased, fetched_product):
+            with self._lock:
+                self._completed += 1
+        else:
+            info(f"👷 {job['job_id']} was already completed by another worker")
+
+    def _load_dedup_tiers(self, leased_at: float):
+        """
+        Reload the dedup tiers before crawling a job, unless a load started after it was leased.
+
+        The coordinator caches every finished category, the tiers of a worker that stays up
+        across jobs and runs would otherwise keep answering from what it loaded first.
+        """
+        with self._tiers_lock:
+            if self._tiers_loaded_at is not None and self._tiers_loaded_at >= leased_at:
+                return
+
+            self._tiers_loaded_at = monotonic()
+            self.redis.load_dedup_tiers()
+
+    def _heartbeat(self):
+        """
+        Renew the leases of the jobs being crawled, three times per visibility timeout.
+        """
+        interval = max(1.0, self.queue.visibility_timeout / 3)
+
+        while not self._finished.wait(interval):
+            with self._lock:
+                leases = list(self._leases.values())
+
+            for leased in leases:
+                if not self.queue.extend(leased):
+                    warning(
+                        f"⚠️ Lost the lease of {leased['job']['job_id']}, another worker may crawl it too")
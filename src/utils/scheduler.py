@@ -0,0 +1,141 @@
+from pytz import timezone
+from logging import error, info, warning
+from threading import Event
+from time import perf_counter
+from typing import Callable, List
+from datetime import datetime, time, timedelta
+
+from ..constants.const import DAEMON_SCHEDULE
+from ..lib.metrics import SCHEDULER_LAST_RUN_SECONDS, SCHEDULER_LAST_RUN_TIMESTAMP, SCHEDULER_NEXT_RUN_TIMESTAMP, SCHEDULER_RUNS
+from ..lib.types import SchedulerStatus
+
+IST = timezone("Asia/Kolkata")
+
+
+def parse_schedule(schedule: List[str]) -> List[time]:
+    """
+    Parse HH:MM times of the day, skipping the invalid ones.
+
+    args:
+        schedule (List[str]): The times, e.g. ["08:00", "19:00"].
+
+    return:
+        List[time]: The valid times, sorted.
+    """
+    times = set()
+
+    for value in schedule:
+        try:
+            times.add(datetime.strptime(value, "%H:%M").time())
+        except ValueError:
+            warning(f"⚠️ Ignoring invalid schedule time {value!r}, expected HH:MM")
+
+    return sorted(times)
+
+
+class CrawlScheduler:
+    """
+    Run a crawl at fixed times of the day, in IST, from the calling thread.
+
+    Runs never overlap: the times a run is still going at are skipped and the next
+    run is the first time after it finished.
+    """
+
+    def __init__(self, run_crawl: Callable[[], None], schedule: List[str] = DAEMON_SCHEDULE):
+        """
+        Args:
+            run_crawl (Callable): Runs one crawl.
+            schedule (List[str]): HH:MM times of the day in IST.
+        """
+        self.run_crawl = run_crawl
+        self.times = parse_schedule(schedule)
+
+        if not self.times:
+            raise ValueError("The schedule holds no valid HH:MM time")
+
+        self._stop = Event()
+        self._next_run: datetime | None = None
+        self._last_run_started: datetime | None = None
+        self._last_run_finished: datetime | None = None
+        self._last_run_seconds: float | None = None
+        self._runs = 0
+
+    def next_run(self, after: datetime | None = None) -> datetime:
+        """
+        Get the first scheduled time after the given moment.
+
+        args:
+            after (datetime | None): A timezone aware moment, now if omitted.
+
+        return:
+            datetime: The next run, in IST.
+        """
+        now = (after if after is not None else datetime.now(IST)).astimezone(IST)
+
+        for days in (0, 1):
+            day = now.date() + timedelta(days=days)
+
+            for at in self.times:
+                candidate = IST.localize(datetime.combine(day, at))
+                if candidate > now:
+                    return candidate
+
+        # Not reached, the first time of tomorrow is always later than now
+        return IST.localize(datetime.combine(now.date() + timedelta(days=1), self.times[0]))
+
+    def run_forever(self):
+        """
+        Wait for every scheduled time and crawl, until `stop` is called.
+        """
+        info(
+            f"🗓️ Crawl schedule (IST): {', '.join(at.strftime('%H:%M') for at in self.times)}")
+
+        while not self._stop.is_set():
+            self._next_run = self.next_run()
+            SCHEDULER_NEXT_RUN_TIMESTAMP.set(self._next_run.timestamp())
+            info(f"⏰ Next crawl at {self._next_run:%Y-%m-%d %H:%M} IST")
+
+            wait_seconds = (self._next_run - datetime.now(IST)).total_seconds()
+            if self._stop.wait(max(0.0, wait_seconds)):
+                break
+
+            self._run()
+
+        info("🛑 Scheduler stopped")
+
+    def stop(self):
+        """
+        Stop waiting for the next run, a running crawl is finished first.
+        """
+        self._stop.set()
+
+    def status(self) -> SchedulerStatus:
+        """
+        Get the next run and the timing of the last one.
+        """
+        return {
+            "next_run": self._next_run.isoformat() if self._next_run is not None else None,
+            "last_run_started": self._last_run_started.isoformat() if self._last_run_started is not None else None,
+            "last_run_finished": self._last_run_finished.isoformat() if self._last_run_finished is not None else None,
+            "last_run_seconds": self._last_run_seconds,
+            "runs": self._runs,
+        }
+
+    def _run(self):
+        self._runs += 1
+        self._last_run_started = datetime.now(IST)
+        SCHEDULER_RUNS.inc()
+        SCHEDULER_LAST_RUN_TIMESTAMP.set(self._last_run_started.timestamp())
+        info(f"🚀 Starting scheduled crawl #{self._runs}")
+
+        start = perf_counter()
+        try:
+            self.run_crawl()
+        except Exception as e:
+            error(f"⛔ Scheduled crawl failed: {str(e)}")
+        finally:
+            self._last_run_seconds = round(perf_counter() - start, 3)
+            self._last_run_finished = datetime.now(IST)
+            SCHEDULER_LAST_RUN_SECONDS.set(self._last_run_seconds)
+            info(
+                f"⏱️ Scheduled crawl #{self._runs} took {self._last_run_seconds:.0f}s")
@@ -1,16 +1,20 @@
 from collections import defaultdict
-from logging import error
-from typing import Dict, List
+from logging import error, info
+from typing import Callable, Dict, List
 from selenium.common.exceptions import WebDriverException, TimeoutException
 
 from ..crawler.crawler import Crawler
-from ..constants.redis_key import PRODUCT_URL_CACHE_KEY
+from ..crawler.parallel_crawler import ParallelCrawler
+from ..crawler.utils.politeness import Politeness
+from ..crawler.utils.web_driver_pool import WebDriverPool
+from ..constants.redis_key import PRODUCT_DEDUP_EXPIRE_TIME
 from .best_discount_analyzer import BestDiscountAnalyzer
 from ..constants.url import BASE_URLS, PRODUCT_URL_DETAILS
-from ..constants.const import FLIPKART_QUERY_WITH_CAT, FLIPKART_QUERY_WITHOUT_CAT
+from ..constants.const import CRAWL_MODE, CRAWL_WORKERS, FLIPKART_QUERY_WITH_CAT, FLIPKART_QUERY_WITHOUT_CAT
 
 
 from ..db.redis import RedisDB
+from ..db.crawl_checkpoint import CrawlCheckpoints
 from ..lib.types import Product, Websites, ProductCategories
 from ..utils.best_discount_analyzer import BestDiscountAnalyzer
 
@@ -44,28 +48,150 @@ def getFlipkartUrl(query: str, min_price: int, max_price: int, category: str) ->
 
 class Utils:
     @staticmethod
-    def get_products_from_web(urls: Dict[ProductCategories, Dict[Websites, str]], redis: RedisDB) -> List[Product]:
+    def get_products_from_web(urls: Dict[ProductCategories, Dict[Websites, str]], redis: RedisDB, workers: int = CRAWL_WORKERS,
+                              driver_pool: WebDriverPool | None = None,
+                              on_products: Callable[[ProductCategories, List[Product], bool], None] | None = None,
+                              checkpoints: CrawlCheckpoints | None = None) -> List[Product]:
         """
         Get the products from the websites using Selenium.
 
         args:
             urls: Dict[ProductCategories, Dict[Websites, str]] - The URLs of the products to fetch.
+            workers: int - Number of parallel WebDriver workers, 1 crawls sequentially.
+            driver_pool: WebDriverPool | None - Warm drivers to borrow, a pool is created for the run if omitted.
+            on_products: Callable | None - Called with the best products of each category as soon as it is done and whether all its crawls went through, it marks the category done once they are stored.
+            checkpoints: CrawlCheckpoints | None - Skip what the run already finished, resume the rest and save the progress.
 
         return:
             Dict[ProductCategories, List[Product]] - The fetched products.
         """
         discount_analyzer = BestDiscountAnalyzer()
-        selenium_helper = Crawler(redis, discount_analyzer)
+        all_products: List[Product] = []
+        urls = Utils.skip_done_categories(urls, checkpoints)
+
+        # Answer dedup checks from memory for the rest of the run
+        redis.load_dedup_tiers()
+        redis.reset_rating_cache_stats()
+        Politeness.shared().reset_stats()
+
+        def on_category_done(category: ProductCategories, products_by_cat: List[Product], finished: bool):
+            best_products = Utils.cache_category_products(
+                category, products_by_cat, redis)
+            all_products.extend(best_products)
+
+            # The products are not inserted yet, whoever receives them marks the category done.
+            # A category with a website stopped by an error stays open, a resumed run continues that website
+            if on_products is not None:
+                on_products(category, best_products, finished)
+            elif checkpoints is not None and finished:
+                checkpoints.complete_category(category)
+
+        # Replays read recorded pages, they need no browser
+        owns_pool = driver_pool is None and CRAWL_MODE != "replay"
+        pool = WebDriverPool(workers) if owns_pool else driver_pool
+
+        try:
+            if pool is None:
+                Utils._crawl_sequentially(
+                    urls, redis, discount_analyzer, None, on_category_done)
+            elif workers > 1:
+                ParallelCrawler(redis, discount_analyzer, workers, pool, checkpoints).crawl(
+                    urls, on_category_done)
+            else:
+                Utils._crawl_sequentially(
+                    urls, redis, discount_analyzer, pool, on_category_done, checkpoints)
+        finally:
+            if owns_pool and pool is not None:
+                pool.close()
+            discount_analyzer.clear_cache()
+            Utils.log_rating_cache_stats(redis)
+            Utils.log_politeness_stats()
+
+        return all_products
+
+    @staticmethod
+    def skip_done_categories(urls: Dict[ProductCategories, Dict[Websites, str]],
+                             checkpoints: CrawlCheckpoints | None) -> Dict[ProductCategories, Dict[Websites, str]]:
+        """
+        Leave out the categories a resumed run already crawled, cached and inserted.
+
+        args:
+            urls: Dict[ProductCategories, Dict[Websites, str]] - The URLs of the products to fetch.
+            checkpoints: CrawlCheckpoints | None - The checkpoints of the run.
+
+        return:
+            Dict[ProductCategories, Dict[Websites, str]] - The URLs left to crawl.
+        """
+        if checkpoints is None:
+            return urls
+
+        done_categories = checkpoints.done_categories() or []
+        if done_categories:
+            info(
+                f"♻️ Skipping categories finished earlier in this run: {', '.join(category.value for category in done_categories)}")
+
+        return {category: website_urls for category, website_urls in urls.items() if category not in done_categories}
+
+    @staticmethod
+    def log_rating_cache_stats(redis: RedisDB):
+        """
+        Log the rating cache hit ratio and the product page navigations it saved.
+
+        args:
+            redis: RedisDB - The Redis client.
+        """
+        stats = redis.rating_cache_stats
+        lookups = stats["hits"] + stats["misses"]
+
+        if lookups == 0:
+            return
+
+        info(
+            f"⭐ Rating cache | hit ratio: {stats['hits'] / lookups:.0%} | navigations avoided: {stats['hits']} | navigations made: {stats['misses']}")
+
+    @staticmethod
+    def log_politeness_stats():
+        """
+        Log how long the run sat idle to respect the per-domain politeness windows.
+        """
+        stats = Politeness.shared().stats()
+
+        if stats["requests"] == 0:
+            return
+
+        by_domain = ", ".join(
+            f"{domain}: {idle:.1f}s" for domain, idle in sorted(stats["idle_time_by_domain"].items()))
+        info(
+            f"🐢 Politeness | idle: {stats['idle_time']:.1f}s | requests delayed: {stats['delayed']}/{stats['requests']}" + (f" | {by_domain}" if by_domain else ""))
+
+    @staticmethod
+    def _crawl_sequentially(urls: Dict[ProductCategories, Dict[Websites, str]], redis: RedisDB, discount_analyzer: BestDiscountAnalyzer,
+                            driver_pool: WebDriverPool | None, on_category_done: Callable[[ProductCategories, List[Product], bool], None],
+                            checkpoints: CrawlCheckpoints | None = None) -> None:
+        """
+        Crawl every category and website one after another through a single Crawler.
+
+        args:
+            urls: Dict[ProductCategories, Dict[Websites, str]] - The URLs of the products to fetch.
+            redis: RedisDB - The Redis client.
+            discount_analyzer: BestDiscountAnalyzer - The discount analyzer.
+            driver_pool: WebDriverPool | None - The pool to borrow the driver from, None for replays.
+            on_category_done: Callable - Called with the products of each finished category and whether all its websites went through.
+            checkpoints: CrawlCheckpoints | None - Save the progress of every website, and resume from it.
+        """
+        selenium_helper = Crawler(
+            redis, discount_analyzer, driver_pool, checkpoints=checkpoints)
 
         products_by_cat: List[Product] = []
-        all_products: List[Product] = []
+        category_finished = True
 
         try:
             for category in urls:
                 for website, url in urls[category].items():
                     try:
-                        fetched_product = selenium_helper.get_product(
+                        fetched_product, finished = selenium_helper.crawl_website(
                             website, category, url)
+                        category_finished = category_finished and finished
 
                         if fetched_product is None or len(fetched_product) == 0:
                             continue
@@ -75,35 +201,55 @@ class Utils:
                     except (WebDriverException, TimeoutException) as e:
                         error(
                             f"⚠️ Error fetching from {website} ({category.value}): {str(e)}")
+                        category_finished = False
                         continue
                     except Exception as e:
                         error(
                             f"⚠️ Unexpected error for {website} ({category.value}): {str(e)}")
+                        category_finished = False
                         continue
 
-                # Let's sort the product based on "discount_price"
-                if len(products_by_cat) > 0:
-                    best_discounted_products = Utils.sort_products(
-                        products_by_cat)
-
-                    # Let's cache the products url to prevent re-fetching
-                    product_urls = [product["product_url"]
-                                    for product in best_discounted_products]
-
-                    redis.add_to_set(
-                        f"{PRODUCT_URL_CACHE_KEY}_{category.value}",
-                        product_urls,
-                        expire_time=60 * 60 * 4 * 24  # 4 days
-                    )
-                    all_products.extend(best_discounted_products)
+                on_category_done(category, products_by_cat, category_finished)
 
                 # Let's clear products_by_cat
                 products_by_cat = []
+                category_finished = True
         finally:
             selenium_helper.close()
-            discount_analyzer.clear_cache()
 
-        return all_products
+    @staticmethod
+    def cache_category_products(category: ProductCategories, products_by_cat: List[Product], redis: RedisDB) -> List[Product]:
+        """
+        Sort the products of a category and cache their urls to prevent re-fetching.
+
+        args:
+            category: ProductCategories - The category the products belong to.
+            products_by_cat: List[Product] - All products fetched for the category.
+            redis: RedisDB - The Redis client.
+
+        return:
+            List[Product] - The best discounted products of the category.
+        """
+        if len(products_by_cat) == 0:
+            return []
+
+        # Let's sort the product based on "discount_price"
+        best_discounted_products = Utils.sort_products(products_by_cat)
+
+        # Replays must give the same result every time, they leave the dedup index alone
+        if CRAWL_MODE == "replay":
+            return best_discounted_products
+
+        # Let's cache the products url to prevent re-fetching
+        product_urls = [product["product_url"]
+                        for product in best_discounted_products]
+
+        redis.add_to_dedup_index(
+            product_urls,
+            expire_time=PRODUCT_DEDUP_EXPIRE_TIME  # 4 days
+        )
+
+        return best_discounted_products
 
     @staticmethod
     def generate_urls(categories: List[ProductCategories]) -> Dict[ProductCategories, Dict[Websites, str]]:
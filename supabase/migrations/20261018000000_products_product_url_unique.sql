@@ -0,0 +1,12 @@
+-- Product inserts upsert on products.product_url
+-- (POST /rest/v1/products?on_conflict=product_url, Prefer: resolution=ignore-duplicates),
+-- which needs a unique constraint on the column. Retried chunks and reruns then never add a second row.
+
+-- Rows sharing a url are dropped first, the oldest one is kept
+delete from public.products newer
+using public.products older
+where newer.product_url = older.product_url
+  and newer.ctid > older.ctid;
+
+alter table public.products
+    add constraint products_product_url_key unique (product_url);
@@ -0,0 +1,106 @@
+"""
+Rating reads of the HTTP fetcher against product pages served by a local `http.server`.
+
+The pages in `tests/fixtures/flipkart/` are trimmed, hand-written product pages in the
+shape Flipkart serves them: JSON-LD rating, malformed JSON-LD with the rating elements
+to fall back on, an unrated product and a bot wall.
+"""
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+import pytest
+from httpx import AsyncClient
+
+from src.crawler.flipkart import rating_fetcher
+from src.crawler.flipkart.rating_fetcher import FlipkartRatingFetcher, parse_rating_html
+from src.crawler.utils.politeness import Politeness
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "flipkart"
+
+
+class ProductPageHandler(SimpleHTTPRequestHandler):
+    """Serves the fixtures, with `/blocked` answering 403 like the bot protection does"""
+
+    def do_GET(self):
+        if self.path == "/blocked":
+            self.send_error(403)
+            return
+
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        return
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(ProductPageHandler, directory=str(FIXTURES_DIR)))
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = FlipkartRatingFetcher(concurrency=4, client=AsyncClient(
+        timeout=5.0), politeness=Politeness(enabled=False))
+
+    yield fetcher
+
+    fetcher.close()
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def test_parse_rating_html_reads_json_ld():
+    assert parse_rating_html(read_fixture("product-jsonld.html")) == {
+        "rating": 4.3, "rating_count": 1234}
+
+
+def test_parse_rating_html_falls_back_to_rating_elements_on_malformed_json_ld():
+    assert parse_rating_html(read_fixture("product-malformed-jsonld.html")) == {
+        "rating": 4.2, "rating_count": 2345}
+
+
+def test_parse_rating_html_without_rating():
+    assert parse_rating_html(read_fixture("product-unrated.html")) is None
+
+
+def test_fetch_ratings(base_url, fetcher):
+    urls = [f"{base_url}/product-jsonld.html", f"{base_url}/product-malformed-jsonld.html",
+            f"{base_url}/product-unrated.html", f"{base_url}/bot-wall.html",
+            f"{base_url}/blocked", f"{base_url}/missing.html"]
+
+    ratings, blocked = fetcher.fetch_ratings(urls)
+
+    assert ratings == {
+        f"{base_url}/product-jsonld.html": {"rating": 4.3, "rating_count": 1234},
+        f"{base_url}/product-malformed-jsonld.html": {"rating": 4.2, "rating_count": 2345},
+    }
+    assert blocked == [f"{base_url}/bot-wall.html", f"{base_url}/blocked"]
+
+
+def test_fetch_ratings_isolates_a_failing_page(base_url, fetcher, monkeypatch):
+    parse = rating_fetcher.parse_rating_html
+
+    def failing_parse(html: str):
+        if "Regular Fit" in html:
+            raise RuntimeError("unexpected markup")
+
+        return parse(html)
+
+    monkeypatch.setattr(rating_fetcher, "parse_rating_html", failing_parse)
+
+    ratings, blocked = fetcher.fetch_ratings(
+        [f"{base_url}/product-jsonld.html", f"{base_url}/product-malformed-jsonld.html"])
+
+    assert ratings == {f"{base_url}/product-jsonld.html": {
+        "rating": 4.3, "rating_count": 1234}}
+    assert blocked == [f"{base_url}/product-malformed-jsonld.html"]
@@ -0,0 +1,159 @@
+"""
+Chunked Supabase inserts against a stand-in PostgREST server built on httpx's `MockTransport`.
+"""
+from asyncio import run
+from json import loads
+from typing import Callable, Dict, List
+
+import pytest
+from httpx import AsyncClient, Client, MockTransport, ReadTimeout, Request, Response
+
+from src.db import supabase as supabase_module
+from src.db.supabase import SupaBaseClient
+
+BASE_URL = "https://project.supabase.co/rest/v1"
+
+
+class PostgRESTStub:
+    """
+    Answers `POST /products?on_conflict=product_url` like PostgREST over a table with a
+    unique product url: `resolution=ignore-duplicates` skips the urls already stored.
+
+    `fail` decides per request, from the urls of its chunk, whether to answer with an
+    error status or raise a transport error. `commit_before_failing` stores the chunk
+    first, like a proxy error or a lost answer after the insert was committed.
+    """
+
+    def __init__(self, fail: Callable[[List[str], int], int | Exception | None] = lambda urls, attempt: None,
+                 commit_before_failing: bool = False):
+        self.fail = fail
+        self.commit_before_failing = commit_before_failing
+        self.rows: List[str] = []
+        self.attempts: Dict[str, int] = {}
+
+    def __call__(self, request: Request) -> Response:
+        assert request.method == "POST"
+        assert request.url.path == "/rest/v1/products"
+        assert request.url.params["on_conflict"] == "product_url"
+        assert "resolution=ignore-duplicates" in request.headers["prefer"]
+        assert request.headers["apikey"] == "key"
+
+        urls = [product["product_url"] for product in loads(request.content)]
+        attempt = self.attempts[urls[0]] = self.attempts.get(urls[0], 0) + 1
+
+        failure = self.fail(urls, attempt)
+        if failure is None or self.commit_before_failing:
+            self.rows.extend(url for url in urls if url not in self.rows)
+
+        if isinstance(failure, Exception):
+            raise failure
+        if failure is not None:
+            return Response(failure, json={"message": "error"})
+
+        return Response(201)
+
+
+def make_products(count: int) -> List[Dict]:
+    return [{"product_url": f"https://www.amazon.in/dp/B{index:09d}", "discount_price": index}
+            for index in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def supabase_env(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.setenv("SUPABASE_KEY", "key")
+    # No backoff between retries
+    monkeypatch.setattr(supabase_module, "sleep", lambda seconds: None)
+
+
+def make_client(stub: PostgRESTStub, chunk_size: int = 2) -> SupaBaseClient:
+    return SupaBaseClient(chunk_size=chunk_size, concurrency=2, http_client=Client(
+        base_url=BASE_URL, headers={"apikey": "key"}, transport=MockTransport(stub)))
+
+
+def test_insert_products_dedups_and_chunks():
+    stub = PostgRESTStub()
+    client = make_client(stub)
+    products = make_products(5)
+
+    result = client.insert_products(products + products[:2])
+
+    assert result == {"inserted": 5, "failed": 0}
+    assert sorted(stub.rows) == sorted(
+        product["product_url"] for product in products)
+    assert client.insert_stats()["chunks"] == 3
+
+
+def test_insert_products_retries_a_failed_chunk():
+    products = make_products(4)
+    flaky_url = products[2]["product_url"]
+    stub = PostgRESTStub(fail=lambda urls, attempt: 503 if flaky_url in urls and attempt == 1 else None)
+    client = make_client(stub)
+
+    result = client.insert_products(products)
+
+    assert result == {"inserted": 4, "failed": 0}
+    assert stub.attempts[flaky_url] == 2
+    assert sorted(stub.rows) == sorted(
+        product["product_url"] for product in products)
+
+
+def test_insert_products_counts_a_chunk_failing_every_retry():
+    products = make_products(4)
+    stub = PostgRESTStub(fail=lambda urls, attempt: 500 if products[0]["product_url"] in urls else None)
+    client = make_client(stub)
+
+    result = client.insert_products(products)
+
+    assert result == {"inserted": 2, "failed": 2}
+    assert stub.attempts[products[0]["product_url"]] == 3
+    stats = client.insert_stats()
+    assert (stats["chunks"], stats["failed_chunks"], stats["failed_products"]) == (2, 1, 2)
+
+
+@pytest.mark.parametrize("failure", [ReadTimeout("timed out"), 502])
+def test_insert_products_retries_a_committed_chunk_without_duplicating_rows(failure):
+    products = make_products(2)
+    stub = PostgRESTStub(fail=lambda urls, attempt: failure if attempt == 1 else None,
+                         commit_before_failing=True)
+    client = make_client(stub)
+
+    result = client.insert_products(products)
+
+    assert result == {"inserted": 2, "failed": 0}
+    assert stub.attempts[products[0]["product_url"]] == 2
+    assert stub.rows == [product["product_url"] for product in products]
+
+
+def test_insert_products_rerun_adds_no_second_row():
+    products = make_products(3)
+    stub = PostgRESTStub()
+    client = make_client(stub)
+
+    assert client.insert_products(products) == {"inserted": 3, "failed": 0}
+    assert client.insert_products(products) == {"inserted": 3, "failed": 0}
+
+    assert stub.rows == [product["product_url"] for product in products]
+
+
+def test_insert_products_async_retries_a_failed_chunk(monkeypatch):
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(supabase_module, "async_sleep", no_sleep)
+
+    products = make_products(4)
+    stub = PostgRESTStub(fail=lambda urls, attempt: 502 if attempt == 1 else None)
+    client = make_client(stub)
+
+    async def insert():
+        client.async_http = AsyncClient(
+            base_url=BASE_URL, headers={"apikey": "key"}, transport=MockTransport(stub))
+        try:
+            return await client.insert_products_async(products)
+        finally:
+            await client.aclose()
+
+    assert run(insert()) == {"inserted": 4, "failed": 0}
+    assert sorted(stub.rows) == sorted(
+        product["product_url"] for product in products)